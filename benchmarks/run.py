@@ -0,0 +1,431 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the specify CLI.
+
+Runs offline, in a scratch directory on tmpfs (/dev/shm when available), and
+measures:
+
+  startup/*             import time and `specify --help`
+  init/<agent>/<lang>   `specify init` wall time for every agent and language
+  commands/<n>/<cache>  generate_agent_commands over n synthetic command templates
+  copy/<n>/<store>      copy_and_extract_template_from_resources over n synthetic files
+  numbering/<impl>/<n>  create-new-feature.sh (script) and `specify feature new` (cli)
+                        with n existing specs/ directories
+
+Every measurement runs in a fresh Python process, the way users run the CLI,
+with its own cache and template store directories. "cold" cases start with
+empty caches, "warm" cases after a priming run. The CLI is imported from a
+precompiled copy of the package, never from the checkout, so no case times
+the bytecode compiler whether or not src/ has __pycache__ directories.
+Synthetic libraries are served by copies whose resources/ is replaced (and
+its manifest regenerated), so the code paths are exactly those of a release.
+
+Results are compared with benchmarks/baseline.json: a case regresses when
+its median is more than --threshold slower than the baseline (and by more
+than --min-delta seconds). Regressions make the run exit with status 1.
+Timings only compare on the machine that made them, so the baseline is not
+checked in: record one with --write-baseline (on the unchanged tree) before
+comparing. Without a baseline the run stops with status 2 before measuring.
+
+Usage:
+    python benchmarks/run.py --write-baseline  # record the results as the baseline
+    python benchmarks/run.py                   # full suite, compare with the baseline
+    python benchmarks/run.py --quick           # smaller sizes, fewer repeats
+    python benchmarks/run.py -k copy/          # only cases whose id contains "copy/"
+"""
+
+import argparse
+import compileall
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+SRC = ROOT / "src"
+PACKAGE = SRC / "specify_cli"
+SCRIPTS = PACKAGE / "resources" / "scripts"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+SIZES = {
+    "commands": (10, 100, 1000, 5000),
+    "copy": (100, 1000, 10_000, 50_000),
+    "numbering": (10, 100, 1000, 5000),
+}
+QUICK_SIZES = {
+    "commands": (10, 100),
+    "copy": (100, 1000),
+    "numbering": (10, 100),
+}
+
+CLI = "import sys; from specify_cli import main; sys.exit(main())"
+
+GENERATE = """
+import json, sys, time
+from pathlib import Path
+import specify_cli
+start = time.perf_counter()
+written = specify_cli.generate_agent_commands(Path(sys.argv[1]), "all")
+print(json.dumps({"seconds": time.perf_counter() - start, "files": len(written)}))
+"""
+
+COPY = """
+import json, sys, time
+from pathlib import Path
+import specify_cli
+start = time.perf_counter()
+specify_cli.copy_and_extract_template_from_resources(Path(sys.argv[1]), "copilot", verbose=False)
+print(json.dumps({"seconds": time.perf_counter() - start}))
+"""
+
+
+def scratch_root(requested: str | None) -> Path:
+    """A fresh directory on tmpfs if possible."""
+    if requested:
+        base = requested
+    elif os.path.isdir("/dev/shm") and os.access("/dev/shm", os.W_OK):
+        base = "/dev/shm"
+    else:
+        base = tempfile.gettempdir()
+    return Path(tempfile.mkdtemp(prefix="specify-bench-", dir=base))
+
+
+class Bench:
+    """Runs cases in child processes and collects their timings."""
+
+    def __init__(self, scratch: Path, *, repeat: int, pattern: str | None, verbose: bool):
+        self.scratch = scratch
+        self.repeat = repeat
+        self.pattern = pattern
+        self.verbose = verbose
+        self.results: dict[str, dict] = {}
+        self._n = 0
+        self._package: Path | None = None
+
+    def wanted(self, case_id: str) -> bool:
+        return self.pattern is None or self.pattern in case_id
+
+    def tempdir(self, name: str) -> Path:
+        self._n += 1
+        path = self.scratch / f"{self._n:04d}-{name.replace('/', '-')}"
+        path.mkdir(parents=True)
+        return path
+
+    def package(self) -> Path:
+        """Import root of a compiled copy of the checkout's package, made on first use."""
+        if self._package is None:
+            self._package = package_copy(self, "package")
+        return self._package
+
+    def env(self, pythonpath: Path | None = None, caches: Path | None = None, **extra) -> dict:
+        """Environment of a child: its own caches, no daemon, no tracing, a fixed git identity.
+
+        The CLI is imported from pythonpath (default: the compiled copy of
+        the package).
+        """
+        pythonpath = pythonpath or self.package()
+        caches = caches or self.tempdir("cache")
+        env = {k: v for k, v in os.environ.items() if not k.startswith("SPECIFY_")}
+        env.update(
+            PYTHONPATH=str(pythonpath),
+            PYTHONDONTWRITEBYTECODE="1",
+            SPECIFY_CACHE_DIR=str(caches / "cache"),
+            SPECIFY_STORE_DIR=str(caches / "store"),
+            SPECIFY_SOCKET=str(caches / "no-daemon.sock"),
+            GIT_AUTHOR_NAME="bench", GIT_AUTHOR_EMAIL="bench@example.invalid",
+            GIT_COMMITTER_NAME="bench", GIT_COMMITTER_EMAIL="bench@example.invalid",
+            GIT_CONFIG_NOSYSTEM="1",
+        )
+        env.update(extra)
+        return env
+
+    def run(self, argv: list[str], env: dict, cwd: Path | None = None) -> tuple[float, str]:
+        start = time.perf_counter()
+        proc = subprocess.run(argv, env=env, cwd=cwd, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if proc.returncode != 0:
+            raise RuntimeError(f"{' '.join(argv[:4])}... failed ({proc.returncode}):\n{proc.stderr or proc.stdout}")
+        return elapsed, proc.stdout
+
+    def record(self, case_id: str, samples: list[float], **info) -> None:
+        self.results[case_id] = {
+            "median": statistics.median(samples),
+            "min": min(samples),
+            "runs": len(samples),
+            **info,
+        }
+        if self.verbose:
+            print(f"  {case_id:<40} {statistics.median(samples) * 1000:10.1f} ms", file=sys.stderr)
+
+    def measure(self, case_id: str, once, **info) -> None:
+        """Call once() `repeat` times; it returns the seconds to record."""
+        if not self.wanted(case_id):
+            return
+        self.record(case_id, [once() for _ in range(self.repeat)], **info)
+
+
+# --- cases ------------------------------------------------------------------
+
+
+def bench_startup(b: Bench) -> None:
+    env = b.env()
+    b.measure("startup/import", lambda: b.run([sys.executable, "-c", "import specify_cli"], env)[0])
+    b.measure("startup/help", lambda: b.run([sys.executable, "-c", CLI, "--help"], env)[0])
+
+
+def bench_init(b: Bench) -> None:
+    sys.path.insert(0, str(SRC))
+    from specify_cli import AI_CHOICES
+    from specify_cli.i18n import TRANSLATIONS
+
+    for agent in AI_CHOICES:
+        for lang in TRANSLATIONS.languages():
+            case_id = f"init/{agent}/{lang}"
+            if not b.wanted(case_id):
+                continue
+            # One store per case: the first run populates it, like a first install
+            env = b.env()
+
+            def once():
+                project = b.tempdir(case_id) / "project"
+                argv = [sys.executable, "-c", CLI, "--lang", lang, "init", str(project),
+                        "--ai", agent, "--ignore-agent-tools", "--no-git", "--yes"]
+                return b.run(argv, env)[0]
+
+            b.run([sys.executable, "-c", CLI, "init", str(b.tempdir("prime") / "p"), "--ai", agent,
+                   "--ignore-agent-tools", "--no-git", "--yes"], env)
+            b.measure(case_id, once)
+
+
+def package_copy(b: Bench, name: str, populate=None) -> Path:
+    """Compiled copy of the package; returns the directory to put on PYTHONPATH.
+
+    With populate, its resources/ is rebuilt by populate(resources_dir) and
+    the manifest regenerated first.
+    """
+    root = b.tempdir(name)
+    shutil.copytree(PACKAGE, root / "specify_cli", ignore=shutil.ignore_patterns("__pycache__"))
+    if populate is not None:
+        sys.path.insert(0, str(SRC))
+        from specify_cli.manifest import write_manifest
+
+        populate(root / "specify_cli" / "resources")
+        write_manifest(root / "specify_cli" / "resources")
+    # Installed packages ship bytecode; without it every run would time the compiler
+    compileall.compile_dir(root / "specify_cli", quiet=1, rx=re.compile(r"[/\\]resources[/\\]"))
+    return root
+
+
+def bench_commands(b: Bench, sizes) -> None:
+    real = sorted((PACKAGE / "resources" / "templates" / "commands").glob("*.md"))
+    for n in sizes:
+        ids = [f"commands/{n}/cold", f"commands/{n}/warm"]
+        if not any(b.wanted(i) for i in ids):
+            continue
+
+        def populate(resources: Path, n=n):
+            commands = resources / "templates" / "commands"
+            shutil.rmtree(commands)
+            commands.mkdir()
+            for i in range(n):
+                text = real[i % len(real)].read_text(encoding="utf-8")
+                (commands / f"cmd-{i:05d}.md").write_text(f"{text}\n<!-- {i} -->\n", encoding="utf-8")
+
+        pkg = package_copy(b, f"commands-{n}", populate)
+        warm_env = b.env(pkg)
+        b.run([sys.executable, "-c", GENERATE, str(b.tempdir("prime"))], warm_env)
+
+        def once(warm: bool):
+            env = warm_env if warm else b.env(pkg)
+            return json.loads(b.run([sys.executable, "-c", GENERATE, str(b.tempdir("out"))], env)[1])["seconds"]
+
+        b.measure(ids[0], lambda: once(False), templates=n)
+        b.measure(ids[1], lambda: once(True), templates=n)
+
+
+def bench_copy(b: Bench, sizes) -> None:
+    for n in sizes:
+        ids = [f"copy/{n}/cold", f"copy/{n}/warm"]
+        if not any(b.wanted(i) for i in ids):
+            continue
+
+        def populate(resources: Path, n=n):
+            bulk = resources / "templates" / "bulk"
+            for i in range(n):
+                d = bulk / f"d{i // 100:04d}"
+                if i % 100 == 0:
+                    d.mkdir(parents=True)
+                # Distinct content, so the store can't deduplicate it
+                (d / f"f{i:06d}.md").write_text(f"# File {i}\n\n" + "Lorem ipsum dolor sit amet. " * (8 + i % 64),
+                                                encoding="utf-8")
+
+        pkg = package_copy(b, f"copy-{n}", populate)
+        warm_env = b.env(pkg)
+        b.run([sys.executable, "-c", COPY, str(b.tempdir("prime") / "p")], warm_env)
+
+        def once(warm: bool):
+            env = warm_env if warm else b.env(pkg)
+            return json.loads(b.run([sys.executable, "-c", COPY, str(b.tempdir("out") / "p")], env)[1])["seconds"]
+
+        # cold includes populating the template store from the package
+        b.measure(ids[0], lambda: once(False), files=n)
+        b.measure(ids[1], lambda: once(True), files=n)
+
+
+def feature_repo(b: Bench, n: int) -> Path:
+    repo = b.tempdir(f"repo-{n}")
+    env = b.env()
+    subprocess.run(["git", "init", "-q", "-b", "main", str(repo)], env=env, check=True)
+    subprocess.run(["git", "-C", str(repo), "commit", "-q", "--allow-empty", "-m", "init"], env=env, check=True)
+    shutil.copytree(SCRIPTS, repo / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    (repo / "templates").mkdir()
+    shutil.copy(PACKAGE / "resources" / "templates" / "spec-template.md", repo / "templates")
+    for i in range(1, n + 1):
+        d = repo / "specs" / f"{i:03d}-existing-feature-{i}"
+        d.mkdir(parents=True)
+        (d / "spec.md").write_text(f"# Feature {i}\n", encoding="utf-8")
+    return repo
+
+
+def bench_numbering(b: Bench, sizes) -> None:
+    for n in sizes:
+        ids = {"script": f"numbering/script/{n}", "cli": f"numbering/cli/{n}"}
+        if not any(b.wanted(i) for i in ids.values()):
+            continue
+        repo = feature_repo(b, n)
+        env = b.env(caches=b.tempdir("cache"))
+        commands = {
+            "script": (["bash", str(repo / "scripts" / "create-new-feature.sh"), "--json", "benchmark feature"],
+                       dict(env, SPECIFY_NO_CLI="1")),
+            "cli": ([sys.executable, "-c", CLI, "feature", "new", "--json", "benchmark feature"], env),
+        }
+
+        def once(impl: str):
+            argv, child_env = commands[impl]
+            elapsed, out = b.run(argv, child_env, cwd=repo)
+            # Undo, so every run numbers against the same n directories
+            branch = json.loads(out)["BRANCH_NAME"]
+            shutil.rmtree(repo / "specs" / branch)
+            subprocess.run(["git", "checkout", "-q", "main"], cwd=repo, env=env, check=True)
+            subprocess.run(["git", "branch", "-q", "-D", branch], cwd=repo, env=env, check=True)
+            return elapsed
+
+        for impl, case_id in ids.items():
+            b.measure(case_id, lambda impl=impl: once(impl), existing=n)
+
+
+# --- baseline ---------------------------------------------------------------
+
+
+def machine() -> dict:
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+
+def load_baseline(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+
+
+def save_baseline(path: Path, results: dict[str, dict]) -> None:
+    """Merge results into the baseline (cases not run keep their old numbers)."""
+    baseline = load_baseline(path)
+    cases = dict(baseline.get("cases", {}))
+    cases.update({k: {"median": round(v["median"], 6), "min": round(v["min"], 6)} for k, v in results.items()})
+    baseline = {
+        "updated": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "machine": machine(),
+        "cases": dict(sorted(cases.items())),
+    }
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(baseline, indent=1) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def compare(results: dict[str, dict], baseline: dict, *, threshold: float, min_delta: float) -> list[dict]:
+    """One row per case: median, baseline median, relative change and whether it regressed."""
+    cases = baseline.get("cases", {})
+    rows = []
+    for case_id, r in results.items():
+        base = cases.get(case_id, {}).get("median")
+        change = (r["median"] - base) / base if base else None
+        regressed = base is not None and change > threshold and r["median"] - base > min_delta
+        rows.append({"id": case_id, "median": r["median"], "baseline": base, "change": change, "regressed": regressed})
+    return rows
+
+
+def print_table(rows: list[dict], threshold: float) -> None:
+    print(f"{'case':<40} {'median':>11} {'baseline':>11} {'change':>8}")
+    for row in rows:
+        base = f"{row['baseline'] * 1000:9.1f}ms" if row["baseline"] is not None else f"{'-':>11}"
+        change = f"{row['change'] * 100:+7.1f}%" if row["change"] is not None else f"{'':>8}"
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(f"{row['id']:<40} {row['median'] * 1000:9.1f}ms {base} {change}{flag}")
+    regressions = sum(r["regressed"] for r in rows)
+    if regressions:
+        print(f"\n{regressions} case(s) more than {threshold:.0%} slower than the baseline")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the specify CLI")
+    parser.add_argument("--quick", action="store_true", help="Smaller sizes and a single run per case")
+    parser.add_argument("-k", "--filter", help="Only run cases whose id contains this string")
+    parser.add_argument("--repeat", type=int, help="Runs per case (default: 3, or 1 with --quick)")
+    parser.add_argument("--baseline", type=Path, default=BASELINE, help="Baseline file (default: benchmarks/baseline.json)")
+    parser.add_argument("--write-baseline", action="store_true",
+                        help="Store the results in the baseline file instead of comparing with it")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Relative slowdown that counts as a regression (default: 0.25)")
+    parser.add_argument("--min-delta", type=float, default=0.005, help="Ignore slowdowns smaller than this many seconds (default: 0.005)")
+    parser.add_argument("--json", type=Path, help="Also write the results to this file")
+    parser.add_argument("--tmpdir", help="Scratch directory parent (default: /dev/shm, else the system temp dir)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Don't report cases as they finish")
+    args = parser.parse_args(argv)
+    if not args.write_baseline and not args.baseline.is_file():
+        parser.exit(2, f"{parser.prog}: error: no baseline at {args.baseline}; "
+                       f"record one first with --write-baseline\n")
+
+    sizes = QUICK_SIZES if args.quick else SIZES
+    repeat = args.repeat or (1 if args.quick else 3)
+    scratch = scratch_root(args.tmpdir)
+    if not args.quiet:
+        print(f"scratch: {scratch}", file=sys.stderr)
+    b = Bench(scratch, repeat=repeat, pattern=args.filter, verbose=not args.quiet)
+    try:
+        bench_startup(b)
+        bench_init(b)
+        bench_commands(b, sizes["commands"])
+        bench_copy(b, sizes["copy"])
+        bench_numbering(b, sizes["numbering"])
+    finally:
+        if not args.keep:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+    rows = compare(b.results, load_baseline(args.baseline), threshold=args.threshold, min_delta=args.min_delta)
+    print_table(rows, args.threshold)
+    if args.json:
+        args.json.write_text(json.dumps({"machine": machine(), "results": b.results, "comparison": rows}, indent=1) + "\n",
+                             encoding="utf-8")
+    if args.write_baseline:
+        save_baseline(args.baseline, b.results)
+        print(f"\nBaseline saved to {args.baseline}")
+        return 0
+    return 1 if any(r["regressed"] for r in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
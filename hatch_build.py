@@ -0,0 +1,19 @@
+"""Hatch build hook: regenerate the bundled resource manifest before packaging."""
+
+import importlib.util
+from pathlib import Path
+
+from hatchling.builders.hooks.plugin.interface import BuildHookInterface
+
+
+class ResourceManifestHook(BuildHookInterface):
+    PLUGIN_NAME = "custom"
+
+    def initialize(self, version, build_data):
+        # Load the module by path: importing the specify_cli package would
+        # pull in the CLI dependencies, which the build environment lacks.
+        path = Path(self.root) / "src" / "specify_cli" / "manifest.py"
+        spec = importlib.util.spec_from_file_location("_specify_manifest", path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        module.write_manifest()
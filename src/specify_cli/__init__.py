@@ -21,29 +21,26 @@ Or install globally:
     specify init --here
 """
 
+import inspect
 import os
 import subprocess
 import sys
-import zipfile
-import tempfile
 import shutil
-import json
-from pathlib import Path
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
 from typing import Optional
 
 import typer
-from rich.console import Console
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn
-from rich.text import Text
-from rich.live import Live
-from rich.align import Align
-from rich.table import Table
-from rich.tree import Tree
-from typer.core import TyperGroup
-
-# For cross-platform keyboard input
-import readchar
+from typer.core import TyperCommand, TyperGroup
+
+from .i18n import TRANSLATIONS
+from .tools import TOOLS
+
+# Rich renderables, readchar and the Live display are imported inside the
+# functions that use them so `specify --help`, `specify check` and other
+# non-interactive paths don't pay for them at startup.
 
 # Constants
 AI_CHOICES = {
@@ -52,108 +49,33 @@ AI_CHOICES = {
     "gemini": "Gemini CLI"
 }
 
-# Language support
-LANG = "en"
-
-TRANSLATIONS: dict[str, dict[str, str]] = {
-    "en": {
-        "project_setup": "Specify Project Setup",
-        "initializing_here": "Initializing in current directory:",
-        "creating_new_project": "Creating new project:",
-        "warning_dir_not_empty": "Warning: Current directory is not empty ({count} items)",
-        "warning_template_overwrite": "Template files will be merged with existing content and may overwrite existing files",
-        "prompt_continue": "Do you want to continue?",
-        "ai_prompt": "Choose your AI assistant:",
-        "git_not_found": "Git not found - will skip repository initialization",
-        "error_invalid_lang": "Error: Invalid language '{lang}'. Choose 'en' or 'ja'",
-        "error_both_project_and_here": "Error: Cannot specify both project name and --here flag",
-        "error_missing_project_or_here": "Error: Must specify either a project name or use --here flag",
-        "error_invalid_ai": "Error: Invalid AI assistant '{ai}'",
-        "error_dir_exists": "Error: Directory '{project_name}' already exists",
-        "tracker_title": "Initialize Specify Project",
-        "step_precheck": "Check required tools",
-        "step_ai_select": "Select AI assistant",
-        "step_copy": "Copy template",
-        "step_extract": "Extract template",
-        "step_zip_list": "Archive contents",
-        "step_extracted_summary": "Extraction summary",
-        "step_cleanup": "Cleanup",
-        "step_git": "Initialize git repository",
-        "step_final": "Finalize",
-        "step_flatten": "Flatten nested directory",
-        "project_ready": "Project ready.",
-        "next_steps_title": "Next steps",
-        "next_step_here": "1. You're already in the project directory!",
-        "next_step_cd": "1. [bold green]cd {project_name}[/bold green]",
-        "next_step_update_constitution": "{step_num}. Update [bold magenta]CONSTITUTION.md[/bold magenta] with your project's non-negotiable principles",
-        "selection_hint": "Use ↑/↓ to navigate, Enter to select, Esc to cancel",
-        "selection_cancelled": "Selection cancelled",
-        "selection_failed": "Selection failed.",
-        "help_usage_hint": "Run 'specify --help' for usage information",
-        "operation_cancelled": "Operation cancelled",
-        "checking_requirements": "Checking Specify requirements...",
-        "checking_internet": "Checking internet connectivity...",
-        "internet_ok": "Internet connection available",
-        "internet_ng": "No internet connection - required for downloading templates",
-        "check_connection": "Please check your internet connection",
-        "optional_tools": "Optional tools:",
-        "optional_ai_tools": "Optional AI tools:",
-        "cli_ready": "✓ Specify CLI is ready to use!",
-        "consider_git": "Consider installing git for repository management",
-        "consider_ai": "Consider installing an AI assistant for the best experience",
-    },
-    "ja": {
-        "project_setup": "Specifyプロジェクトのセットアップ",
-        "initializing_here": "現在のディレクトリに初期化:",
-        "creating_new_project": "新しいプロジェクトを作成:",
-        "warning_dir_not_empty": "警告: 現在のディレクトリは空ではありません ({count} 件)",
-        "warning_template_overwrite": "テンプレートは既存の内容とマージされ、既存ファイルを上書きする可能性があります",
-        "prompt_continue": "続行しますか？",
-        "ai_prompt": "AIアシスタントを選択してください:",
-        "git_not_found": "Gitが見つかりません - リポジトリの初期化をスキップします",
-        "error_invalid_lang": "エラー: 無効な言語 '{lang}' です。'en' または 'ja' を指定してください",
-        "error_both_project_and_here": "エラー: プロジェクト名と --here を同時に指定できません",
-        "error_missing_project_or_here": "エラー: プロジェクト名を指定するか --here を使用してください",
-        "error_invalid_ai": "エラー: 無効なAIアシスタント '{ai}'",
-        "error_dir_exists": "エラー: ディレクトリ '{project_name}' は既に存在します",
-        "tracker_title": "Specifyプロジェクトを初期化",
-        "step_precheck": "必要なツールを確認",
-        "step_ai_select": "AIアシスタントの選択",
-        "step_copy": "テンプレートをコピー",
-        "step_extract": "テンプレートを展開",
-        "step_zip_list": "アーカイブ内容",
-        "step_extracted_summary": "展開結果",
-        "step_cleanup": "クリーンアップ",
-        "step_git": "gitリポジトリを初期化",
-        "step_final": "完了",
-        "step_flatten": "ネストされたディレクトリを平坦化",
-        "project_ready": "プロジェクトの準備ができました。",
-        "next_steps_title": "次のステップ",
-        "next_step_here": "1. すでにプロジェクトディレクトリ内にいます！",
-        "next_step_cd": "1. [bold green]cd {project_name}[/bold green]",
-        "next_step_update_constitution": "{step_num}. [bold magenta]CONSTITUTION.md[/bold magenta] を更新する",
-        "selection_hint": "↑/↓ で移動、Enter で決定、Esc でキャンセル",
-        "selection_cancelled": "選択をキャンセルしました",
-        "selection_failed": "選択に失敗しました。",
-        "help_usage_hint": "'specify --help' で使い方を表示",
-        "operation_cancelled": "操作をキャンセルしました",
-        "checking_requirements": "Specify の要件を確認中...",
-        "checking_internet": "インターネット接続を確認中...",
-        "internet_ok": "インターネット接続があります",
-        "internet_ng": "インターネットに接続できません（テンプレートのダウンロードに必要）",
-        "check_connection": "インターネット接続を確認してください",
-        "optional_tools": "オプションのツール:",
-        "optional_ai_tools": "オプションのAIツール:",
-        "cli_ready": "✓ Specify CLI を利用できます！",
-        "consider_git": "リポジトリ管理のために git のインストールを検討してください",
-        "consider_ai": "最適な体験のためにAIアシスタントの導入を検討してください",
-    },
+# Generated command layout per agent: (output directory, file suffix, {ARGS} replacement)
+AGENT_COMMAND_FORMATS = {
+    "claude": (".claude/commands", ".md", "$ARGUMENTS"),
+    "gemini": (".gemini/commands", ".toml", "{{args}}"),
+    "copilot": (".github/prompts", ".prompt.md", "$ARGUMENTS"),
 }
 
 
+def as_agents(ai_assistant) -> list[str]:
+    """Normalize an --ai value into agent keys.
+
+    Accepts a single key, a comma-separated list, "all", or a sequence of
+    keys. Unknown keys are kept so callers can report them.
+    """
+    if isinstance(ai_assistant, str):
+        if ai_assistant.strip() == "all":
+            return list(AI_CHOICES)
+        ai_assistant = ai_assistant.split(",")
+    return list(dict.fromkeys(a.strip() for a in ai_assistant if a and a.strip()))
+
+# Language support; UI messages are loaded from i18n/<lang>.json on first use
+LANG = "en"
+
+
 def t(key: str, **kwargs) -> str:
     """Return translated string for current language."""
-    return TRANSLATIONS.get(LANG, TRANSLATIONS["en"]).get(key, key).format(**kwargs)
+    return TRANSLATIONS.message(LANG, key).format(**kwargs)
 
 # ASCII Art Banner
 BANNER = """
@@ -165,24 +87,33 @@ BANNER = """
 ╚══════╝╚═╝     ╚══════╝ ╚═════╝╚═╝╚═╝        ╚═╝
 """
 
-TAGLINE = {"en": "Spec-Driven Development Toolkit", "ja": "仕様駆動開発ツールキット"}
 class StepTracker:
     """Track and render hierarchical steps without emojis, similar to Claude Code tree output.
-    Supports live auto-refresh via an attached refresh callback.
+
+    Steps are indexed by key, so updates are O(1) however many there are.
+    Rendering is decoupled from updates: pass the tracker itself to `Live`
+    and the tree is rebuilt at most once per refresh, only when something
+    changed. Listeners (`attach_listener`, e.g. the NDJSON progress writer)
+    receive every change as an event.
     """
+
     def __init__(self, title: str):
         self.title = title
         self.steps = []  # list of dicts: {key, label, status, detail}
+        self._by_key = {}  # key -> the dict in self.steps
         self.status_order = {"pending": 0, "running": 1, "done": 2, "error": 3, "skipped": 4}
-        self._refresh_cb = None  # callable to trigger UI refresh
+        self._listeners = []
+        self._version = 0  # bumped on every change
+        self._rendered = (-1, None)  # (version, tree) of the last render
+        self._started = time.perf_counter()
 
-    def attach_refresh(self, cb):
-        self._refresh_cb = cb
+    def attach_listener(self, cb):
+        """Call cb(event) for every added or updated step (see `step_event`)."""
+        self._listeners.append(cb)
 
     def add(self, key: str, label: str):
-        if key not in [s["key"] for s in self.steps]:
-            self.steps.append({"key": key, "label": label, "status": "pending", "detail": ""})
-            self._maybe_refresh()
+        if key not in self._by_key:
+            self._insert(key, label, "pending", "")
 
     def start(self, key: str, detail: str = ""):
         self._update(key, status="running", detail=detail)
@@ -196,26 +127,50 @@ class StepTracker:
     def skip(self, key: str, detail: str = ""):
         self._update(key, status="skipped", detail=detail)
 
+    def _insert(self, key: str, label: str, status: str, detail: str):
+        step = {"key": key, "label": label, "status": status, "detail": detail}
+        self.steps.append(step)
+        self._by_key[key] = step
+        self._changed(step)
+
     def _update(self, key: str, status: str, detail: str):
-        for s in self.steps:
-            if s["key"] == key:
-                s["status"] = status
-                if detail:
-                    s["detail"] = detail
-                self._maybe_refresh()
-                return
-        # If not present, add it
-        self.steps.append({"key": key, "label": key, "status": status, "detail": detail})
-        self._maybe_refresh()
-
-    def _maybe_refresh(self):
-        if self._refresh_cb:
-            try:
-                self._refresh_cb()
-            except Exception:
-                pass
+        step = self._by_key.get(key)
+        if step is None:
+            # If not present, add it
+            self._insert(key, key, status, detail)
+            return
+        step["status"] = status
+        if detail:
+            step["detail"] = detail
+        self._changed(step)
+
+    def elapsed(self) -> float:
+        """Seconds since the tracker was created."""
+        return round(time.perf_counter() - self._started, 4)
+
+    def step_event(self, step: dict) -> dict:
+        return {"event": "step", "tracker": self.title, **step, "elapsed": self.elapsed()}
+
+    def _changed(self, step: dict):
+        self._version += 1
+        if self._listeners:
+            event = self.step_event(step)
+            for cb in self._listeners:
+                cb(event)
+
+    def __rich__(self):
+        version, tree = self._rendered
+        if version != self._version:
+            from .profile import span
+
+            with span("render", cat="ui"):
+                tree = self.render()
+            self._rendered = (self._version, tree)
+        return tree
 
     def render(self):
+        from rich.tree import Tree
+
         tree = Tree(f"[bold cyan]{self.title}[/bold cyan]", guide_style="grey50")
         for step in self.steps:
             label = step["label"]
@@ -254,6 +209,21 @@ class StepTracker:
 
 
 
+PROGRESS_MODES = ("tree", "json")
+
+
+def json_progress_listener(stream=None):
+    """Tracker listener writing each event as one JSON line (NDJSON) to stream (default: stderr)."""
+    import json
+
+    def emit(event: dict):
+        out = stream or sys.stderr
+        out.write(json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n")
+        out.flush()
+
+    return emit
+
+
 MINI_BANNER = """
 ╔═╗╔═╗╔═╗╔═╗╦╔═╗╦ ╦
 ╚═╗╠═╝║╣ ║  ║╠╣ ╚╦╝
@@ -262,6 +232,8 @@ MINI_BANNER = """
 
 def get_key():
     """Get a single keypress in a cross-platform way using readchar."""
+    import readchar
+
     key = readchar.readkey()
 
     # Arrow keys
@@ -298,6 +270,10 @@ def select_with_arrows(options: dict, prompt_text: str = "Select an option", def
     Returns:
         Selected option key
     """
+    from rich.live import Live
+    from rich.panel import Panel
+    from rich.table import Table
+
     option_keys = list(options.keys())
     if default_key and default_key in option_keys:
         selected_index = option_keys.index(default_key)
@@ -332,7 +308,7 @@ def select_with_arrows(options: dict, prompt_text: str = "Select an option", def
 
     def run_selection_loop():
         nonlocal selected_key, selected_index
-        with Live(create_selection_panel(), console=console, transient=True, auto_refresh=False) as live:
+        with Live(create_selection_panel(), console=console.get(), transient=True, auto_refresh=False) as live:
             while True:
                 try:
                     key = get_key()
@@ -364,19 +340,76 @@ def select_with_arrows(options: dict, prompt_text: str = "Select an option", def
 
 
 
-console = Console()
+class LazyConsole:
+    """Proxy for the shared Rich console that creates it on first use."""
+
+    def __init__(self):
+        self._console = None
+
+    def get(self):
+        if self._console is None:
+            from rich.console import Console
+            self._console = Console()
+        return self._console
+
+    def __getattr__(self, name):
+        return getattr(self.get(), name)
+
 
+console = LazyConsole()
 
-class BannerGroup(TyperGroup):
+
+class VerbatimHelp:
+    """Help text printed as written, so the Examples blocks keep their lines.
+
+    Help goes through click's plain formatter rather than Typer's Rich one
+    (`rich_markup_mode=None`), so `specify --help` doesn't import Rich; click
+    would otherwise re-wrap every docstring into one paragraph.
+    """
+
+    def format_help_text(self, ctx, formatter):
+        text = inspect.cleandoc(self.help or "")
+        if not text:
+            return
+        formatter.write_paragraph()
+        with formatter.indentation():
+            for line in text.splitlines():
+                formatter.write(f"{'':>{formatter.current_indent}}{line}\n" if line.strip() else "\n")
+
+
+class HelpCommand(VerbatimHelp, TyperCommand):
+    pass
+
+
+class HelpGroup(VerbatimHelp, TyperGroup):
+    pass
+
+
+class BannerGroup(HelpGroup):
     """Custom group that shows banner before help."""
 
     def format_help(self, ctx, formatter):
-        # Show banner before help
-        show_banner()
+        # Plain banner: the Rich one would import Rich just to print help
+        width = shutil.get_terminal_size().columns
+        art = BANNER.strip("\n").split("\n")
+        pad = " " * max(0, (width - max(map(len, art))) // 2)
+        for line in art:
+            formatter.write(f"{pad}{line}\n")
+        formatter.write(f"\n{t('tagline').center(width).rstrip()}\n\n")
         super().format_help(ctx, formatter)
 
 
-app = typer.Typer(
+class SpecifyTyper(typer.Typer):
+    """Typer app whose commands and sub-apps print plain, verbatim help."""
+
+    def __init__(self, *, cls=HelpGroup, **kwargs):
+        super().__init__(cls=cls, rich_markup_mode=None, **kwargs)
+
+    def command(self, *args, cls=HelpCommand, **kwargs):
+        return super().command(*args, cls=cls, **kwargs)
+
+
+app = SpecifyTyper(
     name="specify",
     help="Setup tool for Specify spec-driven development projects",
     add_completion=False,
@@ -387,6 +420,9 @@ app = typer.Typer(
 
 def show_banner():
     """Display the ASCII art banner."""
+    from rich.align import Align
+    from rich.text import Text
+
     # Create gradient effect with different colors
     banner_lines = BANNER.strip().split('\n')
     colors = ["bright_blue", "blue", "cyan", "bright_cyan", "white", "bright_white"]
@@ -397,7 +433,7 @@ def show_banner():
         styled_banner.append(line + "\n", style=color)
 
     console.print(Align.center(styled_banner))
-    console.print(Align.center(Text(TAGLINE.get(LANG, TAGLINE["en"]), style="italic bright_yellow")))
+    console.print(Align.center(Text(t('tagline'), style="italic bright_yellow")))
     console.print()
 
 
@@ -413,14 +449,39 @@ def callback(
     else:
         console.print(f"[red]{t('error_invalid_lang', lang=lang)}[/red]")
         raise typer.Exit(1)
+    # Write the trace of a profiled command (--profile or SPECIFY_TRACE) when it ends
+    ctx.call_on_close(finish_profile)
+    # SPECIFY_TRACE=<file>: append this command's spans to a shared trace (see profile.py)
+    if ctx.invoked_subcommand not in (None, "trace") and os.environ.get("SPECIFY_TRACE"):
+        start_profile(ctx.invoked_subcommand)
     # Show banner only when no subcommand and no help flag
     # (help is handled by BannerGroup)
     if ctx.invoked_subcommand is None and "--help" not in sys.argv and "-h" not in sys.argv:
+        from rich.align import Align
+
         show_banner()
         console.print(Align.center(f"[dim]{t('help_usage_hint')}[/dim]"))
         console.print()
 
 
+def start_profile(name: str, output: Path | None = None, fmt: str | None = None):
+    """Trace the current command (see profile.py); `finish_profile` writes the trace.
+
+    `output` and `fmt` come from `--profile` and `--profile-format`.
+    Returns the active tracer.
+    """
+    from . import profile
+
+    return profile.activate(name, output=str(output.resolve()) if output else None, fmt=fmt)
+
+
+def finish_profile():
+    """Write the trace of a profiled run; nothing to do (and nothing imported) otherwise."""
+    profile = sys.modules.get(f"{__name__}.profile")
+    if profile is not None:
+        profile.finish()
+
+
 def run_command(cmd: list[str], check_return: bool = True, capture: bool = False, shell: bool = False) -> Optional[str]:
     """Run a shell command and optionally capture output."""
     try:
@@ -451,103 +512,199 @@ def check_tool(tool: str, install_hint: str) -> bool:
 
 
 def is_git_repo(path: Path = None) -> bool:
-    """Check if the specified path is inside a git repository."""
+    """Check if the specified path is inside a git repository.
+
+    Without a `.git` entry in path or any of its parents (and no GIT_DIR
+    override) the answer is known without spawning git.
+    """
     if path is None:
         path = Path.cwd()
 
     if not path.is_dir():
         return False
 
+    if "GIT_DIR" not in os.environ and not any((p / ".git").exists() for p in (path, *path.parents)):
+        return False
+
     try:
         # Use git command to check if inside a work tree
         subprocess.run(
-            ["git", "rev-parse", "--is-inside-work-tree"],
+            ["git", "-C", str(path), "rev-parse", "--is-inside-work-tree"],
             check=True,
             capture_output=True,
-            cwd=path,
         )
         return True
     except (subprocess.CalledProcessError, FileNotFoundError):
         return False
 
 
-def init_git_repo(project_path: Path, quiet: bool = False) -> bool:
+def init_git_repo(project_path: Path, quiet: bool = False, paths: list[str] | None = None) -> bool:
     """Initialize a git repository in the specified path.
     quiet: if True suppress console output (tracker handles status)
+    paths: files to stage for the initial commit, relative to project_path;
+        all files when None. They are passed to a single `git add` on stdin
+        as literal paths (no glob or `:` magic), so only what the scaffold
+        wrote gets hashed however large the directory is.
     """
+    git = ["git", "-C", str(project_path)]
+    if paths is None:
+        add = [*git, "add", "."]
+        pathspec = None
+    else:
+        add = [*git, "--literal-pathspecs", "add", "--pathspec-from-file=-", "--pathspec-file-nul"]
+        pathspec = "\0".join(paths)
     try:
-        original_cwd = Path.cwd()
-        os.chdir(project_path)
         if not quiet:
             console.print("[cyan]Initializing git repository...[/cyan]")
-        subprocess.run(["git", "init"], check=True, capture_output=True)
-        subprocess.run(["git", "add", "."], check=True, capture_output=True)
-        subprocess.run(["git", "commit", "-m", "Initial commit from Specify template"], check=True, capture_output=True)
+        subprocess.run([*git, "init", "-q"], check=True, capture_output=True)
+        subprocess.run(add, input=pathspec, check=True, capture_output=True, text=True)
+        subprocess.run([*git, "commit", "-q", "-m", "Initial commit from Specify template"], check=True, capture_output=True)
         if not quiet:
             console.print("[green]✓[/green] Git repository initialized")
         return True
 
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
         if not quiet:
             console.print(f"[red]Error initializing git repository:[/red] {e}")
         return False
-    finally:
-        os.chdir(original_cwd)
 
 
-def apply_language_templates(project_path: Path) -> None:
+def apply_language_templates(project_path: Path, *, lang: str | None = None, link_mode: str = "auto") -> None:
     """Copy language-specific templates and README into the project.
 
-    Primary source is packaged resources so installed users get JA files.
-    Falls back to repo-root files for dev checkouts.
+    Files are taken from the locale entries of the resource manifest for
+    `lang` (default: the current UI language). `init` no longer uses this:
+    it resolves locale overlays up front (`scaffold_entries`) so localized
+    files aren't written twice; kept for projects scaffolded in English.
     """
-    if LANG != "ja":
+    lang = lang or LANG
+    if lang == "en":
         return
 
-    dest_templates = project_path / "templates"
-    dest_templates.mkdir(parents=True, exist_ok=True)
+    from .manifest import KIND_FILE, load_manifest, select
+
+    materialize_entries(select(load_manifest(), KIND_FILE, locale=lang), project_path, link_mode=link_mode)
+
+
+# Bounded pool for file materialization; copies are I/O bound, so a few
+# threads per core hide filesystem latency (network mounts in particular).
+COPY_WORKERS = min(16, (os.cpu_count() or 1) * 4)
+
+
+@dataclass
+class CopyStats:
+    """Totals reported by `copy_files`."""
+    files: int = 0
+    bytes: int = 0
+    seconds: float = 0.0
+
+    def summary(self) -> str:
+        elapsed = max(self.seconds, 1e-6)
+        return (
+            f"{self.files} files, {self.bytes / 1024:.0f} KiB, "
+            f"{self.files / elapsed:.0f} files/s, {self.bytes / elapsed / (1024 * 1024):.1f} MiB/s"
+        )
+
+
+def resource_root():
+    """Traversable for the bundled resources (the package directory, or the
+    archive embedded in the single-file build)."""
+    from .bundle import resource_root as bundled_root
 
-    def copy_resource(src, dest: Path) -> None:
-        with src.open("rb") as rf, open(dest, "wb") as wf:
-            shutil.copyfileobj(rf, wf)
+    return bundled_root()
 
-    # 1) Try packaged resources first
-    copied_any = False
+
+@lru_cache(maxsize=None)
+def open_template_store(required: bool = False):
+    """Return the populated per-user template store, or None if it can't be used.
+
+    Bundled resources are read from the package only when the store does not
+    yet hold this template version. The single-file build streams straight
+    from its embedded archive instead, unless `required` (an explicit link
+    mode needs store objects to link from).
+    """
+    from .bundle import resource_archive
+    from .manifest import load_manifest
+    from .store import StoreError, TemplateStore
+
+    if not required and resource_archive() is not None:
+        return None
     try:
-        from importlib.resources import files as ir_files  # Python 3.11+
-
-        res_base = ir_files("specify_cli") / "resources" / "locales" / "ja"
-        res_templates = res_base / "templates"
-        if res_templates.exists():
-            for src in res_templates.iterdir():
-                name = getattr(src, "name", "")
-                dest = dest_templates / name
-                copy_resource(src, dest)
-                copied_any = True
-
-            readme_res = res_base / "README.md"
-            if readme_res.exists():
-                copy_resource(readme_res, project_path / "README.md")
-    except Exception:
-        # Ignore and fall back to repo-based copies below
-        pass
-
-    # 2) Fallback for local dev (repo checkout)
-    if not copied_any:
-        repo_root = Path(__file__).resolve().parents[2]
-        src_templates = repo_root / "locales" / "ja" / "templates"
-        if src_templates.exists():
-            for src in src_templates.glob("*.md"):
-                dest = dest_templates / src.name
-                shutil.copy2(src, dest)
-                copied_any = True
-
-        ja_readme = repo_root / "locales" / "ja" / "README.md"
-        if ja_readme.exists():
-            shutil.copy2(ja_readme, project_path / "README.md")
-
-
-def copy_and_extract_template_from_resources(project_path: Path, ai_assistant: str, is_current_dir: bool = False, *, verbose: bool = True, tracker: StepTracker | None = None) -> Path:
+        return TemplateStore.open(load_manifest())
+    except (OSError, StoreError):
+        return None
+
+
+def resource_source(entry: dict, store=None):
+    """Where to read a manifest entry from: its store object, else the package."""
+    if store is not None:
+        return store.source(entry)
+    return resource_root().joinpath(*entry["path"].split("/"))
+
+
+def plan_copy_jobs(entries: list[dict], project_path: Path, store=None) -> list[tuple]:
+    """Turn manifest entries into (source, destination, executable) copy jobs."""
+    return [
+        (resource_source(e, store), project_path / e["dest"], bool(e["mode"] & 0o111))
+        for e in entries
+    ]
+
+
+def materialize_entries(entries: list[dict], project_path: Path, *, link_mode: str = "auto") -> CopyStats:
+    """Create the files for `entries` in project_path, via the template store when available."""
+    store = open_template_store(required=link_mode != "auto")
+    materialize = store.materializer(link_mode) if store is not None else None
+    return copy_files(plan_copy_jobs(entries, project_path, store), materialize=materialize)
+
+
+def copy_files(files: list[tuple], *, materialize=None, max_workers: int = COPY_WORKERS) -> CopyStats:
+    """Create all destination directories, then copy files on a thread pool.
+
+    Executable bits are applied while each file is still open, so no second
+    pass over the destination is needed. `materialize(src, dest, executable)`
+    replaces the default stream copy (e.g. to link from the template store)
+    and returns the number of bytes written.
+    """
+    from .store import temp_path
+
+    start = time.perf_counter()
+    for d in sorted({dest.parent for _, dest, _ in files}):
+        d.mkdir(parents=True, exist_ok=True)
+
+    set_exec = not sys.platform.startswith("win")
+
+    def copy_one(job) -> int:
+        src, dest, executable = job
+        if materialize is not None:
+            return materialize(src, dest, executable)
+        # Copy to a new file and rename it over dest: dest may be hardlinked
+        # to a template store object, which must not be written through
+        tmp = temp_path(dest)
+        try:
+            with src.open("rb") as rf, open(tmp, "wb") as wf:
+                shutil.copyfileobj(rf, wf)
+                if executable and set_exec:
+                    fd = wf.fileno()
+                    os.fchmod(fd, os.fstat(fd).st_mode | 0o111)
+                size = wf.tell()
+            os.replace(tmp, dest)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return size
+
+    if max_workers > 1 and len(files) > 1:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(files))) as pool:
+            sizes = list(pool.map(copy_one, files))
+    else:
+        sizes = [copy_one(job) for job in files]
+
+    return CopyStats(files=len(files), bytes=sum(sizes), seconds=time.perf_counter() - start)
+
+
+def copy_and_extract_template_from_resources(project_path: Path, ai_assistant, is_current_dir: bool = False, *, verbose: bool = True, tracker: StepTracker | None = None, link_mode: str = "auto", lang: str | None = None, entries: list[dict] | None = None) -> Path:
     """Copy templates and scripts from bundled resources into project_path.
 
     Source is unified (no per-OS duplication) under:
@@ -560,13 +717,15 @@ def copy_and_extract_template_from_resources(project_path: Path, ai_assistant: s
     Destination layout mirrors the release workflow package base:
       - templates -> project_path/templates
       - scripts   -> project_path/scripts
-      - memory    -> project_path/memory  (if available)
+      - memory    -> project_path/memory
+
+    The file list comes from the build-time resource manifest, so no
+    directory walks happen here; everything is copied in one batch from the
+    per-user template store (see `store.py`) using `link_mode`. Files are
+    resolved for `lang` (see `scaffold_entries`; locale-neutral when None)
+    unless the caller passes the `entries` to copy.
     """
-    from importlib.resources import files as ir_files
-    res_base = ir_files("specify_cli") / "resources"
-    src_templates = res_base / "templates"
-    src_scripts = res_base / "scripts"
-    src_memory = res_base / "memory"
+    from . import profile
 
     if not is_current_dir:
         project_path.mkdir(parents=True, exist_ok=True)
@@ -574,62 +733,19 @@ def copy_and_extract_template_from_resources(project_path: Path, ai_assistant: s
     if tracker:
         tracker.start("copy", "resources")
     elif verbose:
-        console.print(f"[cyan]Copying from resources: {res_base}[/cyan]")
-
-    def copy_tree(src_path: Path, dst_path: Path, *, exclude_subpath: Path | None = None):
-        for item in src_path.rglob("*"):
-            if exclude_subpath is not None:
-                try:
-                    # Skip anything under exclude_subpath
-                    item.relative_to(exclude_subpath)
-                    continue
-                except ValueError:
-                    pass
-            rel = item.relative_to(src_path)
-            dest = dst_path / rel
-            if item.is_dir():
-                dest.mkdir(parents=True, exist_ok=True)
-            else:
-                dest.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copy2(item, dest)
+        console.print(f"[cyan]Copying from resources: {resource_root()}[/cyan]")
 
     try:
-        # 1) Templates: copy from templates into project_path/templates (excluding templates/commands)
-        if src_templates.exists():
-            dest_templates = project_path / "templates"
-            commands_sub = src_templates / "commands"
-            copy_tree(Path(src_templates), dest_templates, exclude_subpath=Path(commands_sub))
-
-        # 2) Scripts: copy to project_path/scripts (no OS branching to match release)
-        if src_scripts.exists():
-            dest_scripts = project_path / "scripts"
-            copy_tree(Path(src_scripts), dest_scripts)
-
-            # Make .sh executable on Unix-like platforms
-            if not sys.platform.startswith("win"):
-                for sh in dest_scripts.rglob("*.sh"):
-                    try:
-                        mode = sh.stat().st_mode
-                        sh.chmod(mode | 0o111)
-                    except Exception:
-                        pass
-
-        # 3) Memory: optional copy if available in resources, else fall back to repo root
-        memory_copied = False
-        if src_memory.exists():
-            dest_memory = project_path / "memory"
-            copy_tree(Path(src_memory), dest_memory)
-            memory_copied = True
-        if not memory_copied:
-            # Fallback for local development environment (repo checkout)
-            repo_root = Path(__file__).resolve().parents[2]
-            local_memory = repo_root / "memory"
-            if local_memory.exists():
-                dest_memory = project_path / "memory"
-                copy_tree(local_memory, dest_memory)
+        # Files for every agent (templates/commands are rendered separately)
+        if entries is None:
+            entries = list(scaffold_entries(ai_assistant, lang).values())
+        stats = materialize_entries(entries, project_path, link_mode=link_mode)
+        profile.count(files=stats.files, bytes=stats.bytes)
 
         if tracker:
-            tracker.complete("copy")
+            tracker.complete("copy", stats.summary())
+        elif verbose:
+            console.print(f"[green]✓[/green] Copied {stats.summary()}")
     except Exception as e:
         if tracker:
             tracker.error("copy", str(e))
@@ -643,108 +759,254 @@ def copy_and_extract_template_from_resources(project_path: Path, ai_assistant: s
     return project_path
 
 
-def generate_agent_commands(project_path: Path, ai_assistant: str) -> None:
+def parse_front_matter_and_body(text: str) -> tuple[dict, str]:
+    """Very small YAML front matter parser for 'description' only."""
+    lines = text.splitlines()
+    meta: dict[str, str] = {}
+    body_start = 0
+    if len(lines) >= 3 and lines[0].strip() == "---":
+        # find second '---'
+        for i in range(1, len(lines)):
+            if lines[i].strip() == "---":
+                body_start = i + 1
+                break
+        # parse between 1..i-1
+        for j in range(1, body_start - 1):
+            line = lines[j]
+            if ":" in line:
+                k, v = line.split(":", 1)
+                k = k.strip()
+                v = v.strip().strip('"').strip("'")
+                meta[k] = v
+    else:
+        body_start = 0
+    body = "\n".join(lines[body_start:]).lstrip("\n")
+    return meta, body
+
+
+@lru_cache(maxsize=1)
+def open_command_cache():
+    """Persistent compiled command-template cache (see `command_cache.py`)."""
+    from .command_cache import CommandCache
+    from .store import cache_root
+
+    return CommandCache(cache_root() / "commands")
+
+
+def compile_command_template(name: str, raw: str):
+    """Parse a command template source into a CommandTemplate."""
+    from .command_cache import CommandTemplate, placeholder_offsets
+
+    meta, body = parse_front_matter_and_body(raw)
+    return CommandTemplate(name, meta, body, placeholder_offsets(body))
+
+
+@lru_cache(maxsize=1)
+def load_command_templates() -> tuple:
+    """Compiled command templates, parsed at most once per source hash.
+
+    Templates are looked up in the persistent command cache by their
+    manifest sha256; only misses are read and parsed.
+    """
+    from .manifest import KIND_COMMAND, load_manifest, select
+
+    cache = open_command_cache()
+    store = open_template_store()
+    templates = []
+    for entry in select(load_manifest(), KIND_COMMAND):
+        name = PurePosixPath(entry["path"]).stem
+        template = cache.get(entry["sha256"], name)
+        if template is None:
+            raw = resource_source(entry, store).read_text(encoding="utf-8")
+            template = compile_command_template(name, raw)
+            cache.put(entry["sha256"], template)
+        templates.append(template)
+    return tuple(templates)
+
+
+def render_command(template, ai_assistant: str) -> tuple[str, str]:
+    """Render one compiled command template for one agent: (relative path, content)."""
+    out_dir, suffix, args = AGENT_COMMAND_FORMATS[ai_assistant]
+    name, meta = template.name, template.meta
+    content = template.substitute(args)
+    if ai_assistant == "gemini":
+        desc = meta.get("description", "")
+        content = "\n".join([f"description = \"{desc}\"", "", "prompt = \"\"\"", content, "\"\"\""]) + "\n"
+    elif ai_assistant == "copilot":
+        desc = meta.get("description", "").split(". ")[0].strip()
+        title = f"# {desc}" if desc else "# Prompt"
+        content = "\n".join([title, "", content]) + "\n"
+    return f"{out_dir}/{name}{suffix}", content
+
+
+def render_agent_commands(ai_assistant, commands_dirs=(), *, jobs: int | None = None) -> dict[str, str]:
+    """Render the command templates for one or more agents.
+
+    Returns {project-relative output path: file content}, following the
+    release workflow behavior:
+      - Claude:   `.claude/commands/*.md` (content only)
+      - Gemini:   `.gemini/commands/*.toml` with description + prompt
+      - Copilot:  `.github/prompts/*.prompt.md` with title + content
+
+    Each template is compiled once (see `load_command_templates`) and
+    rendered for every agent in one pass. Templates in `commands_dirs`
+    (resolved directories) are layered over the bundled ones, see
+    `command_library.py`.
+    """
+    from .command_library import layered_templates, render_all
+
+    agents = [ai for ai in as_agents(ai_assistant) if ai in AGENT_COMMAND_FORMATS]
+    templates = load_command_templates()
+    if commands_dirs:
+        templates, _ = layered_templates(templates, list(commands_dirs), jobs=jobs)
+    return render_all(templates, agents)
+
+
+def write_if_changed(path: Path, content: str) -> bool:
+    """Write content to path unless the file already holds exactly that; True if written."""
+    data = content.encode("utf-8")
+    try:
+        # Only read the existing file when the size already matches
+        if path.stat().st_size == len(data) and path.read_bytes() == data:
+            return False
+    except FileNotFoundError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    return True
+
+
+def generate_agent_commands(project_path: Path, ai_assistant) -> list[str]:
     """Generate agent-specific command files from templates/commands.
 
-    Mirrors the release workflow behavior:
-      - Claude:   write to `.claude/commands/*.md` (content only)
-      - Gemini:   write to `.gemini/commands/*.toml` with description + prompt
-      - Copilot:  write to `.github/prompts/*.prompt.md` with title + content
+    `ai_assistant` is anything `as_agents` accepts, so several agents can be
+    generated in one pass. See `render_agent_commands` for the output layout.
+    Outputs whose content is already on disk are not rewritten. Agent-specific
+    files such as GEMINI.md are listed in the resource manifest and copied by
+    `copy_and_extract_template_from_resources`. Returns the paths actually
+    written, relative to project_path.
     """
-    from importlib.resources import files as ir_files
+    return [
+        rel for rel, content in render_agent_commands(ai_assistant).items()
+        if write_if_changed(project_path / rel, content)
+    ]
 
-    res_base = ir_files("specify_cli") / "resources"
-    src_cmds = res_base / "templates" / "commands"
-    if not src_cmds.exists():
-        return
 
-    # Determine output directory and formatting rules
-    if ai_assistant == "claude":
-        out_dir = project_path / ".claude" / "commands"
-        mode = "claude"
-    elif ai_assistant == "gemini":
-        out_dir = project_path / ".gemini" / "commands"
-        mode = "gemini"
-    elif ai_assistant == "copilot":
-        out_dir = project_path / ".github" / "prompts"
-        mode = "copilot"
-    else:
-        return
+def scaffold_entries(ai_assistant, lang: str | None) -> dict[str, dict]:
+    """Manifest entries `init` copies for the agent(s) and language, keyed by destination.
 
-    out_dir.mkdir(parents=True, exist_ok=True)
+    Locale overlays are resolved here, before any I/O: each destination
+    gets its most specific locale variant, so every file is written once.
+    """
+    from .manifest import KIND_FILE, load_manifest, resolve
 
-    def parse_front_matter_and_body(text: str) -> tuple[dict, str]:
-        """Very small YAML front matter parser for 'description' only."""
-        lines = text.splitlines()
-        meta: dict[str, str] = {}
-        body_start = 0
-        if len(lines) >= 3 and lines[0].strip() == "---":
-            # find second '---'
-            for i in range(1, len(lines)):
-                if lines[i].strip() == "---":
-                    body_start = i + 1
-                    break
-            # parse between 1..i-1
-            for j in range(1, body_start - 1):
-                line = lines[j]
-                if ":" in line:
-                    k, v = line.split(":", 1)
-                    k = k.strip()
-                    v = v.strip().strip('"').strip("'")
-                    meta[k] = v
+    return resolve(load_manifest(), KIND_FILE, locale=lang, agents=as_agents(ai_assistant))
+
+
+def scaffold_outputs(ai_assistant, lang: str, commands_dirs=()) -> tuple[dict[str, dict], dict[str, str]]:
+    """Everything `init` produces for the given agent(s) and language.
+
+    Returns the manifest entries to copy keyed by destination (locale
+    variants replace the English file at the same path) and the rendered
+    agent commands keyed by output path.
+    """
+    return scaffold_entries(ai_assistant, lang), render_agent_commands(ai_assistant, commands_dirs)
+
+
+def scaffold_digests(entries: dict[str, dict], commands: dict[str, str]) -> dict[str, str]:
+    """sha256 of every scaffold output, keyed by project-relative path."""
+    import hashlib
+
+    digests = {dest: e["sha256"] for dest, e in entries.items()}
+    for rel, content in commands.items():
+        digests[rel] = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    return digests
+
+
+def write_project_lock(project_path: Path, ai_assistant, lang: str, outputs=None, commands_dirs=None) -> Path:
+    """Record the freshly scaffolded files in `.specify/lock.json` for `specify upgrade`.
+
+    `outputs` is the result of `scaffold_outputs`, computed when not given.
+    `commands_dirs` are the extra command directories as recorded in the lock
+    (see `command_library.record_dirs`).
+    """
+    from .lockfile import write_lock
+    from .manifest import load_manifest
+    from .store import template_version
+
+    digests = scaffold_digests(*(outputs or scaffold_outputs(ai_assistant, lang)))
+    return write_lock(project_path, ai=",".join(as_agents(ai_assistant)), lang=lang, version=template_version(load_manifest()), files=digests,
+                      commands_dirs=commands_dirs)
+
+
+def scaffold_project(
+    project_path: Path,
+    ai_assistant,
+    *,
+    lang: str,
+    here: bool = False,
+    git: bool = True,
+    git_available: bool = True,
+    link_mode: str = "auto",
+    tracker: StepTracker | None = None,
+    commands_dirs=(),
+) -> StepTracker:
+    """Non-interactive core of `init`: copy, localize, generate commands, init git.
+
+    `ai_assistant` may name several agents (see `as_agents`). Command
+    templates in `commands_dirs` (resolved directories) are layered over the
+    bundled ones.
+
+    Progress is reported through the `copy`, `extract` and `git` steps of
+    `tracker` (a detached tracker is used when none is given) and the
+    tracker is returned so callers can inspect the outcome. Files are built
+    in a staging directory and published together, so on failure
+    project_path is left as it was.
+    """
+    from .command_library import record_dirs, write_all
+    from .profile import count, span
+    from .staging import staged
+
+    tracker = tracker or StepTracker(str(project_path))
+    with span("resolve"):
+        entries = scaffold_entries(ai_assistant, lang)
+    # Built aside and published in one step (see staging.py): nothing appears
+    # at project_path until every file is written, and a failure leaves it as it was
+    with staged(project_path, here=here) as build_path:
+        copy_and_extract_template_from_resources(build_path, ai_assistant, True, verbose=False, tracker=tracker, link_mode=link_mode, entries=list(entries.values()))
+
+        # Generate agent-specific commands (mirrors release workflow)
+        tracker.start("extract", "generate agent commands")
+        with span("render-commands"):
+            commands = render_agent_commands(ai_assistant, commands_dirs)
+        with span("write-commands"):
+            for rel in write_all(build_path, commands):
+                count(files=1, bytes=len(commands[rel].encode("utf-8")))
+        outputs = (entries, commands)
+        with span("lock"):
+            lock_path = write_project_lock(build_path, ai_assistant, lang, outputs, record_dirs(list(commands_dirs), project_path))
+            count(files=1, bytes=lock_path.stat().st_size)
+        lock_rel = lock_path.relative_to(build_path).as_posix()
+        tracker.complete("extract", f"commands ready ({open_command_cache().summary()})")
+
+    # Git step
+    if git:
+        tracker.start("git")
+        if is_git_repo(project_path):
+            tracker.complete("git", "existing repo detected")
+        elif git_available:
+            # Stage exactly what the scaffold wrote, not whatever else is in the directory
+            entries, commands = outputs
+            paths = [*entries, *commands, lock_rel]
+            if init_git_repo(project_path, quiet=True, paths=paths):
+                tracker.complete("git", "initialized")
+            else:
+                tracker.error("git", "init failed")
         else:
-            body_start = 0
-        body = "\n".join(lines[body_start:]).lstrip("\n")
-        return meta, body
-
-    for entry in Path(src_cmds).glob("*.md"):
-        with open(entry, "r", encoding="utf-8") as rf:
-            raw = rf.read()
-        meta, body = parse_front_matter_and_body(raw)
-
-        if mode == "claude":
-            # Replace placeholder with $ARGUMENTS
-            content = body.replace("{ARGS}", "$ARGUMENTS")
-            out_path = out_dir / f"{entry.stem}.md"
-            out_path.write_text(content, encoding="utf-8")
-        elif mode == "gemini":
-            content = body.replace("{ARGS}", "{{args}}")
-            lines = []
-            desc = meta.get("description", "")
-            lines.append(f"description = \"{desc}\"")
-            lines.append("")
-            lines.append("prompt = \"\"\"")
-            lines.append(content)
-            lines.append("\"\"\"")
-            out_path = out_dir / f"{entry.stem}.toml"
-            out_path.write_text("\n".join(lines) + "\n", encoding="utf-8")
-        elif mode == "copilot":
-            content = body.replace("{ARGS}", "$ARGUMENTS")
-            desc = meta.get("description", "").split(". ")[0].strip()
-            title = f"# {desc}" if desc else "# Prompt"
-            out_lines = [title, "", content]
-            out_path = out_dir / f"{entry.stem}.prompt.md"
-            out_path.write_text("\n".join(out_lines) + "\n", encoding="utf-8")
-
-    # Optional: If Gemini, copy GEMINI.md if available in resources or repo
-    if ai_assistant == "gemini":
-        # Try packaged resources path first
-        candidates: list[Path] = []
-        try:
-            gemini_md = (ir_files("specify_cli") / "resources" / "agent_templates" / "gemini" / "GEMINI.md")
-            if gemini_md.exists():
-                # type: ignore - importlib.resources Traversable has open(); we need a local Path for uniform handling
-                tmp = project_path / "GEMINI.md"
-                with gemini_md.open("rb") as rf, open(tmp, "wb") as wf:
-                    shutil.copyfileobj(rf, wf)
-                candidates.append(tmp)
-        except Exception:
-            pass
-        if not candidates:
-            repo_root = Path(__file__).resolve().parents[2]
-            local = repo_root / "agent_templates" / "gemini" / "GEMINI.md"
-            if local.exists():
-                shutil.copy2(local, project_path / "GEMINI.md")
+            tracker.skip("git", "git not available")
+    else:
+        tracker.skip("git", "--no-git flag")
+    return tracker
+
 
 # Backward-compatibility shims (disable network path and route to resources)
 def download_template_from_github(ai_assistant: str, download_dir: Path, *, verbose: bool = True, show_progress: bool = True):
@@ -758,10 +1020,17 @@ def download_and_extract_template(project_path: Path, ai_assistant: str, is_curr
 @app.command()
 def init(
     project_name: str = typer.Argument(None, help="Name for your new project directory (optional if using --here)"),
-    ai_assistant: str = typer.Option(None, "--ai", help="AI assistant to use: claude, gemini, or copilot"),
+    ai_assistant: str = typer.Option(None, "--ai", help="AI assistant to use: claude, gemini, copilot, a comma-separated list, or all"),
     ignore_agent_tools: bool = typer.Option(False, "--ignore-agent-tools", help="Skip checks for AI agent tools like Claude Code"),
     no_git: bool = typer.Option(False, "--no-git", help="Skip git repository initialization"),
     here: bool = typer.Option(False, "--here", help="Initialize project in the current directory instead of creating a new one"),
+    link_mode: str = typer.Option("auto", "--link-mode", help="How files are created from the local template store: auto (reflink, else copy), reflink, hardlink or copy. Hardlinked files share data with the store; use only for throwaway projects"),
+    progress: str = typer.Option("tree", "--progress", help="Progress display: tree (live tree) or json (one JSON event per line on stderr, no live rendering)"),
+    yes: bool = typer.Option(False, "--yes", "-y", help="Headless: never prompt (merge into a non-empty directory with --here, default to copilot without --ai) and print one JSON result"),
+    quiet: bool = typer.Option(False, "--quiet", "-q", help="Headless without consent: like --yes, but refuse a non-empty --here directory"),
+    profile_path: Path = typer.Option(None, "--profile", help="Write a trace of this run (time, files, bytes and subprocesses per phase) to this file"),
+    profile_format: str = typer.Option("chrome", "--profile-format", help="Format of the --profile trace: chrome (Chrome trace JSON) or json (flat summary)"),
+    commands_dir: list[Path] = typer.Option(None, "--commands-dir", help="Extra directory of command templates (*.md) layered over the bundled ones; repeatable, later ones win"),
 ):
     """
     Initialize a new Specify project from the bundled template.
@@ -779,21 +1048,63 @@ def init(
         specify init my-project --ai claude
         specify init my-project --ai gemini
         specify init my-project --ai copilot --no-git
+        specify init my-project --ai all
+        specify init my-project --ai claude,gemini
         specify init --ignore-agent-tools my-project
         specify init --here --ai claude
         specify init --here
+        specify init my-project --ai claude --progress json
+        specify init --here --ai claude --yes
+        specify init my-project --ai claude --profile init-trace.json
+        specify init my-project --ai all --commands-dir ~/house-commands
+
+    When stdout isn't a terminal (CI, containers, pipes) init runs headless
+    as with --quiet: no banner, live tree or prompts, just one JSON result.
     """
+    import json
+
+    # Headless: no banner, panels, live tree or prompts; one JSON result on stdout
+    headless = yes or quiet or not sys.stdout.isatty()
+
+    def fail(message: str, hint: str = ""):
+        if headless:
+            print(json.dumps({"status": "error", "error": message}, ensure_ascii=False, separators=(",", ":")))
+        else:
+            console.print(f"[red]{message}[/red]" + (f" {hint}" if hint else ""))
+        raise typer.Exit(1)
+
+    if progress not in PROGRESS_MODES:
+        fail(f"Error: Unknown progress mode '{progress}'", f"Choose from: {', '.join(PROGRESS_MODES)}")
+
+    from . import profile
+
+    if profile_format not in profile.FORMATS:
+        fail(f"Error: Unknown profile format '{profile_format}'", f"Choose from: {', '.join(profile.FORMATS)}")
+    if profile_path:
+        start_profile("init", profile_path, profile_format)
+
     # Show banner first
-    show_banner()
+    if not headless:
+        show_banner()
 
     # Validate arguments
     if here and project_name:
-        console.print(f"[red]{t('error_both_project_and_here')}[/red]")
-        raise typer.Exit(1)
+        fail(t('error_both_project_and_here'))
 
     if not here and not project_name:
-        console.print(f"[red]{t('error_missing_project_or_here')}[/red]")
-        raise typer.Exit(1)
+        fail(t('error_missing_project_or_here'))
+
+    from .store import LINK_MODES
+
+    if link_mode not in LINK_MODES:
+        fail(t('error_invalid_link_mode', mode=link_mode), f"Choose from: {', '.join(LINK_MODES)}")
+
+    from .command_library import CommandLibraryError, resolve_dirs
+
+    try:
+        commands_dirs = resolve_dirs(commands_dir or [], Path.cwd())
+    except CommandLibraryError as e:
+        fail(f"Error: {e}")
 
     # Determine project directory
     if here:
@@ -802,7 +1113,11 @@ def init(
 
         # Check if current directory has any files
         existing_items = list(project_path.iterdir())
-        if existing_items:
+        if existing_items and headless:
+            # Never prompt; --yes is the consent to merge into a non-empty directory
+            if not yes:
+                fail(t('error_dir_not_empty_headless', count=len(existing_items)))
+        elif existing_items:
             console.print(f"[yellow]{t('warning_dir_not_empty', count=len(existing_items))}[/yellow]")
             console.print(f"[yellow]{t('warning_template_overwrite')}[/yellow]")
 
@@ -815,46 +1130,60 @@ def init(
         project_path = Path(project_name).resolve()
         # Check if project directory already exists
         if project_path.exists():
-            console.print(f"[red]{t('error_dir_exists', project_name=project_name)}[/red]")
-            raise typer.Exit(1)
+            fail(t('error_dir_exists', project_name=project_name))
 
-    console.print(Panel.fit(
-        f"[bold cyan]{t('project_setup')}[/bold cyan]\n"
-        f"{t('initializing_here') if here else t('creating_new_project')} [green]{project_path.name}[/green]"
-        + (f"\n[dim]Path: {project_path}[/dim]" if here else ""),
-        border_style="cyan"
-    ))
+    if not headless:
+        from rich.panel import Panel
+
+        console.print(Panel.fit(
+            f"[bold cyan]{t('project_setup')}[/bold cyan]\n"
+            f"{t('initializing_here') if here else t('creating_new_project')} [green]{project_path.name}[/green]"
+            + (f"\n[dim]Path: {project_path}[/dim]" if here else ""),
+            border_style="cyan"
+        ))
 
     # Check git only if we might need it (not --no-git)
     git_available = True
     if not no_git:
-        git_available = check_tool("git", "https://git-scm.com/downloads")
-        if not git_available:
-            console.print(f"[yellow]{t('git_not_found')}[/yellow]")
+        if headless:
+            git_available = shutil.which("git") is not None
+        else:
+            git_available = check_tool("git", TOOLS["git"].install_hint)
+            if not git_available:
+                console.print(f"[yellow]{t('git_not_found')}[/yellow]")
 
     # AI assistant selection
     if ai_assistant:
-        if ai_assistant not in AI_CHOICES:
-            console.print(f"[red]{t('error_invalid_ai', ai=ai_assistant)}[/red] Choose from: {', '.join(AI_CHOICES.keys())}")
-            raise typer.Exit(1)
-        selected_ai = ai_assistant
+        selected_agents = as_agents(ai_assistant)
+        unknown = [ai for ai in selected_agents if ai not in AI_CHOICES]
+        if unknown or not selected_agents:
+            fail(t('error_invalid_ai', ai=', '.join(unknown) or ai_assistant), f"Choose from: {', '.join(AI_CHOICES.keys())}, all")
+    elif headless:
+        # The selector's default
+        selected_agents = ["copilot"]
     else:
         # Use arrow-key selection interface
-        selected_ai = select_with_arrows(
+        selected_agents = [select_with_arrows(
             AI_CHOICES,
             t('ai_prompt'),
             "copilot"
-        )
+        )]
+    selected_ai = ",".join(selected_agents)
 
     # Check agent tools unless ignored
-    if not ignore_agent_tools:
+    if not ignore_agent_tools and headless:
+        # GitHub Copilot check is not needed as it's typically available in supported IDEs
+        missing = [ai for ai in ("claude", "gemini") if ai in selected_agents and not shutil.which(ai)]
+        if missing:
+            fail(t('error_agent_tool_missing', tools=", ".join(missing)))
+    elif not ignore_agent_tools:
         agent_tool_missing = False
-        if selected_ai == "claude":
-            if not check_tool("claude", "Install from: https://docs.anthropic.com/en/docs/claude-code/setup"):
+        if "claude" in selected_agents:
+            if not check_tool("claude", TOOLS["claude"].install_hint):
                 console.print("[red]Error:[/red] Claude CLI is required for Claude Code projects")
                 agent_tool_missing = True
-        elif selected_ai == "gemini":
-            if not check_tool("gemini", "Install from: https://github.com/google-gemini/gemini-cli"):
+        if "gemini" in selected_agents:
+            if not check_tool("gemini", TOOLS["gemini"].install_hint):
                 console.print("[red]Error:[/red] Gemini CLI is required for Gemini projects")
                 agent_tool_missing = True
         # GitHub Copilot check is not needed as it's typically available in supported IDEs
@@ -867,8 +1196,12 @@ def init(
     # Download and set up project
     # New tree-based progress (no emojis); include earlier substeps
     tracker = StepTracker(t('tracker_title'))
-    # Flag to allow suppressing legacy headings
-    sys._specify_tracker_active = True
+    if progress == "json":
+        emit = json_progress_listener()
+        tracker.attach_listener(emit)
+    if profile.active():
+        # Every step becomes a span: copy, extract, git, final
+        tracker.attach_listener(profile.active().step_listener)
     # Pre steps recorded as completed before live rendering
     tracker.add("precheck", t('step_precheck'))
     tracker.complete("precheck", "ok")
@@ -882,45 +1215,58 @@ def init(
     ]:
         tracker.add(key, t(label_key))
 
-    # Use transient so live tree is replaced by the final static render (avoids duplicate output)
-    with Live(tracker.render(), console=console, refresh_per_second=8, transient=True) as live:
-        tracker.attach_refresh(lambda: live.update(tracker.render()))
-        try:
-            copy_and_extract_template_from_resources(project_path, selected_ai, here, verbose=False, tracker=tracker)
-            apply_language_templates(project_path)
-
-            # Generate agent-specific commands (mirrors release workflow)
-            tracker.start("extract", "generate agent commands")
-            generate_agent_commands(project_path, selected_ai)
-            tracker.complete("extract", "commands ready")
-
-            # Git step
-            if not no_git:
-                tracker.start("git")
-                if is_git_repo(project_path):
-                    tracker.complete("git", "existing repo detected")
-                elif git_available:
-                    if init_git_repo(project_path, quiet=True):
-                        tracker.complete("git", "initialized")
-                    else:
-                        tracker.error("git", "init failed")
-                else:
-                    tracker.skip("git", "git not available")
-            else:
-                tracker.skip("git", "--no-git flag")
+    def result(status: str, error: str | None = None) -> dict:
+        # Same shape as an init-batch result
+        return {
+            "project": project_name, "path": str(project_path), "ai": selected_ai, "lang": LANG, "git": not no_git,
+            "status": status, "error": error, "seconds": tracker.elapsed(),
+            "steps": {s["key"]: {"status": s["status"], "detail": s["detail"]} for s in tracker.steps},
+        }
 
+    def run_scaffold():
+        try:
+            scaffold_project(
+                project_path,
+                selected_agents,
+                lang=LANG,
+                here=here,
+                git=not no_git,
+                git_available=git_available,
+                link_mode=link_mode,
+                tracker=tracker,
+                commands_dirs=commands_dirs,
+            )
             tracker.complete("final", "project ready")
-        except Exception as e:
-            tracker.error("final", str(e))
-            if not here and project_path.exists():
-                shutil.rmtree(project_path)
+        except Exception as e:  # includes typer.Exit raised by the copy step
+            failed = [s for s in tracker.steps if s["status"] == "error"]
+            error = (failed[0]["detail"] if failed else "") or str(e) or type(e).__name__
+            tracker.error("final", error)
+            if progress == "json":
+                emit({"event": "done", "status": "error", "project": str(project_path), "error": error, "elapsed": tracker.elapsed()})
+            if headless:
+                print(json.dumps(result("error", error), ensure_ascii=False, separators=(",", ":")))
             raise typer.Exit(1)
-        finally:
-            # Force final render
-            pass
 
-    # Final static tree (ensures finished state visible after Live context ends)
-    console.print(tracker.render())
+    if progress == "json" or headless:
+        run_scaffold()
+        if progress == "json":
+            emit({"event": "done", "status": "ok", "project": str(project_path), "agents": selected_agents, "elapsed": tracker.elapsed()})
+    else:
+        from rich.live import Live
+
+        # The tracker renders itself on Live's refresh ticks, only when a step changed.
+        # Transient, so the live tree is replaced by the final static render
+        with Live(tracker, console=console.get(), refresh_per_second=8, transient=True):
+            run_scaffold()
+
+        # Final static tree (ensures finished state visible after Live context ends)
+        console.print(tracker.render())
+
+    if headless:
+        status = "warning" if any(s["status"] == "error" for s in tracker.steps) else "ok"
+        print(json.dumps(result(status), ensure_ascii=False, separators=(",", ":")))
+        return
+
     console.print(f"\n[bold green]{t('project_ready')}[/bold green]")
 
     # Boxed "Next steps" section
@@ -932,23 +1278,26 @@ def init(
         steps_lines.append(t('next_step_here'))
         step_num = 2
 
-    if selected_ai == "claude":
-        steps_lines.append(f"{step_num}. Open in Visual Studio Code and start using / commands with Claude Code")
-        steps_lines.append("   - Type / in any file to see available commands")
-        steps_lines.append("   - Use /specify to create specifications")
-        steps_lines.append("   - Use /plan to create implementation plans")
-        steps_lines.append("   - Use /tasks to generate tasks")
-    elif selected_ai == "gemini":
-        steps_lines.append(f"{step_num}. Use / commands with Gemini CLI")
-        steps_lines.append("   - Run gemini /specify to create specifications")
-        steps_lines.append("   - Run gemini /plan to create implementation plans")
-        steps_lines.append("   - See GEMINI.md for all available commands")
-    elif selected_ai == "copilot":
-        steps_lines.append(f"{step_num}. Open in Visual Studio Code and use [bold cyan]/specify[/], [bold cyan]/plan[/], [bold cyan]/tasks[/] commands with GitHub Copilot")
-
-    step_num += 1
+    for ai in selected_agents:
+        if ai == "claude":
+            steps_lines.append(f"{step_num}. Open in Visual Studio Code and start using / commands with Claude Code")
+            steps_lines.append("   - Type / in any file to see available commands")
+            steps_lines.append("   - Use /specify to create specifications")
+            steps_lines.append("   - Use /plan to create implementation plans")
+            steps_lines.append("   - Use /tasks to generate tasks")
+        elif ai == "gemini":
+            steps_lines.append(f"{step_num}. Use / commands with Gemini CLI")
+            steps_lines.append("   - Run gemini /specify to create specifications")
+            steps_lines.append("   - Run gemini /plan to create implementation plans")
+            steps_lines.append("   - See GEMINI.md for all available commands")
+        elif ai == "copilot":
+            steps_lines.append(f"{step_num}. Open in Visual Studio Code and use [bold cyan]/specify[/], [bold cyan]/plan[/], [bold cyan]/tasks[/] commands with GitHub Copilot")
+        step_num += 1
+
     steps_lines.append(t('next_step_update_constitution', step_num=step_num))
 
+    from rich.panel import Panel
+
     steps_panel = Panel("\n".join(steps_lines), title=t('next_steps_title'), border_style="cyan", padding=(1,2))
     console.print()  # blank line
     console.print(steps_panel)
@@ -957,25 +1306,783 @@ def init(
 
 
 @app.command()
-def check():
-    """Check that all required tools are installed."""
+def check(
+    json_output: bool = typer.Option(False, "--json", help="Print the probe results as JSON"),
+    versions: bool = typer.Option(False, "--versions", help="Also run each tool to read its version (slower: starts every tool)"),
+    timeout: float = typer.Option(None, "--timeout", help="Seconds to wait for each tool's version with --versions (default: per tool)"),
+    profile_path: Path = typer.Option(None, "--profile", help="Write a trace of the probes to this file"),
+    profile_format: str = typer.Option("chrome", "--profile-format", help="Format of the --profile trace: chrome (Chrome trace JSON) or json (flat summary)"),
+):
+    """Check that all required tools are installed.
+
+    All tools are looked up on PATH concurrently; each probe reports where
+    the tool was found and how long the probe took. With --versions every
+    tool found is also run to read its version.
+    """
+    from .profile import FORMATS
+    from .tools import GROUP_AI, GROUP_OPTIONAL, probe_all
+
+    if profile_format not in FORMATS:
+        console.print(f"[red]Error:[/red] Unknown profile format {profile_format!r}. Choose from: {', '.join(FORMATS)}")
+        raise typer.Exit(1)
+    if profile_path:
+        start_profile("check", profile_path, profile_format)
+
+    start = time.perf_counter()
+    results = probe_all(version=versions, timeout=timeout)
+    elapsed = time.perf_counter() - start
+
+    if json_output:
+        import json
+
+        print(json.dumps({"tools": results, "seconds": round(elapsed, 4)}, indent=2, ensure_ascii=False))
+        return
+
     show_banner()
     console.print(f"[bold]{t('checking_requirements')}[/bold]\n")
 
-    console.print(f"\n[cyan]{t('optional_tools')}[/cyan]")
-    git_ok = check_tool("git", "https://git-scm.com/downloads")
-
-    console.print(f"\n[cyan]{t('optional_ai_tools')}[/cyan]")
-    claude_ok = check_tool("claude", "Install from: https://docs.anthropic.com/en/docs/claude-code/setup")
-    gemini_ok = check_tool("gemini", "Install from: https://github.com/google-gemini/gemini-cli")
+    headings = {GROUP_OPTIONAL: t('optional_tools'), GROUP_AI: t('optional_ai_tools')}
+    for group, heading in headings.items():
+        console.print(f"\n[cyan]{heading}[/cyan]")
+        for r in results:
+            if r["group"] != group:
+                continue
+            timing = f"{r['seconds'] * 1000:.0f} ms"
+            if not r["found"]:
+                console.print(f"[yellow]⚠️  {r['name']} not found[/yellow] [dim]({timing})[/dim]")
+                console.print(f"   Install with: [cyan]{TOOLS[r['name']].install_hint}[/cyan]")
+            elif r["error"]:
+                console.print(f"[green]✓[/green] {r['name']} [yellow]({r['error']})[/yellow] [dim]{r['path']} · {timing}[/dim]")
+            else:
+                version = f" {r['version']}" if r["version"] else ""
+                console.print(f"[green]✓[/green] {r['name']}{version} [dim]{r['path']} · {timing}[/dim]")
 
-    console.print(f"\n[green]{t('cli_ready')}[/green]")
-    if not git_ok:
+    console.print(f"\n[green]{t('cli_ready')}[/green] [dim]({elapsed:.2f}s)[/dim]")
+    found = {r["name"] for r in results if r["found"]}
+    if "git" not in found:
         console.print(f"[yellow]{t('consider_git')}[/yellow]")
-    if not (claude_ok or gemini_ok):
+    if not any(r["found"] for r in results if r["group"] == GROUP_AI):
         console.print(f"[yellow]{t('consider_ai')}[/yellow]")
 
 
+@app.command()
+def trace(
+    trace_file: Path = typer.Argument(None, help="Trace file written through SPECIFY_TRACE (default: $SPECIFY_TRACE)"),
+    output_format: str = typer.Option("json", "--format", "-f", help="Output format: json (flat summary) or chrome (Chrome trace JSON)"),
+    output: Path = typer.Option(None, "--output", "-o", help="Write the report to this file instead of stdout"),
+):
+    """
+    Convert a collected trace into a Chrome trace or a per-span summary.
+
+    With SPECIFY_TRACE=<file> set, every specify command and the bundled
+    scripts append their spans to <file>, so a whole workflow (init, then the
+    scripts the agent runs) is profiled end to end.
+
+    Examples:
+        export SPECIFY_TRACE=/tmp/specify-trace.jsonl
+        specify trace
+        specify trace /tmp/specify-trace.jsonl -f chrome -o trace.json
+    """
+    from .profile import FORMATS, TRACE_ENV, read_events, render, write_report
+
+    if output_format not in FORMATS:
+        console.print(f"[red]Error:[/red] Unknown format {output_format!r}. Choose from: {', '.join(FORMATS)}")
+        raise typer.Exit(1)
+    path = trace_file or os.environ.get(TRACE_ENV)
+    if not path:
+        console.print(f"[red]Error:[/red] No trace file given and {TRACE_ENV} is not set")
+        raise typer.Exit(1)
+    try:
+        events = read_events(str(path))
+    except OSError as e:
+        console.print(f"[red]Error:[/red] Cannot read trace: {e}")
+        raise typer.Exit(1)
+    if output:
+        write_report(str(output), events, output_format)
+    else:
+        sys.stdout.write(render(events, output_format))
+
+
+def warm_batch(ais: list[str]) -> None:
+    """Preload what scaffolding projects for `ais` reads.
+
+    Restores the store objects of their files and loads the compiled
+    command templates; see `run_batch`.
+    """
+    store = open_template_store()
+    if store is not None:
+        for entry in scaffold_entries(",".join(ais), None).values():
+            store.source(entry)
+    load_command_templates()
+
+
+@app.command("init-batch")
+def init_batch(
+    manifest: Path = typer.Argument(..., help="JSON or CSV file listing project, ai, lang and git for each project"),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="Number of worker processes (default: CPU count)"),
+    link_mode: str = typer.Option("auto", "--link-mode", help="How files are created from the local template store: auto, reflink, hardlink or copy"),
+    json_output: bool = typer.Option(False, "--json", help="Print the per-project results as JSON"),
+):
+    """
+    Scaffold many projects in one invocation.
+
+    Runs the same steps as `init` (copy templates, apply language, generate
+    agent commands, initialize git) for every project in the manifest, on a
+    pool of worker processes, without prompts or agent tool checks.
+
+    Examples:
+        specify init-batch projects.json
+        specify init-batch projects.csv --jobs 8 --json
+    """
+    from .batch import BatchManifestError, load_batch_manifest, run_batch, validate
+    from .store import LINK_MODES
+
+    if link_mode not in LINK_MODES:
+        console.print(f"[red]{t('error_invalid_link_mode', mode=link_mode)}[/red] Choose from: {', '.join(LINK_MODES)}")
+        raise typer.Exit(1)
+    try:
+        specs = load_batch_manifest(manifest)
+    except BatchManifestError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+    invalid = validate(specs, AI_CHOICES, TRANSLATIONS, as_agents)
+    valid = [spec for i, spec in enumerate(specs) if i not in invalid]
+
+    ran = iter(run_batch(valid, jobs=jobs, link_mode=link_mode, warm=warm_batch) if valid else [])
+    results = [invalid[i] if i in invalid else next(ran) for i in range(len(specs))]
+
+    if json_output:
+        import json
+
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        from rich.table import Table
+
+        table = Table(title=t('batch_title'), border_style="cyan")
+        for column in ("project", "ai", "lang", "git", "status", "seconds"):
+            table.add_column(column)
+        styles = {"ok": "green", "warning": "yellow", "error": "red"}
+        for r in results:
+            git_detail = r["steps"].get("git", {}).get("detail", "")
+            status = f"[{styles[r['status']]}]{r['status']}[/{styles[r['status']]}]"
+            if r["error"]:
+                status += f" {r['error']}"
+            table.add_row(r["project"], r["ai"], r["lang"], git_detail, status, f"{r['seconds']:.2f}")
+        console.print(table)
+
+    if any(r["status"] == "error" for r in results):
+        raise typer.Exit(1)
+
+
+@app.command()
+def cache(
+    clear: bool = typer.Option(False, "--clear", help="Delete the local template store and the compiled command cache"),
+):
+    """Show or clear the local template store and command template cache."""
+    from .store import default_store_dir
+
+    cmd_cache = open_command_cache()
+    store_dir = default_store_dir()
+    if clear:
+        shutil.rmtree(store_dir, ignore_errors=True)
+        shutil.rmtree(cmd_cache.root, ignore_errors=True)
+        console.print(f"[green]✓[/green] {t('cache_cleared')}")
+        return
+
+    # Load (and count) the bundled templates so hits and misses are visible
+    load_command_templates()
+    objects = sum(1 for p in (store_dir / "objects").glob("*/*") if p.is_file())
+    console.print(f"[cyan]{t('cache_store')}[/cyan] {store_dir} ({objects} objects)")
+    console.print(f"[cyan]{t('cache_commands')}[/cyan] {cmd_cache.root} ({cmd_cache.entries()} entries; {cmd_cache.summary()})")
+
+
+@app.command()
+def pack(
+    ai_assistant: str = typer.Option("all", "--ai", help="Agent(s) to package: a name, a comma-separated list or all"),
+    output_dir: Path = typer.Option(Path("."), "--output", "-o", help="Directory to write the archives to"),
+    release_version: str = typer.Option(None, "--version", help="Version in the archive names, e.g. v0.0.3 (default: the installed CLI version)"),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="Number of archives to build at once (default: CPU count)"),
+    json_output: bool = typer.Option(False, "--json", help="Print the per-archive results as JSON"),
+):
+    """
+    Build the per-agent template release archives.
+
+    Each archive holds what `specify init` would scaffold for that agent
+    (use the global --lang for a localized set), with sorted entries and
+    fixed timestamps so identical sources produce identical zips.
+
+    Examples:
+        specify pack --version v0.0.3 -o dist
+        specify --lang ja pack --ai claude,gemini
+    """
+    from .pack import pack_all
+
+    agents = as_agents(ai_assistant)
+    unknown = [ai for ai in agents if ai not in AI_CHOICES]
+    if unknown or not agents:
+        console.print(f"[red]{t('error_invalid_ai', ai=', '.join(unknown) or ai_assistant)}[/red] Choose from: {', '.join(AI_CHOICES.keys())}, all")
+        raise typer.Exit(1)
+    if release_version is None:
+        try:
+            from importlib.metadata import version
+
+            release_version = f"v{version('specify-cli')}"
+        except Exception:
+            release_version = "dev"
+
+    results = pack_all(agents, lang=LANG, version=release_version, output_dir=output_dir, scaffold_outputs=scaffold_outputs, jobs=jobs)
+
+    if json_output:
+        import json
+
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+    else:
+        from rich.table import Table
+
+        table = Table(title=t('pack_title'), border_style="cyan")
+        for column in ("ai", "archive", "files", "KiB", "seconds"):
+            table.add_column(column)
+        for r in results:
+            if r["error"]:
+                table.add_row(r["ai"], f"[red]error[/red] {r['error']}", "", "", f"{r['seconds']:.2f}")
+            else:
+                table.add_row(r["ai"], r["path"], str(r["files"]), f"{r['bytes'] / 1024:.1f}", f"{r['seconds']:.2f}")
+        console.print(table)
+
+    if any(r["status"] == "error" for r in results):
+        raise typer.Exit(1)
+
+
+agent_context_app = SpecifyTyper(help="Maintain the agent context files (CLAUDE.md, GEMINI.md, .github/copilot-instructions.md)")
+app.add_typer(agent_context_app, name="agent-context")
+
+
+@agent_context_app.command("update")
+def agent_context_update(
+    agents: list[str] = typer.Argument(None, help="Agents to update (claude, gemini, copilot or all); default: every existing context file"),
+):
+    """
+    Update agent context files from the current feature's plan.md.
+
+    Replaces `scripts/update-agent-context.sh`: plan.md is parsed once and
+    each context file is created from templates/agent-file-template.md or
+    merged in place, then written atomically.
+
+    Examples:
+        specify agent-context update
+        specify agent-context update claude gemini
+    """
+    from .agent_context import AGENT_CONTEXT_FILES, select_agents, update_agent_context
+    from .repo import RepoError, current_branch, feature_dir, find_repo_root
+
+    requested = [ai for value in agents or [] for ai in as_agents(value)]
+    unknown = [ai for ai in requested if ai not in AGENT_CONTEXT_FILES]
+    if unknown:
+        console.print(f"[red]{t('error_invalid_ai', ai=', '.join(unknown))}[/red] Choose from: {', '.join(AGENT_CONTEXT_FILES)}, all")
+        raise typer.Exit(1)
+    try:
+        repo_root = find_repo_root()
+    except RepoError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    branch = current_branch(repo_root)
+    plan = feature_dir(repo_root, branch) / "plan.md"
+
+    console.print(f"[cyan]{t('agent_context_title', branch=branch)}[/cyan]")
+    try:
+        tech, results = update_agent_context(repo_root, branch, plan, select_agents(repo_root, requested))
+    except FileNotFoundError:
+        console.print(f"[red]{t('agent_context_no_plan', path=plan)}[/red]")
+        raise typer.Exit(1)
+
+    for r in results:
+        if r["error"]:
+            console.print(f"[red]✗[/red] {r['name']}: {r['error']}")
+        else:
+            console.print(f"[green]✓[/green] {r['name']} context file {r['action']}: {r['path']}")
+    for label, value in (("language", tech.lang), ("framework", tech.framework), ("database", tech.db)):
+        if value:
+            console.print(f"  - Added {label}: {value}")
+
+    if any(r["error"] for r in results):
+        raise typer.Exit(1)
+
+
+feature_app = SpecifyTyper(help="Create and inspect feature specifications under specs/")
+app.add_typer(feature_app, name="feature")
+
+
+@feature_app.command("new")
+def feature_new(
+    description: list[str] = typer.Argument(..., help="Feature description"),
+    json_output: bool = typer.Option(False, "--json", help="Print BRANCH_NAME, SPEC_FILE and FEATURE_NUM as JSON"),
+    branch: bool = typer.Option(True, "--branch/--no-branch", help="Create and check out the feature branch"),
+):
+    """
+    Start a new feature: allocate its number, create the branch, the
+    specs/<branch>/ directory and spec.md from templates/spec-template.md.
+
+    Replaces `scripts/create-new-feature.sh`. Numbers come from an index
+    under specs/ guarded by a file lock, so parallel callers never collide.
+
+    Examples:
+        specify feature new "Photo album sharing"
+        specify feature new --json "Photo album sharing"
+    """
+    from .features import FeatureError, create_feature
+    from .repo import RepoError, find_repo_root
+
+    try:
+        result = create_feature(find_repo_root(), " ".join(description), branch=branch)
+    except (RepoError, FeatureError) as e:
+        print(f"ERROR: {e}", file=sys.stderr)
+        raise typer.Exit(1)
+
+    warning = result.pop("warning")
+    if warning:
+        print(f"Warning: {warning}", file=sys.stderr)
+    if json_output:
+        import json
+
+        print(json.dumps(result, separators=(",", ":")))
+    else:
+        # Legacy key: value format read by the agent commands
+        for key, value in result.items():
+            print(f"{key}: {value}")
+
+
+@app.command()
+def prereqs(
+    json_output: bool = typer.Option(False, "--json", help="Print JSON"),
+    shell: bool = typer.Option(False, "--shell", help="Print shell assignments for eval"),
+    paths_only: bool = typer.Option(False, "--paths-only", help="Only resolve the feature paths (like get-feature-paths.sh), without requiring plan.md"),
+):
+    """
+    Check the current feature's prerequisites and report its documents.
+
+    Drop-in replacement for `scripts/check-task-prerequisites.sh` (and, with
+    --paths-only, `scripts/get-feature-paths.sh`): the repository and branch
+    are resolved once without spawning git and all feature documents are
+    checked in one batch. The bundled scripts keep their own bash
+    implementation (cheaper than starting Python) and only hand off to a
+    running `specify serve`, which answers the same query.
+
+    Examples:
+        specify prereqs --json
+        eval "$(specify prereqs --paths-only --shell)"
+    """
+    from .repo import RepoError, find_repo_root
+    from .workspace import Workspace, report
+
+    try:
+        ws = Workspace(find_repo_root())
+    except RepoError as e:
+        print(f"ERROR: {e}")
+        raise typer.Exit(1)
+    status, output = report(ws, paths_only=paths_only, fmt="json" if json_output else "shell" if shell else "text")
+    print(output)
+    raise typer.Exit(status)
+
+
+@app.command()
+def serve(
+    socket_path: Path = typer.Option(None, "--socket", help="Unix socket to listen on (default: $SPECIFY_SOCKET or specify-<uid>/daemon.sock in the runtime dir)"),
+    idle_timeout: float = typer.Option(1800, "--idle-timeout", help="Exit after this many seconds without requests (0: never)"),
+    stop: bool = typer.Option(False, "--stop", help="Stop the running daemon"),
+    status: bool = typer.Option(False, "--status", help="Show whether a daemon is running"),
+):
+    """
+    Run a local daemon that answers feature path queries from warm state.
+
+    The bundled scripts (via common.sh) ask the daemon for the repository
+    root, branch and feature paths instead of spawning git, and fall back to
+    doing the work themselves when it isn't running.
+
+    Examples:
+        specify serve &
+        specify serve --status
+        specify serve --stop
+    """
+    from .daemon import DaemonError, request, serve as run_server, socket_path as default_socket_path
+
+    path = socket_path or default_socket_path()
+    if stop or status:
+        try:
+            info = request("ping", path=path)["result"]
+        except DaemonError as e:
+            console.print(f"[yellow]{e}[/yellow]")
+            raise typer.Exit(1)
+        if stop:
+            request("shutdown", path=path)
+            console.print(f"[green]✓[/green] Stopped daemon (pid {info['pid']}) on {path}")
+        else:
+            console.print(f"[green]✓[/green] Daemon (pid {info['pid']}) on {path}: up {info['uptime']:.0f}s, {info['requests']} requests")
+            for ws in info["workspaces"]:
+                console.print(f"  {ws}")
+        return
+
+    try:
+        run_server(path, idle_timeout=idle_timeout, ready=lambda p: console.print(f"[cyan]Listening on {p}[/cyan]"))
+    except DaemonError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+
+@app.command()
+def lint(
+    paths: list[Path] = typer.Argument(None, help="Feature directories or files to lint (default: every specs/*/ directory)"),
+    output_format: str = typer.Option("text", "--format", "-f", help="Output format: text, json or sarif"),
+    output: Path = typer.Option(None, "--output", "-o", help="Write the JSON or SARIF report to this file instead of stdout"),
+    rule: list[str] = typer.Option(None, "--rule", "-r", help="Only run this rule (repeatable)"),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="Number of worker processes (default: CPU count)"),
+    no_cache: bool = typer.Option(False, "--no-cache", help="Lint every file, ignoring and not updating specs/.index/lint.json"),
+):
+    """
+    Lint the feature documents under specs/.
+
+    Reports unresolved [NEEDS CLARIFICATION] markers, placeholders left over
+    from the templates and missing mandatory spec sections. Rules can be added
+    by plugins. Results are cached per file by content hash, so only changed
+    documents are linted again. Exits with status 1 when there are errors.
+
+    Examples:
+        specify lint
+        specify lint --format sarif -o lint.sarif
+        specify lint specs/001-photo-albums --rule needs-clarification
+    """
+    from .lint import RULES, load_plugins, lint_repo, to_sarif
+    from .repo import RepoError, find_repo_root
+
+    if output_format not in ("text", "json", "sarif"):
+        console.print(f"[red]Error:[/red] Unknown format {output_format!r}. Choose from: text, json, sarif")
+        raise typer.Exit(1)
+    try:
+        repo_root = find_repo_root()
+    except RepoError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    load_plugins()
+    unknown = [r for r in rule or [] if r not in RULES]
+    if unknown:
+        console.print(f"[red]Error:[/red] Unknown rule {', '.join(unknown)}. Choose from: {', '.join(RULES)}")
+        raise typer.Exit(1)
+
+    start = time.perf_counter()
+    result = lint_repo(repo_root, paths or (), rule_ids=rule, jobs=jobs, use_cache=not no_cache)
+    result["seconds"] = round(time.perf_counter() - start, 4)
+
+    if output_format == "text":
+        from rich.markup import escape
+
+        styles = {"error": "red", "warning": "yellow", "note": "cyan"}
+        for f in result["findings"]:
+            style = styles[f["level"]]
+            console.print(f"{f['path']}:{f['line']}:{f['column']}: [{style}]{f['level']}[/{style}] {escape(f['message'])} [dim]({f['rule']})[/dim]", highlight=False, soft_wrap=True)
+        errors = sum(f["level"] == "error" for f in result["findings"])
+        console.print(
+            f"\n{result['files']} files ({result['linted']} linted, {result['cached']} cached), "
+            f"{errors} errors, {len(result['findings']) - errors} other findings [dim]({result['seconds']:.2f}s)[/dim]"
+        )
+    else:
+        import json
+
+        data = to_sarif(result) if output_format == "sarif" else result
+        text = json.dumps(data, indent=2, ensure_ascii=False)
+        if output:
+            output.write_text(text + "\n", encoding="utf-8")
+        else:
+            print(text)
+
+    if any(f["level"] == "error" for f in result["findings"]):
+        raise typer.Exit(1)
+
+
+@app.command()
+def index(
+    rebuild: bool = typer.Option(False, "--rebuild", help="Drop the index and index every document again"),
+    json_output: bool = typer.Option(False, "--json", help="Print the update counts as JSON"),
+):
+    """
+    Build or update the full-text search index of specs/.
+
+    Indexes spec.md, plan.md, data-model.md and contracts/ of every feature
+    into specs/.index/search.db, section by section. Only new and changed
+    files are read again. `specify search` updates the index itself, so this
+    is only needed to prebuild it (e.g. in CI) or after --rebuild.
+    """
+    from .repo import RepoError, find_repo_root
+    from .search import SearchError, SearchIndex
+
+    try:
+        with SearchIndex(find_repo_root()) as idx:
+            stats = idx.update(rebuild=rebuild)
+    except (RepoError, SearchError) as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+    if json_output:
+        import json
+
+        print(json.dumps(stats, separators=(",", ":")))
+    else:
+        console.print(
+            f"[green]✓[/green] {stats['files']} files: {stats['indexed']} indexed, {stats['touched']} unchanged content, "
+            f"{stats['removed']} removed; {stats['sections']} sections [dim]({stats['seconds']:.2f}s)[/dim]"
+        )
+
+
+@app.command()
+def search(
+    query: list[str] = typer.Argument(..., help="Words to look for"),
+    limit: int = typer.Option(20, "--limit", "-n", help="Maximum number of hits"),
+    match_all: bool = typer.Option(False, "--all", help="Only sections containing every word (default: any word)"),
+    feature: str = typer.Option(None, "--feature", help="Only search this feature directory (e.g. 001-photo-albums)"),
+    json_output: bool = typer.Option(False, "--json", help="Print the hits as JSON"),
+    no_update: bool = typer.Option(False, "--no-update", help="Query the index as it is, without checking specs/ for changes"),
+):
+    """
+    Find the sections of earlier features that mention the given words.
+
+    Hits are ranked (headings count more than body text) and carry the file,
+    section heading, line and byte range, so only the matching part of a
+    document needs to be read.
+
+    Examples:
+        specify search album photo
+        specify search --json --limit 5 "POST /albums"
+    """
+    from .repo import RepoError, find_repo_root
+    from .search import SearchError, SearchIndex
+
+    try:
+        with SearchIndex(find_repo_root()) as idx:
+            if not no_update:
+                idx.update()
+            hits = idx.search(" ".join(query), limit=limit, match_all=match_all, feature=feature)
+    except (RepoError, SearchError) as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+    if json_output:
+        import json
+
+        print(json.dumps(hits, ensure_ascii=False, separators=(",", ":")))
+        return
+    from rich.markup import escape
+
+    for hit in hits:
+        console.print(f"[cyan]{hit['path']}[/cyan]:{hit['line']} [bold]{escape(hit['heading'])}[/bold] [dim]bytes {hit['start']}-{hit['end']} · {hit['score']:.2f}[/dim]", highlight=False, soft_wrap=True)
+        console.print(f"  {escape(hit['snippet'])}", highlight=False, soft_wrap=True)
+    if not hits:
+        console.print("[yellow]No matches[/yellow]")
+
+
+def detect_project_agent(project_path: Path) -> str | None:
+    """Guess the agent(s) of a project scaffolded before lock files existed."""
+    found = [ai for ai, (out_dir, _, _) in AGENT_COMMAND_FORMATS.items() if (project_path / out_dir).is_dir()]
+    return ",".join(found) or None
+
+
+def detect_project_lang(project_path: Path, ai_assistant) -> str:
+    """Guess the template language of a project scaffolded before lock files existed.
+
+    Only files whose content differs between languages are hashed; the
+    language whose variants match the most of them wins, and the current
+    UI language is kept on a tie (e.g. when none of them are present).
+    """
+    from .lockfile import file_sha256
+
+    candidates = {lang: scaffold_entries(ai_assistant, lang) for lang in TRANSLATIONS.languages()}
+    dests = {
+        dest for entries in candidates.values() for dest in entries
+        if len({(c.get(dest) or {}).get("sha256") for c in candidates.values()}) > 1
+    }
+    have = {dest: file_sha256(project_path / dest) for dest in dests if (project_path / dest).is_file()}
+    scores = {
+        lang: sum(1 for dest, sha in have.items() if dest in entries and entries[dest]["sha256"] == sha)
+        for lang, entries in candidates.items()
+    }
+    best = max(scores.values(), default=0)
+    return LANG if scores.get(LANG) == best else max(scores, key=scores.get)
+
+
+@app.command()
+def upgrade(
+    path: Path = typer.Argument(Path("."), help="Project directory to upgrade"),
+    ai_assistant: str = typer.Option(None, "--ai", help="AI assistant(s) the project uses, comma-separated or all (default: from .specify/lock.json)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Report what would change without writing anything"),
+    force: bool = typer.Option(False, "--force", help="Also overwrite files that were modified locally"),
+):
+    """
+    Re-sync an existing project with the current templates.
+
+    Only files that changed upstream are rewritten. Files edited since
+    `specify init` (or the last upgrade) are reported and left alone unless
+    --force is given. Projects without a lock file are compared by content,
+    in the language their existing templates are in.
+
+    Examples:
+        specify upgrade
+        specify upgrade path/to/project --dry-run
+        specify upgrade --ai claude --force
+    """
+    from .lockfile import ADDED, KEPT, MODIFIED, REMOVED, UNCHANGED, UPDATED, plan_upgrade, read_lock, write_lock
+    from .manifest import load_manifest
+    from .store import template_version
+
+    project_path = path.resolve()
+    try:
+        lock = read_lock(project_path)
+    except ValueError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+    selected_ai = ai_assistant or (lock or {}).get("ai") or detect_project_agent(project_path)
+    if not selected_ai:
+        console.print(f"[red]{t('error_upgrade_unknown_ai')}[/red]")
+        raise typer.Exit(1)
+    unknown = [ai for ai in as_agents(selected_ai) if ai not in AI_CHOICES]
+    if unknown:
+        console.print(f"[red]{t('error_invalid_ai', ai=', '.join(unknown))}[/red] Choose from: {', '.join(AI_CHOICES.keys())}, all")
+        raise typer.Exit(1)
+    selected_ai = ",".join(as_agents(selected_ai))
+    lang = lock["lang"] if lock else detect_project_lang(project_path, selected_ai)
+
+    from .command_library import CommandLibraryError, resolve_dirs
+
+    try:
+        commands_dirs = resolve_dirs((lock or {}).get("commands_dirs", []), project_path)
+    except CommandLibraryError as e:
+        console.print(f"[red]Error:[/red] {e} (recorded in .specify/lock.json)")
+        raise typer.Exit(1)
+
+    entries, commands = scaffold_outputs(selected_ai, lang, commands_dirs)
+    desired = scaffold_digests(entries, commands)
+    actions = plan_upgrade(project_path, lock, desired, force=force)
+
+    if not dry_run:
+        to_write = {rel for rel, action in actions.items() if action in (ADDED, UPDATED)}
+        materialize_entries([entries[rel] for rel in to_write if rel in entries], project_path)
+        for rel in to_write:
+            if rel in commands:
+                write_if_changed(project_path / rel, commands[rel])
+        for rel, action in actions.items():
+            if action == REMOVED:
+                (project_path / rel).unlink()
+
+        records = (lock or {}).get("files", {})
+        write_lock(
+            project_path,
+            ai=selected_ai,
+            lang=lang,
+            version=template_version(load_manifest()),
+            files={rel: desired[rel] for rel, action in actions.items() if action in (ADDED, UPDATED, UNCHANGED)},
+            keep={rel: records[rel] for rel, action in actions.items() if action in (MODIFIED, KEPT) and rel in records},
+            commands_dirs=(lock or {}).get("commands_dirs"),
+        )
+
+    styles = {ADDED: "green", UPDATED: "cyan", REMOVED: "yellow", MODIFIED: "red", KEPT: "red"}
+    for rel, action in sorted(actions.items()):
+        if action != UNCHANGED:
+            console.print(f"[{styles[action]}]{action:>9}[/{styles[action]}] {rel}")
+    counts = {action: list(actions.values()).count(action) for action in (ADDED, UPDATED, REMOVED, MODIFIED, KEPT, UNCHANGED)}
+    summary = ", ".join(f"{n} {action}" for action, n in counts.items() if n)
+    console.print(f"{t('upgrade_dry_run') if dry_run else t('upgrade_done')} ({summary or '0 files'})")
+    if counts[MODIFIED] or counts[KEPT]:
+        console.print(f"[yellow]{t('upgrade_modified_hint')}[/yellow]")
+
+
+commands_app = SpecifyTyper(help="Render the agent command files from the bundled and custom command templates")
+app.add_typer(commands_app, name="commands")
+
+
+@commands_app.command("sync")
+def commands_sync(
+    path: Path = typer.Argument(Path("."), help="Project directory"),
+    commands_dir: list[Path] = typer.Option(None, "--commands-dir", "-d", help="Command template directory layered over the bundled ones; repeatable, later ones win (default: the directories in .specify/lock.json)"),
+    bundled_only: bool = typer.Option(False, "--bundled-only", help="Drop the recorded command directories and render only the bundled templates"),
+    ai_assistant: str = typer.Option(None, "--ai", help="AI assistant(s) to render for, comma-separated or all (default: from .specify/lock.json)"),
+    jobs: int = typer.Option(None, "--jobs", "-j", help="Worker threads for reading templates and writing outputs (default: automatic)"),
+    dry_run: bool = typer.Option(False, "--dry-run", help="Report what would change without writing anything"),
+    force: bool = typer.Option(False, "--force", help="Also overwrite or remove command files that were modified locally"),
+    json_output: bool = typer.Option(False, "--json", help="Print the actions, counts and timings as JSON"),
+):
+    """
+    Render the agent commands of a project from the bundled templates plus
+    command directories, removing generated commands that no longer exist.
+
+    Directories are layered in order over the bundled templates: a template
+    with the same file name as an earlier one replaces it. The directories
+    are recorded in .specify/lock.json, so later syncs and `specify upgrade`
+    use them too. Locally edited command files are left alone unless --force.
+
+    Examples:
+        specify commands sync --commands-dir ~/house-commands
+        specify commands sync --dry-run
+        specify commands sync -d shared/commands -d team/commands --json
+    """
+    from .command_library import CommandLibraryError, resolve_dirs, sync_commands
+    from .lockfile import ADDED, KEPT, MODIFIED, REMOVED, UNCHANGED, UPDATED, read_lock
+
+    project_path = path.resolve()
+    try:
+        lock = read_lock(project_path)
+    except ValueError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+    selected_ai = ai_assistant or (lock or {}).get("ai") or detect_project_agent(project_path)
+    if not selected_ai:
+        console.print(f"[red]{t('error_upgrade_unknown_ai')}[/red]")
+        raise typer.Exit(1)
+    agents = as_agents(selected_ai)
+    unknown = [ai for ai in agents if ai not in AI_CHOICES]
+    if unknown:
+        console.print(f"[red]{t('error_invalid_ai', ai=', '.join(unknown))}[/red] Choose from: {', '.join(AI_CHOICES.keys())}, all")
+        raise typer.Exit(1)
+
+    try:
+        if commands_dir:
+            dirs = resolve_dirs(commands_dir, Path.cwd())
+        elif bundled_only:
+            dirs = []
+        else:
+            dirs = resolve_dirs((lock or {}).get("commands_dirs", []), project_path)
+        report = sync_commands(project_path, agents, dirs, lock=lock, jobs=jobs, dry_run=dry_run, force=force)
+    except CommandLibraryError as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+    actions = report["actions"]
+    counts = {action: list(actions.values()).count(action) for action in (ADDED, UPDATED, REMOVED, MODIFIED, KEPT, UNCHANGED)}
+    if json_output:
+        import json
+
+        print(json.dumps({**report, "counts": counts, "dry_run": dry_run}, indent=2, ensure_ascii=False))
+        return
+
+    styles = {ADDED: "green", UPDATED: "cyan", REMOVED: "yellow", MODIFIED: "red", KEPT: "red"}
+    for rel, action in sorted(actions.items()):
+        if action != UNCHANGED:
+            console.print(f"[{styles[action]}]{action:>9}[/{styles[action]}] {rel}")
+    summary = ", ".join(f"{n} {action}" for action, n in counts.items() if n)
+    seconds = report["seconds"]
+    console.print(
+        f"{'Dry run' if dry_run else 'Synced'}: {report['templates']} templates "
+        f"({report['from_dirs']} from command directories, {report['overridden']} overriding bundled), "
+        f"{report['outputs']} outputs ({summary or '0 files'})"
+    )
+    console.print(
+        f"[dim]load {seconds['load'] * 1000:.0f} ms · render {seconds['render'] * 1000:.0f} ms · "
+        f"plan {seconds['plan'] * 1000:.0f} ms · write {seconds['write'] * 1000:.0f} ms · "
+        f"total {seconds['total'] * 1000:.0f} ms[/dim]"
+    )
+    if counts[MODIFIED] or counts[KEPT]:
+        console.print("[yellow]Locally modified command files were left alone; use --force to overwrite or remove them.[/yellow]")
+    if lock is None and not dry_run:
+        console.print("[yellow]No .specify/lock.json: stale commands can't be detected and the directories aren't recorded.[/yellow]")
+
+
 def main():
     app()
 
@@ -0,0 +1,208 @@
+"""
+Agent context files for `specify agent-context update`.
+
+Port of `scripts/update-agent-context.sh`: the current feature's plan.md is
+parsed once and every selected agent file (CLAUDE.md, GEMINI.md,
+.github/copilot-instructions.md) is created from
+`templates/agent-file-template.md` or updated in place, then written
+atomically.
+"""
+
+import os
+import re
+from datetime import date
+from pathlib import Path
+from typing import NamedTuple
+
+# agent -> (context file relative to the repository root, display name)
+AGENT_CONTEXT_FILES = {
+    "claude": ("CLAUDE.md", "Claude Code"),
+    "gemini": ("GEMINI.md", "Gemini CLI"),
+    "copilot": (".github/copilot-instructions.md", "GitHub Copilot"),
+}
+DEFAULT_AGENT = "claude"
+
+TEMPLATE_PATH = "templates/agent-file-template.md"
+MANUAL_START = "<!-- MANUAL ADDITIONS START -->"
+MANUAL_END = "<!-- MANUAL ADDITIONS END -->"
+
+# plan.md field -> PlanTech attribute
+PLAN_FIELDS = {
+    "Language/Version": "lang",
+    "Primary Dependencies": "framework",
+    "Testing": "testing",
+    "Storage": "db",
+    "Project Type": "project_type",
+}
+UNRESOLVED = "NEEDS CLARIFICATION"
+
+
+class PlanTech(NamedTuple):
+    lang: str = ""
+    framework: str = ""
+    testing: str = ""
+    db: str = ""
+    project_type: str = ""
+
+
+def parse_plan(text: str) -> PlanTech:
+    """Technical context fields from plan.md, in a single pass.
+
+    The first `**Field**: value` line of each field wins. Values still marked
+    NEEDS CLARIFICATION (and a Storage of N/A) are treated as empty.
+    """
+    found: dict[str, str] = {}
+    for line in text.splitlines():
+        if not line.startswith("**"):
+            continue
+        field, sep, value = line[2:].partition("**: ")
+        attr = PLAN_FIELDS.get(field)
+        if not sep or attr is None or attr in found:
+            continue
+        value = value.strip()
+        if attr != "project_type" and UNRESOLVED in value:
+            value = ""
+        if attr == "db" and "N/A" in value:
+            value = ""
+        found[attr] = value
+        if len(found) == len(PLAN_FIELDS):
+            break
+    return PlanTech(**found)
+
+
+def commands_for(lang: str) -> str | None:
+    """Build/test commands for a language, or None when we have no suggestion."""
+    if "Python" in lang:
+        return "cd src && pytest && ruff check ."
+    if "Rust" in lang:
+        return "cargo test && cargo clippy"
+    if "JavaScript" in lang or "TypeScript" in lang:
+        return "npm test && npm run lint"
+    return None
+
+
+def render_new(template: str, tech: PlanTech, *, project: str, branch: str, today: str) -> str:
+    """A fresh context file from the agent file template."""
+    structure = "backend/\nfrontend/\ntests/" if "web" in tech.project_type else "src/\ntests/"
+    replacements = {
+        "[PROJECT NAME]": project,
+        "[DATE]": today,
+        "[EXTRACTED FROM ALL PLAN.MD FILES]": f"- {tech.lang} + {tech.framework} ({branch})",
+        "[ACTUAL STRUCTURE FROM PLANS]": structure,
+        "[ONLY COMMANDS FOR ACTIVE TECHNOLOGIES]": commands_for(tech.lang) or f"# Add commands for {tech.lang}",
+        "[LANGUAGE-SPECIFIC, ONLY FOR LANGUAGES IN USE]": f"{tech.lang}: Follow standard conventions",
+        "[LAST 3 FEATURES AND WHAT THEY ADDED]": f"- {branch}: Added {tech.lang} + {tech.framework}",
+    }
+    for placeholder, value in replacements.items():
+        template = template.replace(placeholder, value, 1)
+    return template
+
+
+def update_existing(content: str, tech: PlanTech, *, branch: str, today: str) -> str:
+    """Merge the plan's technologies into an existing context file."""
+    tech_section = re.search(r"## Active Technologies\n(.*?)\n\n", content, re.DOTALL)
+    if tech_section:
+        existing = tech_section.group(1)
+        additions = []
+        if tech.lang and tech.lang not in existing:
+            additions.append(f"- {tech.lang} + {tech.framework} ({branch})")
+        if tech.db and tech.db not in existing:
+            additions.append(f"- {tech.db} ({branch})")
+        if additions:
+            updated = existing + "\n" + "\n".join(additions)
+            content = content.replace(tech_section.group(0), f"## Active Technologies\n{updated}\n\n", 1)
+
+    if tech.project_type == "web" and "frontend/" not in content:
+        content = re.sub(
+            r"(## Project Structure\n```\n)(.*?)(\n```)",
+            lambda m: m.group(1) + m.group(2) + "\nfrontend/src/      # Web UI" + m.group(3),
+            content, count=1, flags=re.DOTALL,
+        )
+
+    commands = commands_for(tech.lang) if tech.lang else None
+    if commands:
+        fenced = re.search(r"(## Commands\n```bash\n)(.*?)(\n```)", content, re.DOTALL)
+        section = fenced or re.search(r"(## Commands\n)(.*?)(\n\n)", content, re.DOTALL)
+        if section and commands not in section.group(2):
+            content = content[:section.start(2)] + section.group(2) + "\n" + commands + content[section.end(2):]
+
+    changes = re.search(r"(## Recent Changes\n)(.*?)(\n\n|$)", content, re.DOTALL)
+    if changes:
+        entries = changes.group(2).strip().split("\n")
+        entries.insert(0, f"- {branch}: Added {tech.lang} + {tech.framework}")
+        content = content[:changes.start(2)] + "\n".join(entries[:3]) + content[changes.end(2):]
+
+    return re.sub(r"Last updated: \d{4}-\d{2}-\d{2}", f"Last updated: {today}", content)
+
+
+def move_manual_additions(original: str, updated: str) -> str:
+    """Keep the user's manual block from original, moved to the end of updated."""
+    lines = original.splitlines(keepends=True)
+    start = next((i for i, line in enumerate(lines) if MANUAL_START in line), None)
+    end = next((i for i, line in enumerate(lines) if MANUAL_END in line), None)
+    if start is None or end is None:
+        return updated
+    block = "".join(lines[start:end + 1])
+    kept, skipping = [], False
+    for line in updated.splitlines(keepends=True):
+        if MANUAL_START in line:
+            skipping = True
+        if not skipping:
+            kept.append(line)
+        if skipping and MANUAL_END in line:
+            skipping = False
+    body = "".join(kept)
+    if body and not body.endswith("\n"):
+        body += "\n"
+    return body + block
+
+
+def atomic_write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(content, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def select_agents(repo_root: Path, agents: list[str]) -> list[str]:
+    """Agents to update: the ones asked for, else every existing context file, else Claude."""
+    if agents:
+        return agents
+    existing = [ai for ai, (rel, _) in AGENT_CONTEXT_FILES.items() if (repo_root / rel).is_file()]
+    return existing or [DEFAULT_AGENT]
+
+
+def update_agent_context(repo_root: Path, branch: str, plan_path: Path, agents: list[str], *, today: str | None = None) -> tuple[PlanTech, list[dict]]:
+    """Update the context files of `agents` from plan_path.
+
+    Returns the parsed plan and one result per agent (agent, name, path,
+    action, error). Raises FileNotFoundError when plan.md is missing.
+    """
+    tech = parse_plan(plan_path.read_text(encoding="utf-8"))
+    today = today or date.today().isoformat()
+    template = None
+    results = []
+    for ai in agents:
+        rel, name = AGENT_CONTEXT_FILES[ai]
+        path = repo_root / rel
+        result = {"agent": ai, "name": name, "path": str(path), "action": None, "error": None}
+        try:
+            original = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            original = None
+        if original is None:
+            if template is None:
+                try:
+                    template = (repo_root / TEMPLATE_PATH).read_text(encoding="utf-8")
+                except FileNotFoundError:
+                    result["error"] = f"Template not found at {repo_root / TEMPLATE_PATH}"
+                    results.append(result)
+                    continue
+            content = render_new(template, tech, project=repo_root.name, branch=branch, today=today)
+            result["action"] = "created"
+        else:
+            content = move_manual_additions(original, update_existing(original, tech, branch=branch, today=today))
+            result["action"] = "updated"
+        atomic_write(path, content)
+        results.append(result)
+    return tech, results
@@ -0,0 +1,146 @@
+"""
+Batch scaffolding for `specify init-batch`.
+
+A batch manifest lists projects to create, either as JSON:
+
+    [{"project": "billing-api", "ai": "claude", "lang": "en", "git": true}, ...]
+
+(or an object with a "projects" list), or as CSV with the header
+`project,ai,lang,git`. `lang` defaults to "en" and `git` to true.
+
+Projects are scaffolded on a process pool. The template store and the
+compiled agent commands are warmed once in the parent, which fills the
+on-disk store and cache, and again in each worker's initializer, so every
+worker loads them once instead of per project whether it was forked (the
+initializer then finds them loaded) or spawned.
+"""
+
+import csv
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+
+_FALSE = {"0", "false", "no", "n", "off", ""}
+
+
+class BatchManifestError(Exception):
+    """Raised for unreadable or invalid batch manifests."""
+
+
+def _as_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() not in _FALSE
+
+
+def load_batch_manifest(path: Path) -> list[dict]:
+    """Read a JSON or CSV batch manifest into normalized project specs."""
+    try:
+        text = path.read_text(encoding="utf-8")
+    except OSError as e:
+        raise BatchManifestError(f"Cannot read {path}: {e}") from e
+
+    if path.suffix.lower() == ".csv":
+        rows = list(csv.DictReader(text.splitlines()))
+    else:
+        try:
+            data = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise BatchManifestError(f"{path} is not valid JSON: {e}") from e
+        rows = data.get("projects") if isinstance(data, dict) else data
+        if not isinstance(rows, list):
+            raise BatchManifestError(f"{path} must contain a list of projects")
+
+    specs = []
+    for i, row in enumerate(rows, 1):
+        if not isinstance(row, dict) or not row.get("project"):
+            raise BatchManifestError(f"Entry {i} in {path} has no project name")
+        if not row.get("ai"):
+            raise BatchManifestError(f"Entry {i} ({row['project']}) in {path} has no ai")
+        specs.append({
+            "project": str(row["project"]).strip(),
+            "ai": str(row["ai"]).strip(),
+            "lang": str(row.get("lang") or "en").strip(),
+            "git": _as_bool(row.get("git", True)),
+        })
+    return specs
+
+
+def validate(specs: list[dict], ai_choices, languages, as_agents) -> dict[int, dict]:
+    """Error results, keyed by manifest position, for specs that can't be scaffolded.
+
+    `as_agents` expands an ai value ("claude,gemini", "all") into agent keys.
+    """
+    errors = {}
+    seen = set()
+    for i, spec in enumerate(specs):
+        path = Path(spec["project"]).resolve()
+        problem = None
+        if any(ai not in ai_choices for ai in as_agents(spec["ai"])) or not as_agents(spec["ai"]):
+            problem = f"invalid AI assistant '{spec['ai']}'"
+        elif spec["lang"] not in languages:
+            problem = f"invalid language '{spec['lang']}'"
+        elif path in seen:
+            problem = "duplicate project"
+        elif path.exists():
+            problem = "directory already exists"
+        seen.add(path)
+        if problem:
+            errors[i] = dict(spec, path=str(path), status="error", error=problem, seconds=0.0, steps={})
+    return errors
+
+
+def scaffold_one(spec: dict, link_mode: str, git_available: bool) -> dict:
+    """Scaffold a single project; never raises, the outcome is in the result."""
+    from . import scaffold_project, StepTracker
+
+    path = Path(spec["project"]).resolve()
+    tracker = StepTracker(spec["project"])
+    start = time.perf_counter()
+    result = dict(spec, path=str(path), status="ok", error=None)
+    try:
+        scaffold_project(
+            path,
+            spec["ai"],
+            lang=spec["lang"],
+            git=spec["git"],
+            git_available=git_available,
+            link_mode=link_mode,
+            tracker=tracker,
+        )
+    except Exception as e:  # includes typer.Exit raised by the copy step
+        failed = [s for s in tracker.steps if s["status"] == "error"]
+        result["status"] = "error"
+        result["error"] = (failed[0]["detail"] if failed else "") or str(e) or type(e).__name__
+    else:
+        if any(s["status"] == "error" for s in tracker.steps):
+            result["status"] = "warning"
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    result["steps"] = {s["key"]: {"status": s["status"], "detail": s["detail"]} for s in tracker.steps}
+    return result
+
+
+def run_batch(specs: list[dict], *, jobs: int | None = None, link_mode: str = "auto", warm=None) -> list[dict]:
+    """Scaffold `specs` on a process pool and return results in manifest order.
+
+    `warm(ais)` preloads the resources the listed agents' projects need. It
+    runs in the parent before the pool starts and as each worker's
+    initializer, so it must be a module-level function and cheap when
+    already warm.
+    """
+    git_available = shutil.which("git") is not None
+    ais = sorted({s["ai"] for s in specs})
+    if warm is not None:
+        warm(ais)
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(specs)))
+    if jobs == 1:
+        return [scaffold_one(spec, link_mode, git_available) for spec in specs]
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=jobs, initializer=warm, initargs=(ais,)) as pool:
+        futures = [pool.submit(scaffold_one, spec, link_mode, git_available) for spec in specs]
+        return [f.result() for f in futures]
@@ -0,0 +1,202 @@
+"""
+Single-file (zipapp) build of the CLI.
+
+`python src/specify_cli/bundle.py` writes `dist/specify.pyz`: an executable
+zip holding `specify_cli`, its dependencies and precompiled bytecode, with
+the whole `specify_cli/resources` tree stored as one compressed archive
+(`specify_cli/resources.zip`). The archive is kept uncompressed inside the
+outer zip so members can be seeked and streamed straight into a project.
+
+At runtime `resource_root()` returns a Traversable over that archive when
+running from the single-file build, and the package directory otherwise, so
+callers never assume resources sit on a real filesystem.
+
+This module only depends on the standard library so it can be run as a
+script from a checkout.
+
+Usage:
+    python src/specify_cli/bundle.py [-o dist/specify.pyz] [--no-deps] [--no-compile]
+    ./dist/specify.pyz init my-project --ai claude
+"""
+
+import argparse
+import importlib.util
+import io
+import marshal
+import os
+import stat
+import subprocess
+import sys
+import tempfile
+import zipfile
+from functools import lru_cache
+from pathlib import Path
+
+ARCHIVE_NAME = "resources.zip"
+PACKAGE = "specify_cli"
+
+# Fixed timestamp for every zip entry (the earliest the format allows) so
+# builds from the same sources are byte-identical
+ZIP_EPOCH = (1980, 1, 1, 0, 0, 0)
+COMPRESS_LEVEL = 9
+
+MAIN_PY = "import sys\nfrom specify_cli import main\n\nsys.exit(main())\n"
+
+
+@lru_cache(maxsize=1)
+def resource_archive():
+    """The embedded resource archive as a zipfile.Path, or None outside the single-file build."""
+    from importlib.resources import files as ir_files
+
+    member = ir_files(PACKAGE) / ARCHIVE_NAME
+    if not member.is_file():
+        return None
+    return zipfile.Path(zipfile.ZipFile(member.open("rb")))
+
+
+def resource_root():
+    """Traversable for the bundled resources: the embedded archive or `specify_cli/resources`."""
+    archive = resource_archive()
+    if archive is not None:
+        return archive
+    from importlib.resources import files as ir_files
+
+    return ir_files(PACKAGE) / "resources"
+
+
+def read_resource(rel: str) -> bytes:
+    """Bytes of a resource given its manifest path (`templates/plan-template.md`)."""
+    return resource_root().joinpath(*rel.split("/")).read_bytes()
+
+
+# --- build -----------------------------------------------------------------
+
+
+def zip_entry(name: str, mode: int = 0o644, compress_type: int = zipfile.ZIP_DEFLATED) -> zipfile.ZipInfo:
+    """ZipInfo with a fixed timestamp and mode, deflated unless told otherwise.
+
+    `writestr(info, ...)` takes the compression from the ZipInfo, not from
+    the ZipFile, so it has to be set here; write it with
+    `compresslevel=COMPRESS_LEVEL`.
+    """
+    info = zipfile.ZipInfo(name, date_time=ZIP_EPOCH)
+    info.external_attr = (stat.S_IFREG | mode) << 16
+    info.create_system = 3  # unix, so the mode above is honoured on extraction
+    info.compress_type = compress_type
+    return info
+
+
+def _tree(root: Path) -> list[tuple[str, Path]]:
+    """(posix relative path, file) pairs under root in sorted order, skipping bytecode caches."""
+    return sorted(
+        (p.relative_to(root).as_posix(), p)
+        for p in root.rglob("*")
+        if p.is_file() and "__pycache__" not in p.parts and p.suffix not in (".pyc", ".pyo")
+    )
+
+
+def build_resource_archive(resources_dir: Path) -> bytes:
+    """Deterministic deflated zip of resources_dir (manifest included)."""
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as zf:
+        for rel, path in _tree(resources_dir):
+            mode = 0o755 if os.access(path, os.X_OK) or rel.endswith(".sh") else 0o644
+            zf.writestr(zip_entry(rel, mode), path.read_bytes(), compresslevel=COMPRESS_LEVEL)
+    return buf.getvalue()
+
+
+def compile_source(source: bytes, name: str) -> bytes | None:
+    """Hash-based (unchecked) .pyc for source, or None if it doesn't compile on this Python.
+
+    zipimport can't write bytecode caches, so without these every run of the
+    zipapp would recompile all modules.
+    """
+    try:
+        code = compile(source, name, "exec", dont_inherit=True)
+    except (SyntaxError, ValueError):
+        return None
+    flags = (0b01).to_bytes(4, "little")  # hash based, source not checked
+    return importlib.util.MAGIC_NUMBER + flags + importlib.util.source_hash(source) + marshal.dumps(code)
+
+
+def install_dependencies(target: Path, requirements: list[str]) -> None:
+    subprocess.run(
+        [sys.executable, "-m", "pip", "install", "--quiet", "--disable-pip-version-check",
+         "--no-compile", "--target", str(target), *requirements],
+        check=True,
+    )
+
+
+def project_metadata(root: Path) -> dict:
+    import tomllib
+
+    with open(root / "pyproject.toml", "rb") as f:
+        return tomllib.load(f)["project"]
+
+
+def build_zipapp(root: Path, output: Path, *, deps: bool = True, compile_bytecode: bool = True,
+                 interpreter: str = "/usr/bin/env python3") -> Path:
+    """Build the single-file CLI from the checkout at root into output."""
+    project = project_metadata(root)
+    package_dir = root / "src" / PACKAGE
+    files: dict[str, tuple[bytes, int]] = {"__main__.py": (MAIN_PY.encode(), 0o644)}
+
+    for rel, path in _tree(package_dir):
+        if rel.split("/", 1)[0] == "resources":
+            continue
+        files[f"{PACKAGE}/{rel}"] = (path.read_bytes(), 0o644)
+    files[f"{PACKAGE}/{ARCHIVE_NAME}"] = (build_resource_archive(package_dir / "resources"), 0o644)
+
+    # Metadata so importlib.metadata.version("specify-cli") works from the zip
+    dist_info = f"{project['name'].replace('-', '_')}-{project['version']}.dist-info"
+    metadata = f"Metadata-Version: 2.1\nName: {project['name']}\nVersion: {project['version']}\n"
+    files[f"{dist_info}/METADATA"] = (metadata.encode(), 0o644)
+
+    with tempfile.TemporaryDirectory(prefix="specify-pyz-") as tmp:
+        if deps and project.get("dependencies"):
+            install_dependencies(Path(tmp), project["dependencies"])
+            for rel, path in _tree(Path(tmp)):
+                if rel.split("/", 1)[0] == "bin":
+                    continue
+                files.setdefault(rel, (path.read_bytes(), 0o644))
+
+    if compile_bytecode:
+        for name, (data, _) in list(files.items()):
+            if name.endswith(".py") and name != "__main__.py":
+                pyc = compile_source(data, name)
+                if pyc is not None:
+                    files[name + "c"] = (pyc, 0o644)
+
+    output.parent.mkdir(parents=True, exist_ok=True)
+    tmp_out = output.with_name(f".{output.name}.tmp")
+    with open(tmp_out, "wb") as f:
+        f.write(f"#!{interpreter}\n".encode())
+        with zipfile.ZipFile(f, "w") as zf:
+            for name in sorted(files):
+                data, mode = files[name]
+                # The nested archive is already compressed and must stay seekable
+                nested = name == f"{PACKAGE}/{ARCHIVE_NAME}"
+                info = zip_entry(name, mode, zipfile.ZIP_STORED if nested else zipfile.ZIP_DEFLATED)
+                zf.writestr(info, data, compresslevel=COMPRESS_LEVEL)
+    os.chmod(tmp_out, 0o755)
+    os.replace(tmp_out, output)
+    return output
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Build the single-file specify CLI")
+    parser.add_argument("-o", "--output", type=Path, default=None, help="output file (default: dist/specify.pyz)")
+    parser.add_argument("--no-deps", action="store_true", help="don't bundle dependencies (they must be importable at runtime)")
+    parser.add_argument("--no-compile", action="store_true", help="don't include precompiled bytecode")
+    parser.add_argument("--python", default="/usr/bin/env python3", help="interpreter for the shebang line")
+    args = parser.parse_args(argv)
+
+    root = Path(__file__).resolve().parents[2]
+    output = args.output or root / "dist" / "specify.pyz"
+    out = build_zipapp(root, output, deps=not args.no_deps, compile_bytecode=not args.no_compile, interpreter=args.python)
+    print(f"{out} ({out.stat().st_size / 1024:.0f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,90 @@
+"""
+Persistent cache of compiled command templates.
+
+A compiled template is the parsed front matter, the body and the offsets of
+every `{ARGS}` placeholder in it. Entries are stored as small JSON files
+under `<cache>/commands/v<PARSER_VERSION>/` and keyed by the sha256 of the
+template source, so a template is parsed again only when its content (or
+the parser) changes. For bundled templates the key comes straight from the
+resource manifest, and a cache hit avoids reading the template at all.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import NamedTuple
+
+# Bump when parse_front_matter_and_body or the compiled layout changes
+PARSER_VERSION = 1
+ARGS_PLACEHOLDER = "{ARGS}"
+
+
+class CommandTemplate(NamedTuple):
+    name: str
+    meta: dict
+    body: str
+    args: tuple[int, ...]  # offsets of ARGS_PLACEHOLDER in body
+
+    def substitute(self, replacement: str) -> str:
+        """Body with every placeholder replaced, using the precomputed offsets."""
+        parts = []
+        prev = 0
+        for offset in self.args:
+            parts.append(self.body[prev:offset])
+            parts.append(replacement)
+            prev = offset + len(ARGS_PLACEHOLDER)
+        parts.append(self.body[prev:])
+        return "".join(parts)
+
+
+def placeholder_offsets(body: str) -> tuple[int, ...]:
+    offsets = []
+    i = body.find(ARGS_PLACEHOLDER)
+    while i != -1:
+        offsets.append(i)
+        i = body.find(ARGS_PLACEHOLDER, i + len(ARGS_PLACEHOLDER))
+    return tuple(offsets)
+
+
+class CommandCache:
+    """On-disk compiled template cache with per-process hit/miss counters."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.dir = root / f"v{PARSER_VERSION}"
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, sha256: str) -> Path:
+        return self.dir / f"{sha256}.json"
+
+    def get(self, sha256: str, name: str) -> CommandTemplate | None:
+        try:
+            with open(self._path(sha256), encoding="utf-8") as f:
+                data = json.load(f)
+            template = CommandTemplate(name, data["meta"], data["body"], tuple(data["args"]))
+        except (OSError, ValueError, KeyError, TypeError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return template
+
+    def put(self, sha256: str, template: CommandTemplate) -> None:
+        data = {"meta": template.meta, "body": template.body, "args": list(template.args)}
+        path = self._path(sha256)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+            os.replace(tmp, path)
+        except OSError:
+            pass  # caching is best effort
+
+    def entries(self) -> int:
+        try:
+            return sum(1 for _ in self.dir.glob("*.json"))
+        except OSError:
+            return 0
+
+    def summary(self) -> str:
+        return f"{self.hits} cached, {self.misses} parsed"
@@ -0,0 +1,198 @@
+"""
+Command libraries: extra command template directories layered over the bundled ones.
+
+`init --commands-dir DIR` and `specify commands sync` read `*.md` command
+templates from each DIR in addition to the bundled `templates/commands`.
+Layers are applied in order, each one over the previous: a template named
+like an earlier one (same file stem) replaces it, so a house library can
+override a bundled prompt. Templates are compiled through the persistent
+command cache (keyed by the sha256 of their source), and reading templates
+and writing outputs are spread over a thread pool once a library is large
+enough for that to pay off.
+
+The directories a project uses are recorded in `.specify/lock.json`
+(relative to the project when inside it), so `specify upgrade` and later
+syncs render the same set. A sync only removes outputs the lock file says
+were generated and that are unmodified; see `lockfile.plan_upgrade`.
+"""
+
+import os
+import time
+from pathlib import Path
+
+# Below this many templates (or outputs) a thread pool costs more than it saves
+PARALLEL_MIN = 64
+
+
+class CommandLibraryError(Exception):
+    """Raised for a missing or unreadable command directory."""
+
+
+def resolve_dirs(dirs, base: Path) -> list[Path]:
+    """Absolute command directories; relative ones are taken from base."""
+    resolved = []
+    for d in dirs:
+        path = Path(d)
+        path = (path if path.is_absolute() else base / path).resolve()
+        if not path.is_dir():
+            raise CommandLibraryError(f"Command directory not found: {path}")
+        resolved.append(path)
+    return resolved
+
+
+def record_dirs(dirs: list[Path], project_path: Path) -> list[str]:
+    """How to record dirs in the lock file: project-relative when inside the project."""
+    recorded = []
+    for d in dirs:
+        try:
+            recorded.append(d.relative_to(project_path.resolve()).as_posix())
+        except ValueError:
+            recorded.append(d.as_posix())
+    return recorded
+
+
+def _map(fn, items: list, jobs: int | None) -> list:
+    if jobs == 1 or len(items) < PARALLEL_MIN:
+        return [fn(item) for item in items]
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(fn, items))
+
+
+def load_layer(directory: Path, *, jobs: int | None = None) -> list:
+    """Compiled templates of one command directory (`*.md`, sorted by name)."""
+    import hashlib
+
+    from . import compile_command_template, open_command_cache
+
+    cache = open_command_cache()
+
+    def load(path: Path):
+        raw = path.read_bytes()
+        sha = hashlib.sha256(raw).hexdigest()
+        template = cache.get(sha, path.stem)
+        if template is None:
+            template = compile_command_template(path.stem, raw.decode("utf-8"))
+            cache.put(sha, template)
+        return template
+
+    try:
+        paths = sorted(p for p in directory.glob("*.md") if p.is_file())
+        return _map(load, paths, jobs)
+    except (OSError, UnicodeDecodeError) as e:
+        raise CommandLibraryError(f"Cannot read command templates in {directory}: {e}") from e
+
+
+def layered_templates(bundled, dirs: list[Path], *, jobs: int | None = None) -> tuple[list, dict[str, str]]:
+    """Bundled templates with each directory layered over them, in order.
+
+    Returns the templates (bundled order first, then new names in layer
+    order) and the source of each name: "bundled" or its directory.
+    """
+    templates = {t.name: t for t in bundled}
+    sources = {name: "bundled" for name in templates}
+    for d in dirs:
+        for template in load_layer(d, jobs=jobs):
+            templates[template.name] = template
+            sources[template.name] = str(d)
+    return list(templates.values()), sources
+
+
+def render_all(templates, agents: list[str]) -> dict[str, str]:
+    """{output path: content} for every template and agent.
+
+    Rendering is a few string joins per output and holds the GIL, so it runs
+    inline: a thread pool only slows it down, and a process pool would spend
+    more on pickling than on rendering. Loading and writing are what scale
+    with the library size, and those are parallel.
+    """
+    from . import render_command
+
+    return dict(render_command(template, ai) for template in templates for ai in agents)
+
+
+def write_all(root: Path, outputs: dict[str, str], *, jobs: int | None = None) -> list[str]:
+    """Write outputs under root, skipping files that already match; returns the paths written."""
+    from . import write_if_changed
+
+    for d in {(root / rel).parent for rel in outputs}:
+        d.mkdir(parents=True, exist_ok=True)
+    written = _map(lambda item: write_if_changed(root / item[0], item[1]), list(outputs.items()), jobs)
+    return [rel for rel, changed in zip(outputs, written) if changed]
+
+
+def is_command_output(rel: str) -> bool:
+    """Whether a project path is where some agent's rendered commands go."""
+    from . import AGENT_COMMAND_FORMATS
+
+    return any(
+        rel.startswith(out_dir + "/") and rel.endswith(suffix) and "/" not in rel[len(out_dir) + 1:]
+        for out_dir, suffix, _ in AGENT_COMMAND_FORMATS.values()
+    )
+
+
+def sync_commands(project_path: Path, agents: list[str], dirs: list[Path], *, lock: dict | None,
+                  jobs: int | None = None, dry_run: bool = False, force: bool = False) -> dict:
+    """Bring a project's rendered commands in line with the bundled templates plus dirs.
+
+    Outputs are planned like `specify upgrade` plans files: new and changed
+    ones are written, stale generated ones removed, and local edits left
+    alone unless force. The lock file is updated with the new outputs and
+    the directory list. Returns the actions per path, counts of templates
+    and overrides, and timings of each phase.
+    """
+    import hashlib
+
+    from . import load_command_templates
+    from .lockfile import ADDED, KEPT, MODIFIED, REMOVED, UNCHANGED, UPDATED, plan_upgrade, write_lock
+
+    timings = {}
+    start = phase = time.perf_counter()
+
+    def lap(name: str):
+        nonlocal phase
+        now = time.perf_counter()
+        timings[name] = round(now - phase, 4)
+        phase = now
+
+    templates, sources = layered_templates(load_command_templates(), dirs, jobs=jobs)
+    lap("load")
+    outputs = render_all(templates, agents)
+    lap("render")
+
+    records = (lock or {}).get("files", {})
+    command_lock = dict(lock or {}, files={rel: r for rel, r in records.items() if is_command_output(rel)})
+    desired = {rel: hashlib.sha256(content.encode("utf-8")).hexdigest() for rel, content in outputs.items()}
+    actions = plan_upgrade(project_path, command_lock, desired, force=force)
+    lap("plan")
+
+    if not dry_run:
+        write_all(project_path, {rel: outputs[rel] for rel, a in actions.items() if a in (ADDED, UPDATED)}, jobs=jobs)
+        for rel, action in actions.items():
+            if action == REMOVED:
+                os.unlink(project_path / rel)
+        if lock is not None:
+            keep = {rel: r for rel, r in records.items() if not is_command_output(rel)}
+            keep.update({rel: records[rel] for rel, a in actions.items() if a in (MODIFIED, KEPT) and rel in records})
+            write_lock(
+                project_path,
+                ai=",".join(agents),
+                lang=lock["lang"],
+                version=lock["version"],
+                files={rel: desired[rel] for rel, a in actions.items() if a in (ADDED, UPDATED, UNCHANGED)},
+                keep=keep,
+                commands_dirs=record_dirs(dirs, project_path),
+            )
+    lap("write")
+    timings["total"] = round(time.perf_counter() - start, 4)
+
+    bundled_names = {t.name for t in load_command_templates()}
+    return {
+        "templates": len(templates),
+        "from_dirs": sum(1 for source in sources.values() if source != "bundled"),
+        "overridden": sum(1 for name in bundled_names if sources[name] != "bundled"),
+        "outputs": len(outputs),
+        "actions": actions,
+        "seconds": timings,
+    }
@@ -0,0 +1,226 @@
+"""
+`specify serve`: answer feature path queries from a warm process.
+
+The server listens on a Unix domain socket in a directory only its user can
+enter (mode 0700), and clients only talk to a socket (not a symlink) owned
+by their own uid without group or other permissions, in such a directory,
+so another local user can't stand in for the daemon. It speaks one JSON
+object per line in each direction:
+
+    -> {"op": "paths", "cwd": "/repo/sub/dir"}
+    <- {"ok": true, "result": {"REPO_ROOT": "/repo", ...}}
+    <- {"ok": false, "error": "ERROR: Not on a feature branch. ..."}
+
+Ops: paths, prereqs, features, report (the output of `specify prereqs`),
+search (`specify search`, with query, limit, all and feature), ping and
+shutdown. One `Workspace` is kept per repository root, so the
+branch and feature list are only re-read after `.git/HEAD` or `specs/`
+change. The bundled scripts talk to the server through
+`scripts/specify-query.py` and fall back to their own implementation when
+it isn't running.
+"""
+
+import json
+import os
+import socket
+import socketserver
+import stat
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from .repo import RepoError, find_repo_root
+from .search import SearchError, SearchIndex
+from .workspace import Workspace, WorkspaceError, report
+
+SOCKET_ENV = "SPECIFY_SOCKET"
+DEFAULT_IDLE_TIMEOUT = 1800  # seconds
+
+
+class DaemonError(Exception):
+    """Raised when the daemon can't be started or reached."""
+
+
+def socket_path() -> Path:
+    """Per-user socket: $SPECIFY_SOCKET, else specify-<uid>/daemon.sock in XDG_RUNTIME_DIR or the temp dir.
+
+    `common.sh` computes the same path.
+    """
+    override = os.environ.get(SOCKET_ENV)
+    if override:
+        return Path(override)
+    base = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or tempfile.gettempdir()
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return Path(base) / f"specify-{uid}" / "daemon.sock"
+
+
+def _check_private(path: Path, kind: str, is_kind) -> None:
+    try:
+        st = os.lstat(path)
+    except FileNotFoundError as e:
+        raise DaemonError(f"No specify daemon at {path}") from e
+    if not is_kind(st.st_mode):
+        raise DaemonError(f"{path} is not a {kind}")
+    if st.st_uid != os.getuid():
+        raise DaemonError(f"{path} is owned by uid {st.st_uid}, not by you")
+    if st.st_mode & 0o077:
+        raise DaemonError(f"{path} is accessible to other users (mode {stat.S_IMODE(st.st_mode):o})")
+
+
+def check_socket(path: Path) -> None:
+    """Raise DaemonError unless path is a private socket of ours in a private directory.
+
+    `scripts/specify-query.py` applies the same rule.
+    """
+    _check_private(path.parent, "directory", stat.S_ISDIR)
+    _check_private(path, "socket", stat.S_ISSOCK)
+
+
+def make_socket_dir(path: Path) -> None:
+    """Create the socket's directory (mode 0700) and check nobody else can use it."""
+    try:
+        path.parent.mkdir(mode=0o700, parents=True)
+    except FileExistsError:
+        pass
+    _check_private(path.parent, "directory", stat.S_ISDIR)
+
+
+def request(op: str, *, cwd: str | None = None, path: Path | None = None, timeout: float = 2.0, **params) -> dict:
+    """Send one request to a running daemon; raises DaemonError when none answers."""
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonError("specify serve needs Unix domain sockets, which this platform lacks")
+    path = path or socket_path()
+    check_socket(path)
+    msg = json.dumps({"op": op, "cwd": cwd or os.getcwd(), **params}).encode("utf-8") + b"\n"
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(timeout)
+            s.connect(str(path))
+            s.sendall(msg)
+            with s.makefile("rb") as f:
+                line = f.readline()
+    except OSError as e:
+        raise DaemonError(f"No specify daemon at {path}: {e}") from e
+    if not line:
+        raise DaemonError(f"The specify daemon at {path} closed the connection")
+    return json.loads(line)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            response = self.server.dispatch(line)
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if self.server.stop_requested:
+                # Only once the client has its answer
+                self.server.stop()
+                return
+
+
+class SpecifyServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, path: Path, *, idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        self.path = path
+        self.idle_timeout = idle_timeout
+        self.started = time.time()
+        self.last_request = time.monotonic()
+        self.requests = 0
+        self.workspaces: dict[Path, Workspace] = {}
+        self._lock = threading.Lock()
+        self.stop_requested = False
+        self._stopping = False
+        super().__init__(str(path), _Handler)
+
+    def workspace(self, cwd: str) -> Workspace:
+        root = find_repo_root(Path(cwd))
+        with self._lock:
+            ws = self.workspaces.get(root)
+            if ws is None:
+                ws = self.workspaces[root] = Workspace(root)
+            return ws
+
+    def dispatch(self, line: bytes) -> dict:
+        self.last_request = time.monotonic()
+        self.requests += 1
+        try:
+            req = json.loads(line)
+            op = req.get("op")
+            if op == "ping":
+                return {"ok": True, "result": {
+                    "pid": os.getpid(), "uptime": round(time.time() - self.started, 3),
+                    "requests": self.requests, "workspaces": sorted(str(p) for p in self.workspaces),
+                }}
+            if op == "shutdown":
+                self.stop_requested = True
+                return {"ok": True, "result": None}
+            ws = self.workspace(req.get("cwd") or os.getcwd())
+            if op == "paths":
+                return {"ok": True, "result": ws.paths()}
+            if op == "prereqs":
+                return {"ok": True, "result": ws.prereqs()}
+            if op == "features":
+                return {"ok": True, "result": ws.features()}
+            if op == "search":
+                with SearchIndex(ws.repo_root) as idx:
+                    idx.update()
+                    hits = idx.search(str(req.get("query", "")), limit=int(req.get("limit", 20)),
+                                      match_all=bool(req.get("all")), feature=req.get("feature"))
+                return {"ok": True, "result": hits}
+            if op == "report":
+                status, output = report(ws, paths_only=bool(req.get("paths_only")), fmt=req.get("format", "text"))
+                return {"ok": True, "result": {"status": status, "output": output}}
+            return {"ok": False, "error": f"ERROR: Unknown op {op!r}"}
+        except (RepoError, WorkspaceError, SearchError) as e:
+            return {"ok": False, "error": str(e)}
+        except Exception as e:  # keep serving other clients
+            return {"ok": False, "error": f"ERROR: {type(e).__name__}: {e}"}
+
+    def stop(self) -> None:
+        if not self._stopping:
+            self._stopping = True
+            # shutdown() waits for serve_forever, so it can't run on the serving thread
+            threading.Thread(target=self.shutdown, daemon=True).start()
+
+    def service_actions(self):
+        if self.idle_timeout and time.monotonic() - self.last_request > self.idle_timeout:
+            self.stop()
+
+
+def serve(path: Path | None = None, *, idle_timeout: float = DEFAULT_IDLE_TIMEOUT, ready=None) -> None:
+    """Run the daemon in the foreground until shutdown, idle timeout or SIGTERM/SIGINT."""
+    import signal
+
+    if not hasattr(socket, "AF_UNIX"):
+        raise DaemonError("specify serve needs Unix domain sockets, which this platform lacks")
+    path = path or socket_path()
+    make_socket_dir(path)
+    if os.path.lexists(path):
+        try:
+            request("ping", path=path, timeout=0.5)
+        except DaemonError:
+            path.unlink()  # stale socket from a daemon that died
+        else:
+            raise DaemonError(f"A specify daemon is already listening on {path}")
+
+    old_umask = os.umask(0o077)
+    try:
+        server = SpecifyServer(path, idle_timeout=idle_timeout)
+    finally:
+        os.umask(old_umask)
+
+    previous = {sig: signal.signal(sig, lambda *_: server.stop()) for sig in (signal.SIGTERM, signal.SIGINT)}
+    try:
+        if ready is not None:
+            ready(path)
+        server.serve_forever(poll_interval=0.5)
+    finally:
+        for sig, handler in previous.items():
+            signal.signal(sig, handler)
+        server.server_close()
+        try:
+            path.unlink()
+        except FileNotFoundError:
+            pass
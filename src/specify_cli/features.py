@@ -0,0 +1,163 @@
+"""
+Feature creation for `specify feature new`.
+
+Feature numbers are allocated from a small index in `specs/.index/`:
+`state.json` records the highest number handed out and the mtime and link
+count of `specs/` at that point. The next number is taken from the index
+without listing `specs/` only while both still match and `state.json` is
+strictly newer than `specs/`, so a directory added in the same mtime tick
+as the index was written isn't missed; otherwise `specs/` is scanned once
+and the index rewritten. The bash fallback of `create-new-feature.sh`
+reads the index by the same newer-than rule. Allocation,
+branch creation and the feature directory all happen while holding
+`specs/.index/lock`, so concurrent callers never get the same number.
+
+`specs/.index/` is local state (other commands keep their caches there
+too) and ignores itself through a `.gitignore` of `*`, so it never ends
+up in a commit.
+"""
+
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+INDEX_DIR = ".index"
+INDEX_FORMAT = 2
+SPEC_TEMPLATE = "templates/spec-template.md"
+
+_LEADING_NUMBER = re.compile(r"^[0-9]+")
+
+
+class FeatureError(Exception):
+    """Raised when a feature can't be created (e.g. the branch already exists)."""
+
+
+@contextmanager
+def file_lock(path: Path):
+    """Exclusive advisory lock on path, held for the duration of the block."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as f:
+        if sys.platform.startswith("win"):
+            import msvcrt
+
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue  # LK_LOCK gives up after ~10s; keep waiting
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def scan_highest(specs_dir: Path) -> int:
+    """Highest leading number among the feature directories (one directory listing)."""
+    highest = 0
+    with os.scandir(specs_dir) as it:
+        for entry in it:
+            m = _LEADING_NUMBER.match(entry.name)
+            if m and entry.is_dir():
+                highest = max(highest, int(m.group()))
+    return highest
+
+
+def make_index_dir(specs_dir: Path) -> Path:
+    """Create `specs/.index/` with its `.gitignore` if needed; returns the directory."""
+    directory = specs_dir / INDEX_DIR
+    ignore = directory / ".gitignore"
+    if not ignore.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        ignore.write_text("*\n", encoding="utf-8")
+    return directory
+
+
+def read_index(specs_dir: Path) -> dict | None:
+    """The index, with the mtime of state.json itself as `written_ns`."""
+    try:
+        with open(specs_dir / INDEX_DIR / "state.json", encoding="utf-8") as f:
+            index = json.load(f)
+            index["written_ns"] = os.fstat(f.fileno()).st_mtime_ns
+    except (OSError, ValueError, TypeError):
+        return None
+    return index if index.get("format") == INDEX_FORMAT else None
+
+
+def write_index(specs_dir: Path, highest: int) -> None:
+    # The index lives in a subdirectory so rewriting it doesn't change the
+    # mtime of specs/ that it records
+    st = os.stat(specs_dir)
+    index = {"format": INDEX_FORMAT, "highest": highest, "mtime_ns": st.st_mtime_ns, "nlink": st.st_nlink}
+    path = specs_dir / INDEX_DIR / "state.json"
+    tmp = path.with_name(f".state.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps(index) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def highest_feature_number(specs_dir: Path) -> int:
+    """Highest allocated number: from the index when specs/ is unchanged, else by scanning."""
+    index = read_index(specs_dir)
+    st = os.stat(specs_dir)
+    if (index is not None and index.get("mtime_ns") == st.st_mtime_ns and index.get("nlink") == st.st_nlink
+            and index["written_ns"] > st.st_mtime_ns):
+        return index["highest"]
+    return scan_highest(specs_dir)
+
+
+def branch_words(description: str) -> str:
+    """First three words of the description as a lowercase, dash separated slug."""
+    slug = re.sub(r"[^a-z0-9]", "-", description.lower())
+    words = [w for w in slug.split("-") if w]
+    return "-".join(words[:3])
+
+
+def create_feature(repo_root: Path, description: str, *, branch: bool = True) -> dict:
+    """Allocate the next feature number, check out its branch and create its spec.
+
+    Returns BRANCH_NAME, SPEC_FILE and FEATURE_NUM (as the script printed
+    them) plus `warning` when the spec template was missing.
+    """
+    specs_dir = repo_root / "specs"
+    with file_lock(make_index_dir(specs_dir) / "lock"):
+        number = highest_feature_number(specs_dir) + 1
+        feature_num = f"{number:03d}"
+        branch_name = f"{feature_num}-{branch_words(description)}"
+
+        if branch:
+            try:
+                subprocess.run(["git", "-C", str(repo_root), "checkout", "-q", "-b", branch_name],
+                               check=True, capture_output=True, text=True)
+            except FileNotFoundError as e:
+                raise FeatureError("git is not installed") from e
+            except subprocess.CalledProcessError as e:
+                raise FeatureError(e.stderr.strip() or f"git checkout -b {branch_name} failed") from e
+
+        feature_dir = specs_dir / branch_name
+        feature_dir.mkdir(parents=True, exist_ok=True)
+        write_index(specs_dir, number)
+
+    spec_file = feature_dir / "spec.md"
+    template = repo_root / SPEC_TEMPLATE
+    warning = None
+    if template.is_file():
+        shutil.copyfile(template, spec_file)
+    else:
+        warning = f"Template not found at {template}"
+        spec_file.touch()
+
+    return {"BRANCH_NAME": branch_name, "SPEC_FILE": str(spec_file), "FEATURE_NUM": feature_num, "warning": warning}
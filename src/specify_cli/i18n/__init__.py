@@ -0,0 +1,74 @@
+"""
+UI message catalogs, one JSON file per language (`en.json`, `ja.json`, ...).
+
+A catalog is read the first time its language is used, so only the
+languages a run actually needs are loaded, and adding a language costs
+nothing at startup. Catalogs are read through the package loader, which
+works both from an installed package and from the single-file build.
+"""
+
+import os
+import re
+from collections.abc import Mapping
+
+DEFAULT_LANG = "en"
+
+_LANG_CODE = re.compile(r"^[a-z]{2,3}(?:-[A-Za-z0-9]{2,8})?$")
+
+
+def _read(lang: str) -> bytes:
+    return __loader__.get_data(os.path.join(os.path.dirname(__file__), f"{lang}.json"))
+
+
+class Catalogs(Mapping):
+    """Read-only mapping of language code -> messages, loaded on first access."""
+
+    def __init__(self):
+        self._loaded: dict[str, dict[str, str]] = {}
+
+    def __getitem__(self, lang: str) -> dict[str, str]:
+        catalog = self._loaded.get(lang)
+        if catalog is None:
+            if not isinstance(lang, str) or not _LANG_CODE.match(lang):
+                raise KeyError(lang)
+            import json
+
+            try:
+                catalog = json.loads(_read(lang))
+            except OSError:
+                raise KeyError(lang) from None
+            self._loaded[lang] = catalog
+        return catalog
+
+    def __contains__(self, lang) -> bool:
+        # Loads the catalog: a language is checked right before it's used
+        try:
+            self[lang]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        return iter(self.languages())
+
+    def __len__(self) -> int:
+        return len(self.languages())
+
+    def languages(self) -> list[str]:
+        """Every shipped language (lists the catalog directory)."""
+        from importlib.resources import files
+
+        return sorted(p.name[:-5] for p in files(__name__).iterdir() if p.name.endswith(".json"))
+
+    def message(self, lang: str, key: str) -> str:
+        """The message for key in lang, falling back to English, then to the key itself."""
+        try:
+            text = self[lang].get(key)
+        except KeyError:
+            text = None
+        if text is None and lang != DEFAULT_LANG:
+            text = self[DEFAULT_LANG].get(key)
+        return key if text is None else text
+
+
+TRANSLATIONS = Catalogs()
@@ -0,0 +1,441 @@
+"""
+`specify lint`: check every document under `specs/*/` against a rule set.
+
+Rules live in `RULES` (see `register_rule`); third-party packages can add
+more through the `specify_cli.lint_rules` entry point group, whose entries
+load to a `Rule` or an iterable of them. The built-in rules report what the
+templates ask the author to resolve:
+
+    needs-clarification   unresolved [NEEDS CLARIFICATION: ...] markers
+    template-placeholder  placeholders left over from the templates
+    mandatory-section     spec sections the template marks *(mandatory)*
+
+Placeholders and mandatory sections are read from the templates themselves
+(the project's `templates/` plus every bundled locale), so customised
+templates are linted against what they actually contain.
+
+Results are cached per file in `specs/.index/lint.json`, keyed by the
+sha256 of the file's content and a signature of the rule set. A file whose
+size and mtime are unchanged is not read at all; otherwise it is read and
+hashed, and only files with new content are linted. Linting runs on a pool
+of worker processes.
+"""
+
+import fnmatch
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple
+
+LINT_FORMAT = 1
+CACHE_FILE = "specs/.index/lint.json"
+ENTRY_POINT_GROUP = "specify_cli.lint_rules"
+TEMPLATE_NAMES = ("spec-template.md", "plan-template.md", "tasks-template.md")
+
+# SARIF result levels, most severe first
+LEVELS = ("error", "warning", "note")
+
+# Below this many files to lint, starting worker processes costs more than it saves
+POOL_THRESHOLD = 32
+
+SARIF_SCHEMA = "https://json.schemastore.org/sarif-2.1.0.json"
+INFORMATION_URI = "https://github.com/elvezjp/spec-kit-ja"
+
+
+class Finding(NamedTuple):
+    rule: str
+    level: str
+    line: int    # 1-based
+    column: int  # 1-based
+    message: str
+
+
+class Rule(NamedTuple):
+    id: str
+    description: str
+    level: str
+    check: Callable  # check(doc: Document, ctx: LintContext) -> Iterable[Finding]
+    patterns: tuple[str, ...] = ("*.md",)  # file names the rule applies to
+    version: int = 1  # bump when the rule's results change, to invalidate cached results
+
+
+RULES: dict[str, Rule] = {}
+
+
+def register_rule(rule: Rule) -> Rule:
+    """Add (or replace) a rule run by `specify lint`."""
+    if rule.level not in LEVELS:
+        raise ValueError(f"Unknown level {rule.level!r} for lint rule {rule.id}")
+    RULES[rule.id] = rule
+    return rule
+
+
+def load_plugins() -> list[str]:
+    """Register the rules of installed plugins; returns their ids."""
+    from importlib.metadata import entry_points
+
+    loaded = []
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        obj = ep.load()
+        for rule in [obj] if isinstance(obj, Rule) else obj:
+            loaded.append(register_rule(rule).id)
+    return loaded
+
+
+# --- documents -------------------------------------------------------------
+
+_FENCE = re.compile(r"^\s*(```|~~~)")
+_INLINE_CODE = re.compile(r"`[^`\n]*`")
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_MANDATORY = re.compile(r"\*\((?:mandatory|必須)\)\*")
+_EMPHASIS_SUFFIX = re.compile(r"\s*\*\([^)]*\)\*\s*$")
+
+
+class Document(NamedTuple):
+    path: str  # relative to the repository root, with / separators
+    text: str
+    lines: tuple[str, ...]
+    prose: tuple[str, ...]  # lines with code blocks emptied and inline code blanked
+
+    @classmethod
+    def parse(cls, path: str, text: str) -> "Document":
+        lines = tuple(text.splitlines())
+        return cls(path, text, lines, tuple(prose_lines(lines)))
+
+    @property
+    def name(self) -> str:
+        return self.path.rsplit("/", 1)[-1]
+
+
+def prose_lines(lines: Iterable[str]) -> list[str]:
+    """Lines outside fenced code blocks with inline code spans blanked out.
+
+    Blanking keeps columns, so findings point at the original text.
+    """
+    out, fenced = [], False
+    for line in lines:
+        if _FENCE.match(line):
+            fenced = not fenced
+            out.append("")
+        elif fenced:
+            out.append("")
+        else:
+            out.append(_INLINE_CODE.sub(lambda m: " " * len(m.group()), line))
+    return out
+
+
+def heading_title(text: str) -> str:
+    """Heading text without a trailing *(mandatory)*-style note, for comparison."""
+    return _EMPHASIS_SUFFIX.sub("", text).strip().casefold()
+
+
+def headings(prose: Iterable[str]) -> list[tuple[int, str]]:
+    """(line number, title) of every ATX heading."""
+    found = []
+    for i, line in enumerate(prose, 1):
+        m = _HEADING.match(line)
+        if m:
+            found.append((i, m.group(2)))
+    return found
+
+
+# --- context ---------------------------------------------------------------
+
+_BRACKETED = re.compile(r"(?<!!)\[([^\[\]\n]+)\](?![(\[:])")
+_NOT_PLACEHOLDERS = {" ", "x", "X", "P"}  # checkboxes and the [P] parallel task marker
+MARKER = "NEEDS CLARIFICATION"
+
+
+def bracketed(line: str) -> Iterable[re.Match]:
+    """`[...]` spans that aren't links, images, checkboxes or task markers."""
+    for m in _BRACKETED.finditer(line):
+        if m.group(1) not in _NOT_PLACEHOLDERS and not m.group(1).startswith(MARKER):
+            yield m
+
+
+class LintContext:
+    """What the rules need from the templates, computed once and shipped to the workers.
+
+    placeholders: every `[...]` placeholder in any template (plus $ARGUMENTS)
+    mandatory: per template language, the section titles marked mandatory
+    known: per template language, every section title (to tell the language of a document)
+    """
+
+    def __init__(self, templates: Iterable[str]):
+        placeholders = {"$ARGUMENTS"}
+        mandatory, known = [], []
+        for text in templates:
+            prose = prose_lines(text.splitlines())
+            for line in prose:
+                placeholders.update(m.group() for m in bracketed(line))
+            titles = headings(prose)
+            required = tuple(heading_title(t) for _, t in titles if _MANDATORY.search(t))
+            if required and required not in mandatory:
+                mandatory.append(required)
+                known.append(frozenset(heading_title(t) for _, t in titles))
+        self.placeholders = frozenset(placeholders)
+        self.mandatory = tuple(mandatory)
+        self.known = tuple(known)
+
+    @classmethod
+    def for_repo(cls, repo_root: Path) -> "LintContext":
+        """Templates of the project (when present) and of every bundled locale."""
+        from .bundle import read_resource
+        from .manifest import load_manifest
+
+        texts = []
+        for name in TEMPLATE_NAMES:
+            try:
+                texts.append((repo_root / "templates" / name).read_text(encoding="utf-8"))
+            except (OSError, UnicodeDecodeError):
+                pass
+        dests = {f"templates/{name}" for name in TEMPLATE_NAMES}
+        for entry in load_manifest()["files"]:
+            if entry["dest"] in dests:
+                texts.append(read_resource(entry["path"]).decode("utf-8"))
+        return cls(texts)
+
+    def signature(self) -> str:
+        data = [sorted(self.placeholders), [list(m) for m in self.mandatory]]
+        return hashlib.sha256(json.dumps(data, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+# --- built-in rules --------------------------------------------------------
+
+_CLARIFICATION = re.compile(r"\[NEEDS CLARIFICATION(?::\s*([^\]\n]*))?\]")
+_FIELD = re.compile(r"^\*\*[^*]+\*\*:\s*(.*)$")
+# The templates' own instructions, not questions left in the document
+_INSTRUCTION_QUESTIONS = {"specific question"}
+
+
+def check_clarifications(doc: Document, ctx: LintContext) -> Iterable[Finding]:
+    for i, line in enumerate(doc.prose, 1):
+        for m in _CLARIFICATION.finditer(line):
+            question = (m.group(1) or "").strip()
+            # A bare [NEEDS CLARIFICATION] is a reference to the marker (checklists)
+            if question and question not in _INSTRUCTION_QUESTIONS:
+                yield Finding("needs-clarification", "warning", i, m.start() + 1, f"Unresolved clarification: {question}")
+        field = _FIELD.match(line)
+        if field and field.group(1).startswith(MARKER):
+            # **Field**: NEEDS CLARIFICATION in plan.md's Technical Context
+            yield Finding("needs-clarification", "warning", i, line.index(MARKER) + 1,
+                          f"Unresolved clarification: {line[2:line.index('**', 2)]}")
+
+
+def check_placeholders(doc: Document, ctx: LintContext) -> Iterable[Finding]:
+    for i, line in enumerate(doc.prose, 1):
+        for m in bracketed(line):
+            if m.group() in ctx.placeholders:
+                yield Finding("template-placeholder", "error", i, m.start() + 1, f"Template placeholder left in place: {m.group()}")
+        col = line.find("$ARGUMENTS")
+        if col >= 0:
+            yield Finding("template-placeholder", "error", i, col + 1, "Template placeholder left in place: $ARGUMENTS")
+
+
+def check_mandatory_sections(doc: Document, ctx: LintContext) -> Iterable[Finding]:
+    if not ctx.mandatory:
+        return
+    titles = {heading_title(t) for _, t in headings(doc.prose)}
+    # Check against the template language the document shares the most headings with
+    best = max(range(len(ctx.mandatory)), key=lambda k: len(titles & ctx.known[k]))
+    for title in ctx.mandatory[best]:
+        if title not in titles:
+            yield Finding("mandatory-section", "error", 1, 1, f"Mandatory section missing: {title}")
+
+
+register_rule(Rule("needs-clarification", "Unresolved [NEEDS CLARIFICATION] markers", "warning", check_clarifications))
+register_rule(Rule("template-placeholder", "Placeholders left over from the templates", "error", check_placeholders))
+register_rule(Rule("mandatory-section", "Sections the spec template marks mandatory", "error", check_mandatory_sections, ("spec.md",)))
+
+
+# --- running ---------------------------------------------------------------
+
+_WORKER: dict = {}
+
+
+def lint_text(path: str, text: str, rules: Iterable[Rule], ctx: LintContext) -> list[Finding]:
+    """Findings of `rules` for one document, sorted by position."""
+    doc = Document.parse(path, text)
+    name = doc.name
+    findings = []
+    for rule in rules:
+        if any(fnmatch.fnmatch(name, p) for p in rule.patterns):
+            findings.extend(rule.check(doc, ctx))
+    return sorted(findings, key=lambda f: (f.line, f.column, f.rule))
+
+
+def _init_worker(rule_ids: list[str], ctx: LintContext) -> None:
+    # Plugins register at import time; load them again under spawn
+    missing = [r for r in rule_ids if r not in RULES]
+    if missing:
+        load_plugins()
+    _WORKER["rules"] = [RULES[r] for r in rule_ids]
+    _WORKER["ctx"] = ctx
+
+
+def _lint_file(job: tuple[str, str, str | None]) -> tuple[str, list[Finding] | None]:
+    """Read and hash one file; lint it unless its content matches the cached hash.
+
+    Returns (sha256, findings) with findings None when the cached ones still apply.
+    """
+    path, rel, cached_sha = job
+    data = Path(path).read_bytes()
+    sha = hashlib.sha256(data).hexdigest()
+    if sha == cached_sha:
+        return sha, None
+    return sha, lint_text(rel, data.decode("utf-8", errors="replace"), _WORKER["rules"], _WORKER["ctx"])
+
+
+def ruleset_signature(rules: Iterable[Rule], ctx: LintContext) -> str:
+    """Cache key of a rule set: rule ids and versions, the templates and the specify version."""
+    try:
+        from importlib.metadata import version
+
+        pkg_version = version("specify-cli")
+    except Exception:
+        pkg_version = "dev"
+    ids = sorted(f"{r.id}@{r.version}:{','.join(r.patterns)}" for r in rules)
+    return hashlib.sha256(json.dumps([LINT_FORMAT, pkg_version, ids, ctx.signature()]).encode("utf-8")).hexdigest()
+
+
+def spec_documents(repo_root: Path, paths: Iterable[Path] = (), patterns: Iterable[str] = ("*.md",)) -> list[str]:
+    """Files under specs/*/ (or under `paths`) whose name matches a pattern, relative and sorted."""
+    patterns = tuple(patterns)
+    roots = list(paths)
+    if not roots and (repo_root / "specs").is_dir():
+        roots = [Path(e.path) for e in os.scandir(repo_root / "specs") if e.is_dir() and not e.name.startswith(".")]
+    found = set()
+    for root in roots:
+        root = Path(root).resolve()
+        if root.is_file():
+            walk = [(str(root.parent), [], [root.name])]
+        else:
+            walk = os.walk(root)
+        for dirpath, dirnames, filenames in walk:
+            dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+            for name in filenames:
+                if any(fnmatch.fnmatch(name, p) for p in patterns):
+                    found.add(os.path.relpath(os.path.join(dirpath, name), repo_root).replace(os.sep, "/"))
+    return sorted(found)
+
+
+def read_cache(path: Path, signature: str) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if cache.get("format") != LINT_FORMAT or cache.get("ruleset") != signature:
+        return {}
+    return cache.get("files", {})
+
+
+def write_cache(path: Path, signature: str, files: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    data = {"format": LINT_FORMAT, "ruleset": signature, "files": files}
+    tmp.write_text(json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def lint_repo(repo_root: Path, paths: Iterable[Path] = (), *, rule_ids: Iterable[str] | None = None,
+              jobs: int | None = None, use_cache: bool = True, cache_path: Path | None = None) -> dict:
+    """Lint the spec documents of a repository.
+
+    Returns {"rules": [...], "files": N, "linted": N, "cached": N,
+    "findings": [{"path", "rule", "level", "line", "column", "message"}]}
+    with findings in path order. Unknown rule ids raise KeyError.
+    """
+    rules = [RULES[r] for r in rule_ids] if rule_ids else list(RULES.values())
+    ctx = LintContext.for_repo(repo_root)
+    signature = ruleset_signature(rules, ctx)
+    cache_path = cache_path or repo_root / CACHE_FILE
+    cached = read_cache(cache_path, signature) if use_cache else {}
+
+    files = spec_documents(repo_root, paths, {p for r in rules for p in r.patterns})
+    results: dict[str, dict] = {}
+    jobs_todo = []
+    for rel in files:
+        st = os.stat(repo_root / rel)
+        entry = cached.get(rel)
+        stamp = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        if entry and entry.get("size") == st.st_size and entry.get("mtime_ns") == st.st_mtime_ns:
+            results[rel] = entry
+        else:
+            results[rel] = {**stamp, "sha256": None, "findings": entry["findings"] if entry else []}
+            jobs_todo.append((str(repo_root / rel), rel, entry.get("sha256") if entry else None))
+
+    workers = max(1, min(jobs or os.cpu_count() or 1, len(jobs_todo) // POOL_THRESHOLD or 1))
+    if workers == 1:
+        _init_worker([r.id for r in rules], ctx)
+        outputs = map(_lint_file, jobs_todo)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=([r.id for r in rules], ctx))
+        outputs = pool.map(_lint_file, jobs_todo, chunksize=max(1, len(jobs_todo) // (workers * 4)))
+
+    linted = 0
+    try:
+        for (_, rel, _), (sha, findings) in zip(jobs_todo, outputs):
+            results[rel]["sha256"] = sha
+            if findings is not None:
+                results[rel]["findings"] = [list(f) for f in findings]
+                linted += 1
+    finally:
+        if workers > 1:
+            pool.shutdown()
+
+    if use_cache and (jobs_todo or (not paths and set(cached) - set(results))):
+        # Keep entries for files outside `paths` so a partial run doesn't evict them
+        kept = {} if not paths else {rel: e for rel, e in cached.items() if (repo_root / rel).is_file()}
+        if cache_path == repo_root / CACHE_FILE:
+            from .features import make_index_dir
+
+            make_index_dir(repo_root / "specs")
+        write_cache(cache_path, signature, {**kept, **results})
+
+    findings = []
+    for rel in files:
+        for rule, level, line, column, message in results[rel]["findings"]:
+            findings.append({"path": rel, "rule": rule, "level": level, "line": line, "column": column, "message": message})
+    return {
+        "rules": [{"id": r.id, "description": r.description, "level": r.level} for r in rules],
+        "files": len(files),
+        "linted": linted,
+        "cached": len(files) - linted,
+        "findings": findings,
+    }
+
+
+def to_sarif(result: dict, *, version: str | None = None) -> dict:
+    """A SARIF 2.1.0 log for a `lint_repo` result; paths are relative to %SRCROOT%."""
+    driver = {
+        "name": "specify lint",
+        "informationUri": INFORMATION_URI,
+        "rules": [
+            {"id": r["id"], "shortDescription": {"text": r["description"]}, "defaultConfiguration": {"level": r["level"]}}
+            for r in result["rules"]
+        ],
+    }
+    if version:
+        driver["version"] = version
+    index = {r["id"]: i for i, r in enumerate(result["rules"])}
+    results = [
+        {
+            "ruleId": f["rule"],
+            "ruleIndex": index[f["rule"]],
+            "level": f["level"],
+            "message": {"text": f["message"]},
+            "locations": [{
+                "physicalLocation": {
+                    "artifactLocation": {"uri": f["path"], "uriBaseId": "%SRCROOT%"},
+                    "region": {"startLine": f["line"], "startColumn": f["column"]},
+                },
+            }],
+        }
+        for f in result["findings"]
+    ]
+    return {"$schema": SARIF_SCHEMA, "version": "2.1.0", "runs": [{"tool": {"driver": driver}, "results": results}]}
@@ -0,0 +1,116 @@
+"""
+Per-project lock file recording what `specify init` wrote.
+
+`.specify/lock.json` stores the agent, language and template version a
+project was scaffolded with, plus size, mtime and sha256 of every file the
+scaffold produced. `specify upgrade` compares it against the current
+templates: files whose size and mtime still match the lock are known to be
+untouched without reading them, so only changed upstream files are
+rewritten and user edits are left alone.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+LOCK_PATH = ".specify/lock.json"
+LOCK_FORMAT = 1
+
+# Upgrade actions
+ADDED = "added"          # new upstream file, written
+UPDATED = "updated"      # changed upstream, file was untouched, rewritten
+UNCHANGED = "unchanged"  # nothing to do
+MODIFIED = "modified"    # edited locally and changed upstream; left alone
+REMOVED = "removed"      # dropped upstream, file was untouched, deleted
+KEPT = "kept"            # edited locally, unchanged or dropped upstream; left alone
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def read_lock(project_path: Path) -> dict | None:
+    try:
+        with open(project_path / LOCK_PATH, encoding="utf-8") as f:
+            lock = json.load(f)
+    except FileNotFoundError:
+        return None
+    if lock.get("format") != LOCK_FORMAT:
+        raise ValueError(f"Unsupported lock file format in {LOCK_PATH}: {lock.get('format')!r}")
+    return lock
+
+
+def write_lock(project_path: Path, *, ai: str, lang: str, version: str, files: dict[str, str], keep: dict[str, dict] | None = None,
+               commands_dirs: list[str] | None = None) -> Path:
+    """Record `files` ({relative path: sha256}) with their current size and mtime.
+
+    Records in `keep` are stored as-is (locally modified files keep the
+    baseline they diverged from). `commands_dirs` are the extra command
+    template directories the commands were rendered from.
+    """
+    records = dict(keep or {})
+    for rel, sha in files.items():
+        st = os.stat(project_path / rel)
+        records[rel] = {"sha256": sha, "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+    records = dict(sorted(records.items()))
+    lock = {"format": LOCK_FORMAT, "version": version, "ai": ai, "lang": lang, "files": records}
+    if commands_dirs:
+        lock["commands_dirs"] = list(commands_dirs)
+    path = project_path / LOCK_PATH
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(lock, indent=1) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+    return path
+
+
+def current_sha256(path: Path, record: dict | None) -> str | None:
+    """sha256 of path, or None if missing; skips hashing when stat matches the lock."""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if record and st.st_size == record["size"] and st.st_mtime_ns == record["mtime_ns"]:
+        return record["sha256"]
+    return file_sha256(path)
+
+
+def plan_upgrade(project_path: Path, lock: dict | None, desired: dict[str, str], *, force: bool = False) -> dict[str, str]:
+    """Decide what to do with each file.
+
+    `desired` maps relative path -> sha256 of the current template output.
+    A locally edited file is MODIFIED when upstream changed it too and KEPT
+    when only the user did (nothing to merge). Without a lock every
+    existing file that differs from the templates is treated as MODIFIED.
+    With force=True local edits are overwritten (or deleted, for files
+    dropped upstream).
+    Returns {relative path: action}.
+    """
+    records = (lock or {}).get("files", {})
+    actions: dict[str, str] = {}
+    for rel, want in desired.items():
+        record = records.get(rel)
+        have = current_sha256(project_path / rel, record)
+        if have == want:
+            actions[rel] = UNCHANGED
+        elif have is None:
+            actions[rel] = ADDED
+        elif force or (record is not None and have == record["sha256"]):
+            actions[rel] = UPDATED
+        elif record is not None and want == record["sha256"]:
+            actions[rel] = KEPT
+        else:
+            actions[rel] = MODIFIED
+    for rel, record in records.items():
+        if rel in desired:
+            continue
+        have = current_sha256(project_path / rel, record)
+        if have is None:
+            continue
+        actions[rel] = REMOVED if force or have == record["sha256"] else KEPT
+    return actions
@@ -0,0 +1,166 @@
+"""
+Resource manifest for the bundled templates.
+
+The manifest (`resources/manifest.json`) lists every file shipped under
+`specify_cli/resources` together with where it lands in a project, its size,
+mode, sha256 and which locale/agent it applies to. It is generated at build
+time (see `hatch_build.py`) so `specify init` can plan all of its I/O from a
+single small JSON document instead of walking the package tree.
+
+This module only depends on the standard library so the build hook can load
+it without importing the CLI.
+
+Regenerate or verify the committed manifest with:
+    python src/specify_cli/manifest.py
+    python src/specify_cli/manifest.py --check
+"""
+
+import hashlib
+import json
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
+
+MANIFEST_NAME = "manifest.json"
+MANIFEST_FORMAT = 1
+
+RESOURCES_DIR = Path(__file__).resolve().parent / "resources"
+# Only used where the filesystem has no exec bits to read (Windows)
+EXECUTABLE_SUFFIXES = (".sh",)
+
+# Entry kinds
+KIND_FILE = "file"        # copied verbatim to `dest`
+KIND_COMMAND = "command"  # rendered per agent by generate_agent_commands
+KIND_OTHER = "other"      # shipped but never materialized
+
+
+def classify(rel: PurePosixPath) -> dict:
+    """Return kind, destination and applicability for a resource path."""
+    parts = rel.parts
+    entry = {"kind": KIND_OTHER, "dest": None, "locale": None, "agents": None}
+    if parts[:2] == ("templates", "commands"):
+        entry["kind"] = KIND_COMMAND
+    elif parts[0] in ("templates", "scripts", "memory"):
+        entry.update(kind=KIND_FILE, dest=str(rel))
+    elif parts[0] == "locales" and len(parts) >= 3:
+        # locales/<lang>/README.md -> README.md, locales/<lang>/templates/x -> templates/x
+        entry.update(kind=KIND_FILE, dest=str(PurePosixPath(*parts[2:])), locale=parts[1])
+    elif parts[0] == "agent_templates" and len(parts) >= 3:
+        # agent_templates/<agent>/GEMINI.md -> GEMINI.md
+        entry.update(kind=KIND_FILE, dest=str(PurePosixPath(*parts[2:])), agents=[parts[1]])
+    return entry
+
+
+def is_executable(path: Path) -> bool:
+    """Whether a resource is installed executable: its own exec bit, recorded at build time."""
+    if os.name == "nt":
+        return path.name.endswith(EXECUTABLE_SUFFIXES)
+    return bool(path.stat().st_mode & 0o111)
+
+
+def build_manifest(resources_dir: Path = RESOURCES_DIR) -> dict:
+    """Scan resources_dir and build the manifest document."""
+    files = []
+    for path in sorted(resources_dir.rglob("*")):
+        if not path.is_file() or path.name == MANIFEST_NAME or "__pycache__" in path.parts:
+            continue
+        rel = PurePosixPath(path.relative_to(resources_dir).as_posix())
+        data = path.read_bytes()
+        entry = {"path": str(rel)}
+        entry.update(classify(rel))
+        entry["size"] = len(data)
+        entry["mode"] = 0o755 if is_executable(path) else 0o644
+        entry["sha256"] = hashlib.sha256(data).hexdigest()
+        files.append(entry)
+    return {"format": MANIFEST_FORMAT, "files": files}
+
+
+def dump_manifest(manifest: dict) -> str:
+    return json.dumps(manifest, indent=1, ensure_ascii=False) + "\n"
+
+
+def write_manifest(resources_dir: Path = RESOURCES_DIR) -> Path:
+    """Regenerate resources_dir/manifest.json (only rewrites on change)."""
+    out = resources_dir / MANIFEST_NAME
+    text = dump_manifest(build_manifest(resources_dir))
+    if not out.exists() or out.read_text(encoding="utf-8") != text:
+        out.write_text(text, encoding="utf-8")
+    return out
+
+
+@lru_cache(maxsize=1)
+def load_manifest() -> dict:
+    """Load the manifest shipped with the installed package (or single-file build)."""
+    from .bundle import resource_root
+
+    text = (resource_root() / MANIFEST_NAME).read_text(encoding="utf-8")
+    manifest = json.loads(text)
+    if manifest.get("format") != MANIFEST_FORMAT:
+        raise RuntimeError(f"Unsupported resource manifest format: {manifest.get('format')!r}")
+    return manifest
+
+
+def select(manifest: dict, kind: str, *, locale: str | None = None, agents=()) -> list[dict]:
+    """Entries of `kind` that apply to a project.
+
+    Locale-specific entries are only returned when `locale` matches exactly;
+    entries without a locale are returned only when `locale` is None. Agent
+    restricted entries are returned only if one of `agents` matches.
+    """
+    return [
+        e for e in manifest["files"]
+        if e["kind"] == kind
+        and e["locale"] == locale
+        and (e["agents"] is None or any(a in e["agents"] for a in agents))
+    ]
+
+
+def locale_chain(locale: str | None) -> list[str | None]:
+    """Locales to try for `locale`, most specific first: ja-JP -> ja-JP, ja, None."""
+    chain: list[str | None] = []
+    while locale:
+        chain.append(locale)
+        locale = locale.rpartition("-")[0]
+    return [*chain, None]
+
+
+def resolve(manifest: dict, kind: str, *, locale: str | None = None, agents=()) -> dict[str, dict]:
+    """The entry to use for every destination of `kind`, keyed by dest.
+
+    Each destination gets its most specific variant for `locale` (see
+    `locale_chain`), falling back to the locale-neutral entry, so a
+    localized file replaces the English one before anything is written.
+    """
+    rank = {loc: i for i, loc in enumerate(locale_chain(locale))}
+    resolved: dict[str, dict] = {}
+    for e in manifest["files"]:
+        if e["kind"] != kind or e["locale"] not in rank:
+            continue
+        if e["agents"] is not None and not any(a in e["agents"] for a in agents):
+            continue
+        current = resolved.get(e["dest"])
+        if current is None or rank[e["locale"]] < rank[current["locale"]]:
+            resolved[e["dest"]] = e
+    return resolved
+
+
+def check_manifest(resources_dir: Path = RESOURCES_DIR) -> bool:
+    """Whether resources_dir/manifest.json matches the files next to it."""
+    out = resources_dir / MANIFEST_NAME
+    return out.exists() and out.read_text(encoding="utf-8") == dump_manifest(build_manifest(resources_dir))
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if "--check" in argv:
+        if not check_manifest():
+            print(f"{RESOURCES_DIR / MANIFEST_NAME} is out of date; run: python src/specify_cli/manifest.py", file=sys.stderr)
+            return 1
+        return 0
+    print(write_manifest())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
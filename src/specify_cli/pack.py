@@ -0,0 +1,80 @@
+"""
+Release archives for `specify pack`.
+
+Each agent gets `spec-kit-template-<agent>-<version>.zip` containing exactly
+what `specify init` would scaffold for it: the shared templates, scripts and
+memory files, the agent's own files and its rendered commands (through the
+same `render_agent_commands` code path). Entries are written straight from
+memory into the zip, sorted by path with fixed timestamps and modes, so the
+same sources always produce byte-identical archives.
+
+Archives are built concurrently, one per agent; shared resources are read
+once and the command templates are compiled once before the pool starts.
+"""
+
+import os
+import time
+import zipfile
+from pathlib import Path
+
+from .bundle import COMPRESS_LEVEL, read_resource, zip_entry
+
+
+def archive_name(ai: str, version: str, lang: str = "en") -> str:
+    suffix = "" if lang == "en" else f"-{lang}"
+    return f"spec-kit-template-{ai}{suffix}-{version}.zip"
+
+
+def write_archive(path: Path, files: dict[str, tuple[bytes, int]]) -> int:
+    """Write {archive path: (data, mode)} as a deterministic zip; returns its size."""
+    tmp = path.with_name(f".{path.name}.tmp")
+    with zipfile.ZipFile(tmp, "w") as zf:
+        for name in sorted(files):
+            data, mode = files[name]
+            zf.writestr(zip_entry(name, mode), data, compresslevel=COMPRESS_LEVEL)
+    os.replace(tmp, path)
+    return path.stat().st_size
+
+
+def pack_agent(ai: str, plan: tuple, *, lang: str, version: str, output_dir: Path, contents: dict[str, bytes]) -> dict:
+    """Build one agent's archive; never raises, the outcome is in the result.
+
+    `plan` is the agent's `scaffold_outputs` result and `contents` maps
+    manifest paths to their bytes.
+    """
+    start = time.perf_counter()
+    path = output_dir / archive_name(ai, version, lang)
+    result = {"ai": ai, "path": str(path), "status": "ok", "error": None}
+    try:
+        entries, commands = plan
+        files = {dest: (contents[e["path"]], e["mode"]) for dest, e in entries.items()}
+        files.update({rel: (content.encode("utf-8"), 0o644) for rel, content in commands.items()})
+        result["files"] = len(files)
+        result["bytes"] = write_archive(path, files)
+    except Exception as e:
+        result.update(status="error", error=str(e) or type(e).__name__)
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def pack_all(agents: list[str], *, lang: str, version: str, output_dir: Path, scaffold_outputs, jobs: int | None = None) -> list[dict]:
+    """Build archives for `agents` on a thread pool; results keep the order of `agents`."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    # Plan every agent up front: this compiles the command templates once
+    # and tells us which resources to read (each is read once for all agents)
+    plans = {ai: scaffold_outputs(ai, lang) for ai in agents}
+    paths = {e["path"] for entries, _ in plans.values() for e in entries.values()}
+    contents = {p: read_resource(p) for p in sorted(paths)}
+
+    def build(ai: str) -> dict:
+        return pack_agent(ai, plans[ai], lang=lang, version=version, output_dir=output_dir, contents=contents)
+
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(agents)))
+    if jobs == 1:
+        return [build(ai) for ai in agents]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    # zlib releases the GIL while compressing, so threads overlap the real work
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(build, agents))
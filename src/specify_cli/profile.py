@@ -0,0 +1,265 @@
+"""
+Span tracer behind `--profile` and the `SPECIFY_TRACE` hook.
+
+A span records wall time plus counters: files and bytes written (reported
+by the code doing the writing through `count`) and subprocesses started
+(counted automatically through an audit hook). Counters are inclusive: a
+count lands on every span open in the calling thread and on the root span,
+so a parent includes its children while spans running concurrently in
+other threads (such as the tool probes of `check`) don't get each other's
+counts. StepTracker steps become spans through `Tracer.step_listener`,
+which gives `init` its copy/extract/git/final phases for free.
+
+Spans are stored as Chrome trace "complete" events. They are exported as a
+Chrome trace (load it in chrome://tracing or Perfetto) or as a flat JSON
+summary with totals per span name. With `SPECIFY_TRACE=<file>` in the
+environment every `specify` command, and the bundled bash scripts (see
+`span_begin`/`span_end` in common.sh), append their events to that file,
+one JSON object per line, so a whole agent workflow ends up in one trace;
+`specify trace <file>` converts it.
+
+Nothing is recorded unless a tracer is active; `span` and `count` are then
+a single global check.
+"""
+
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+TRACE_ENV = "SPECIFY_TRACE"
+FORMATS = ("chrome", "json")
+COUNTERS = ("files", "bytes", "subprocesses")
+
+# Audit events that start a child process
+_SPAWN_EVENTS = frozenset({"subprocess.Popen", "os.system", "os.posix_spawn", "os.spawn"})
+
+_active = None
+_hooked = False
+
+
+class Span:
+    __slots__ = ("name", "cat", "start", "tid", "args")
+
+    def __init__(self, name: str, cat: str, start: int, tid: int, args: dict):
+        self.name = name
+        self.cat = cat
+        self.start = start
+        self.tid = tid
+        self.args = args
+
+
+class Tracer:
+    """Spans of one process; timestamps are wall-clock microseconds, as in the bash hook."""
+
+    def __init__(self, name: str):
+        import threading
+
+        self.name = name
+        self.pid = os.getpid()
+        self.events: list[dict] = []
+        self.output: str | None = None
+        self.format = "chrome"
+        self._open: dict[int, Span] = {}
+        self._stacks: dict[int, list[Span]] = {}  # open spans per thread, outermost first
+        self._steps: dict[str, Span] = {}
+        self._lock = threading.Lock()
+        self._wall0 = time.time_ns() // 1000
+        self._perf0 = time.perf_counter_ns()
+        self.root = self.begin(name, cat="command")
+
+    def now(self) -> int:
+        return self._wall0 + (time.perf_counter_ns() - self._perf0) // 1000
+
+    def begin(self, name: str, cat: str = "specify", **args) -> Span:
+        import threading
+
+        span = Span(name, cat, self.now(), threading.get_ident(), args)
+        with self._lock:
+            self._open[id(span)] = span
+            self._stacks.setdefault(span.tid, []).append(span)
+        return span
+
+    def end(self, span: Span, **args) -> None:
+        end = self.now()
+        with self._lock:
+            if self._open.pop(id(span), None) is None:
+                return
+            stack = self._stacks[span.tid]
+            # Usually the innermost, but steps can end out of order
+            del stack[next(i for i in range(len(stack) - 1, -1, -1) if stack[i] is span)]
+            if not stack:
+                del self._stacks[span.tid]
+            span.args.update(args)
+            self.events.append({
+                "name": span.name, "cat": span.cat, "ph": "X", "ts": span.start, "dur": end - span.start,
+                "pid": self.pid, "tid": span.tid, "args": span.args,
+            })
+
+    @contextmanager
+    def span(self, name: str, cat: str = "specify", **args):
+        s = self.begin(name, cat, **args)
+        try:
+            yield s
+        finally:
+            self.end(s)
+
+    def count(self, **counters: int) -> None:
+        """Add counters to the calling thread's open spans and the root span."""
+        import threading
+
+        with self._lock:
+            spans = list(self._stacks.get(threading.get_ident(), ()))
+            if id(self.root) in self._open and not any(s is self.root for s in spans):
+                spans.append(self.root)
+            for s in spans:
+                for key, value in counters.items():
+                    s.args[key] = s.args.get(key, 0) + value
+
+    def step_listener(self, event: dict) -> None:
+        """StepTracker listener: a running step opens a span, a finished one closes it."""
+        key, status = event["key"], event["status"]
+        if status == "running":
+            self._steps[key] = self.begin(key, cat="step")
+        elif status in ("done", "error", "skipped"):
+            span = self._steps.pop(key, None) or self.begin(key, cat="step")
+            self.end(span, status=status, detail=event.get("detail") or "")
+
+    def close(self) -> list[dict]:
+        """End every open span (innermost first) and return all events, metadata first."""
+        with self._lock:
+            spans = sorted(self._open.values(), key=lambda s: s.start, reverse=True)
+        for s in spans:
+            self.end(s)
+        meta = {"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0, "args": {"name": f"specify {self.name}"}}
+        return [meta, *sorted(self.events, key=lambda e: e["ts"])]
+
+
+def _audit(event: str, args) -> None:
+    if event in _SPAWN_EVENTS and _active is not None:
+        _active.count(subprocesses=1)
+
+
+def active() -> Tracer | None:
+    return _active
+
+
+def activate(name: str, *, output: str | None = None, fmt: str | None = None) -> Tracer:
+    """Start tracing this process (root span `name`), or update the active tracer's output."""
+    global _active, _hooked
+    if _active is None:
+        _active = Tracer(name)
+        if not _hooked:
+            sys.addaudithook(_audit)
+            _hooked = True
+    if output:
+        _active.output = output
+    if fmt:
+        _active.format = fmt
+    return _active
+
+
+def finish() -> None:
+    """Stop tracing; append to $SPECIFY_TRACE and write the `--profile` report, if requested."""
+    global _active
+    tracer, _active = _active, None
+    if tracer is None:
+        return
+    events = tracer.close()
+    trace_file = os.environ.get(TRACE_ENV)
+    if trace_file:
+        append_events(trace_file, events)
+    if tracer.output:
+        write_report(tracer.output, events, tracer.format)
+
+
+def span(name: str, cat: str = "specify", **args):
+    """Context manager timing a span of the active tracer; a no-op when not tracing."""
+    if _active is None:
+        return nullcontext()
+    return _active.span(name, cat, **args)
+
+
+def count(**counters: int) -> None:
+    """Add counters to the open spans of the active tracer, if any."""
+    if _active is not None:
+        _active.count(**counters)
+
+
+def append_events(path: str, events: list[dict]) -> None:
+    import json
+
+    data = "".join(json.dumps(e, ensure_ascii=False, separators=(",", ":")) + "\n" for e in events)
+    # One O_APPEND write, so processes sharing the file don't interleave lines
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data.encode("utf-8"))
+    finally:
+        os.close(fd)
+
+
+def read_events(path: str) -> list[dict]:
+    """Events of a trace file (one JSON object per line); malformed lines are skipped."""
+    import json
+
+    events = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(event, dict) and "ph" in event:
+                events.append(event)
+    return events
+
+
+def to_chrome(events: list[dict]) -> dict:
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def summarize(events: list[dict]) -> dict:
+    """Totals per (category, span name), in order of first appearance.
+
+    Each entry has count, total_ms, max_ms and the summed counters; `wall_ms`
+    is the time from the first span's start to the last one's end.
+    """
+    spans = [e for e in events if e.get("ph") == "X"]
+    if not spans:
+        return {"wall_ms": 0.0, "spans": []}
+    rows: dict[tuple[str, str], dict] = {}
+    for e in sorted(spans, key=lambda e: e["ts"]):
+        row = rows.setdefault((e.get("cat", ""), e["name"]), {
+            "name": e["name"], "cat": e.get("cat", ""), "count": 0, "total_ms": 0.0, "max_ms": 0.0,
+        })
+        ms = e.get("dur", 0) / 1000
+        row["count"] += 1
+        row["total_ms"] += ms
+        row["max_ms"] = max(row["max_ms"], ms)
+        for key in COUNTERS:
+            value = e.get("args", {}).get(key)
+            if isinstance(value, int):
+                row[key] = row.get(key, 0) + value
+    for row in rows.values():
+        row["total_ms"] = round(row["total_ms"], 3)
+        row["max_ms"] = round(row["max_ms"], 3)
+    start = min(e["ts"] for e in spans)
+    end = max(e["ts"] + e.get("dur", 0) for e in spans)
+    return {"wall_ms": round((end - start) / 1000, 3), "spans": list(rows.values())}
+
+
+def render(events: list[dict], fmt: str = "chrome") -> str:
+    import json
+
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown profile format {fmt!r}; choose from {', '.join(FORMATS)}")
+    report = to_chrome(events) if fmt == "chrome" else summarize(events)
+    return json.dumps(report, ensure_ascii=False, indent=None if fmt == "chrome" else 2) + "\n"
+
+
+def write_report(path: str, events: list[dict], fmt: str = "chrome") -> None:
+    data = render(events, fmt)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(data)
+    os.replace(tmp, path)
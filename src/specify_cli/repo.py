@@ -0,0 +1,62 @@
+"""
+Repository lookups shared by the feature workflow commands.
+
+The bundled scripts ask git for the repository root and current branch
+(`git rev-parse --show-toplevel` / `--abbrev-ref HEAD`) on every call. These
+helpers answer the same questions from the `.git` entry and `HEAD` file, so
+no process is spawned; git itself is only consulted for layouts they don't
+understand (e.g. GIT_DIR overrides).
+"""
+
+import os
+import subprocess
+from pathlib import Path
+
+
+class RepoError(Exception):
+    """Raised when a path is not inside a git work tree."""
+
+
+def _git(args: list[str], cwd: Path) -> str:
+    try:
+        proc = subprocess.run(["git", "-C", str(cwd), *args], capture_output=True, text=True, check=True)
+    except (subprocess.CalledProcessError, FileNotFoundError) as e:
+        raise RepoError(f"{cwd} is not inside a git repository") from e
+    return proc.stdout.strip()
+
+
+def find_repo_root(start: Path | None = None) -> Path:
+    """Top level of the work tree containing start (default: the current directory)."""
+    start = (start or Path.cwd()).resolve()
+    if "GIT_DIR" not in os.environ:
+        for path in (start, *start.parents):
+            if (path / ".git").exists():
+                return path
+    return Path(_git(["rev-parse", "--show-toplevel"], start))
+
+
+def git_dir(repo_root: Path) -> Path:
+    """The repository's git directory, following `gitdir:` files used by worktrees and submodules."""
+    dot_git = repo_root / ".git"
+    if dot_git.is_file():
+        text = dot_git.read_text(encoding="utf-8").strip()
+        if text.startswith("gitdir:"):
+            target = Path(text[len("gitdir:"):].strip())
+            return target if target.is_absolute() else (repo_root / target).resolve()
+    if dot_git.is_dir():
+        return dot_git
+    return Path(_git(["rev-parse", "--absolute-git-dir"], repo_root))
+
+
+def current_branch(repo_root: Path) -> str:
+    """Checked out branch name, or "HEAD" when detached (like `git rev-parse --abbrev-ref HEAD`)."""
+    try:
+        head = (git_dir(repo_root) / "HEAD").read_text(encoding="utf-8").strip()
+    except OSError:
+        return _git(["rev-parse", "--abbrev-ref", "HEAD"], repo_root)
+    prefix = "ref: refs/heads/"
+    return head[len(prefix):] if head.startswith(prefix) else "HEAD"
+
+
+def feature_dir(repo_root: Path, branch: str) -> Path:
+    return repo_root / "specs" / branch
@@ -1,6 +1,85 @@
 #!/usr/bin/env bash
 # Common functions and variables for all scripts
 
+# Socket of the optional `specify serve` daemon (same rule as specify_cli.daemon)
+SPECIFY_SOCKET_PATH="${SPECIFY_SOCKET:-${XDG_RUNTIME_DIR:-${TMPDIR:-/tmp}}/specify-$UID/daemon.sock}"
+SPECIFY_SCRIPTS_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+
+# Profiling hook: with SPECIFY_TRACE=<file> set, spans are appended to <file>
+# as Chrome trace events (one per line) next to the specify CLI's own, and
+# `specify trace` turns the file into a report. No-ops otherwise.
+_SPECIFY_SPANS=()
+
+_specify_now_us() {
+    if [[ -n "${EPOCHREALTIME:-}" ]]; then
+        echo "${EPOCHREALTIME/[.,]/}"
+    else
+        local ns
+        ns=$(date +%s%N)
+        # date without %N support (macOS) prints a literal N
+        if [[ "$ns" == *N ]]; then echo "$(( $(date +%s) * 1000000 ))"; else echo "$(( ns / 1000 ))"; fi
+    fi
+}
+
+# Open a span named $1; spans nest and are closed by span_end
+span_begin() {
+    [[ -n "${SPECIFY_TRACE:-}" ]] || return 0
+    _SPECIFY_SPANS+=("$(_specify_now_us) $1")
+}
+
+# Close the innermost open span and record it
+span_end() {
+    [[ -n "${SPECIFY_TRACE:-}" ]] || return 0
+    local n=${#_SPECIFY_SPANS[@]}
+    [[ $n -gt 0 ]] || return 0
+    local top="${_SPECIFY_SPANS[$((n - 1))]}"
+    unset "_SPECIFY_SPANS[$((n - 1))]"
+    local start="${top%% *}" name="${top#* }" now
+    now=$(_specify_now_us)
+    printf '{"name":"%s","cat":"script","ph":"X","ts":%s,"dur":%s,"pid":%s,"tid":%s,"args":{}}\n' \
+        "$name" "$start" "$((now - start))" "$$" "$$" >> "$SPECIFY_TRACE"
+}
+
+# Close every open span (before exec, which skips the EXIT trap)
+span_end_all() {
+    while [[ ${#_SPECIFY_SPANS[@]} -gt 0 ]]; do span_end; done
+}
+
+# Record the calling script as one span, closed when it exits
+trace_script() {
+    [[ -n "${SPECIFY_TRACE:-}" ]] || return 0
+    local name
+    name=$(basename "$0")
+    printf '{"name":"process_name","ph":"M","pid":%s,"tid":0,"args":{"name":"%s"}}\n' "$$" "$name" >> "$SPECIFY_TRACE"
+    span_begin "$name"
+    trap span_end_all EXIT
+}
+
+# Whether the specify CLI on PATH has the subcommand "$@" (an older or
+# upstream specify may not); always false with SPECIFY_NO_CLI set. Asking
+# starts Python, so answers are cached per executable in the per-user cache
+# and dropped when specify is reinstalled (written after the cache).
+specify_has() {
+    [[ -z "${SPECIFY_NO_CLI:-}" ]] || return 1
+    local cli
+    cli=$(command -v specify) || return 1
+    local cache="${SPECIFY_CACHE_DIR:-${XDG_CACHE_HOME:-$HOME/.cache}/specify-cli}/capabilities"
+    local key="$cli"$'\t'"$*" line answer=no
+    if [[ "$cache" -nt "$cli" ]]; then
+        while IFS= read -r line; do
+            case "$line" in
+                "$key"$'\t'yes) return 0 ;;
+                "$key"$'\t'no) return 1 ;;
+            esac
+        done < "$cache"
+    else
+        rm -f "$cache" 2>/dev/null
+    fi
+    specify "$@" --help >/dev/null 2>&1 && answer=yes
+    { mkdir -p "${cache%/*}" && printf '%s\t%s\n' "$key" "$answer" >> "$cache"; } 2>/dev/null
+    [[ $answer == yes ]]
+}
+
 # Get repository root
 get_repo_root() {
     git rev-parse --show-toplevel
@@ -34,6 +113,15 @@ get_feature_dir() {
 # Usage: eval $(get_feature_paths)
 # Sets: REPO_ROOT, CURRENT_BRANCH, FEATURE_DIR, FEATURE_SPEC, IMPL_PLAN, TASKS
 get_feature_paths() {
+    # A running daemon answers without spawning git; otherwise compute here
+    if specify_daemon_running; then
+        local answer
+        if answer=$(python3 -I -S "$SPECIFY_SCRIPTS_DIR/specify-query.py" --socket "$SPECIFY_SOCKET_PATH" paths 2>/dev/null); then
+            echo "$answer"
+            return 0
+        fi
+    fi
+
     local repo_root=$(get_repo_root)
     local current_branch=$(get_current_branch)
     local feature_dir=$(get_feature_dir "$repo_root" "$current_branch")
@@ -50,6 +138,31 @@ get_feature_paths() {
     echo "CONTRACTS_DIR='$feature_dir/contracts'"
 }
 
+# Whether a daemon socket of ours is there to ask; specify-query.py also
+# checks its permissions and those of its directory before connecting
+specify_daemon_running() {
+    [[ -S "$SPECIFY_SOCKET_PATH" && ! -L "$SPECIFY_SOCKET_PATH" && -O "$SPECIFY_SOCKET_PATH" ]]
+}
+
+# Answer a prerequisites query with a running `specify serve` daemon and
+# exit with the check's status (0 or 1). Returns when no daemon is
+# listening (or it can't answer, answers anything else, or SPECIFY_NO_CLI
+# is set) so the caller answers itself. The CLI is not used as a fallback:
+# starting Python costs far more than the checks in bash.
+delegate_prereqs() {
+    [[ -n "$SPECIFY_NO_CLI" ]] && return 0
+    if specify_daemon_running; then
+        local status=0 output
+        span_begin "daemon query"
+        output=$(python3 -I -S "$SPECIFY_SCRIPTS_DIR/specify-query.py" --socket "$SPECIFY_SOCKET_PATH" report "$@") || status=$?
+        span_end
+        case $status in
+            0|1) printf '%s\n' "$output"; exit $status ;;
+        esac
+    fi
+    return 0
+}
+
 # Check if a file exists and report
 check_file() {
     local file="$1"
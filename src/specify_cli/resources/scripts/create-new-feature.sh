@@ -5,6 +5,17 @@
 
 set -e
 
+source "$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/common.sh"
+
+# Prefer the CLI (indexed, lock-safe numbering) when the specify on PATH has
+# it; set SPECIFY_NO_CLI=1 to force this script's implementation
+if specify_has feature new; then
+    exec specify feature new "$@"
+fi
+
+# Profiling hook (see common.sh)
+trace_script
+
 JSON_MODE=false
 
 # Collect non-flag args
@@ -34,9 +45,13 @@ SPECS_DIR="$REPO_ROOT/specs"
 # Create specs directory if it doesn't exist
 mkdir -p "$SPECS_DIR"
 
-# Find the highest numbered feature directory
+# Find the highest numbered feature directory: from the CLI's index (see
+# specify_cli/features.py) while it is newer than specs/, else by listing
 HIGHEST=0
-if [ -d "$SPECS_DIR" ]; then
+INDEX_FILE="$SPECS_DIR/.index/state.json"
+if [[ "$INDEX_FILE" -nt "$SPECS_DIR" && "$(<"$INDEX_FILE")" =~ \"format\":\ 2,\ \"highest\":\ ([0-9]+) ]]; then
+    HIGHEST=${BASH_REMATCH[1]}
+elif [ -d "$SPECS_DIR" ]; then
     for dir in "$SPECS_DIR"/*; do
         if [ -d "$dir" ]; then
             dirname=$(basename "$dir")
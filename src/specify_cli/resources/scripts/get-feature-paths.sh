@@ -7,6 +7,10 @@ set -e
 # Source common functions
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 source "$SCRIPT_DIR/common.sh"
+trace_script
+
+# Let a running specify daemon answer when there is one
+delegate_prereqs --paths-only
 
 # Get all paths
 eval $(get_feature_paths)
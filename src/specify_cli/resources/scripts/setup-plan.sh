@@ -16,6 +16,7 @@ done
 # Source common functions
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
 source "$SCRIPT_DIR/common.sh"
+trace_script
 
 # Get all paths
 eval $(get_feature_paths)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Thin client for a running `specify serve` daemon.
+
+Usage: specify-query.py --socket PATH {paths,prereqs,features} [--json]
+       specify-query.py --socket PATH report [--json|--shell] [--paths-only]
+       specify-query.py --socket PATH search WORD... [--all]
+
+Prints the answer (paths as shell assignments for `eval`, the rest as JSON)
+and exits 0; exits 1 with the daemon's message on stderr when the query
+failed, and 3 when no daemon answered so the caller can fall back to its
+own implementation. `report` prints exactly what `specify prereqs` would,
+with its exit status; `search` prints the hits of `specify search --json`. Standard library only: it runs with whatever python3 is
+on PATH, not the one specify is installed in.
+
+Only a socket (not a symlink) owned by the caller's uid, without group or
+other permissions, in a directory with the same properties is used, and
+only the known path variables are ever printed for `eval`; anything else
+counts as no daemon (status 3). `specify_cli.daemon` applies the same rule.
+"""
+
+import json
+import os
+import re
+import socket
+import stat
+import sys
+
+UNAVAILABLE = 3
+# The variables get_feature_paths in common.sh sets, plus AVAILABLE_DOCS
+PATH_KEYS = ("REPO_ROOT", "CURRENT_BRANCH", "FEATURE_DIR", "FEATURE_SPEC", "IMPL_PLAN", "TASKS",
+             "RESEARCH", "DATA_MODEL", "QUICKSTART", "CONTRACTS_DIR")
+SHELL_KEYS = (*PATH_KEYS, "AVAILABLE_DOCS")
+# KEY='value' with the value quoted by quote() below
+_ASSIGNMENT = re.compile(r"([A-Z_]+)='(?:[^']|'\"'\"')*'")
+REPORT_STATUSES = (0, 1)
+
+
+def quote(value: str) -> str:
+    return "'" + value.replace("'", "'\"'\"'") + "'"
+
+
+def is_private(path: str, is_kind) -> bool:
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    return is_kind(st.st_mode) and st.st_uid == os.getuid() and not st.st_mode & 0o077
+
+
+def trusted(result, op: str, flags: set) -> bool:
+    """Whether a daemon answer has the shape this client is going to print."""
+    if op == "paths":
+        return (isinstance(result, dict) and set(result) <= set(PATH_KEYS)
+                and all(isinstance(v, str) for v in result.values()))
+    if op == "report":
+        if not (isinstance(result, dict) and isinstance(result.get("output"), str)
+                and type(result.get("status")) is int and result["status"] in REPORT_STATUSES):
+            return False
+        if "--shell" in flags and result["status"] == 0:
+            return all((m := _ASSIGNMENT.fullmatch(line)) and m.group(1) in SHELL_KEYS
+                       for line in result["output"].splitlines())
+    return True
+
+
+def main(argv: list[str]) -> int:
+    # Parsed by hand: argparse alone costs more than the whole round trip
+    args = list(argv)
+    flags = {a for a in args if a in ("--json", "--shell", "--paths-only", "--all")}
+    args = [a for a in args if a not in flags]
+    as_json = "--json" in flags
+    sock = None
+    if "--socket" in args:
+        i = args.index("--socket")
+        sock = args[i + 1] if i + 1 < len(args) else None
+        del args[i:i + 2]
+    op = args[0] if len(args) == 1 or args[:1] == ["search"] else None
+    if not sock or op not in ("paths", "prereqs", "features", "report", "search") or args == ["search"]:
+        print(__doc__.split("\n\n")[1], file=sys.stderr)
+        return 2
+    params = {"op": op, "cwd": os.getcwd()}
+    if op == "report":
+        params["format"] = "json" if as_json else "shell" if "--shell" in flags else "text"
+        params["paths_only"] = "--paths-only" in flags
+    elif op == "search":
+        params["query"] = " ".join(args[1:])
+        params["all"] = "--all" in flags
+
+    if not (is_private(os.path.dirname(os.path.abspath(sock)), stat.S_ISDIR) and is_private(sock, stat.S_ISSOCK)):
+        return UNAVAILABLE
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(2.0)
+            s.connect(sock)
+            s.sendall(json.dumps(params).encode("utf-8") + b"\n")
+            with s.makefile("rb") as f:
+                line = f.readline()
+        response = json.loads(line)
+    except (OSError, AttributeError, ValueError):
+        return UNAVAILABLE
+
+    if not isinstance(response, dict):
+        return UNAVAILABLE
+    if not response.get("ok"):
+        print(response.get("error", "ERROR: query failed"), file=sys.stderr)
+        return 1
+    result = response.get("result")
+    if not trusted(result, op, flags):
+        return UNAVAILABLE
+    if op == "report":
+        print(result["output"])
+        return result["status"]
+    if op == "paths" and not as_json:
+        print("\n".join(f"{key}={quote(value)}" for key, value in result.items()))
+    else:
+        print(json.dumps(result, ensure_ascii=False, separators=(",", ":")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -5,6 +5,18 @@
 
 set -e
 
+source "$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)/common.sh"
+
+# Prefer the CLI port (parses plan.md once, writes atomically, no forks per
+# field) when the specify on PATH has it; set SPECIFY_NO_CLI=1 to force this
+# script's implementation
+if specify_has agent-context update; then
+    exec specify agent-context update "$@"
+fi
+
+# Profiling hook (see common.sh)
+trace_script
+
 REPO_ROOT=$(git rev-parse --show-toplevel)
 CURRENT_BRANCH=$(git rev-parse --abbrev-ref HEAD)
 FEATURE_DIR="$REPO_ROOT/specs/$CURRENT_BRANCH"
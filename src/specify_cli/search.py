@@ -0,0 +1,258 @@
+"""
+Full-text index of the feature documents for `specify index` and `specify search`.
+
+spec.md, plan.md, data-model.md and everything under contracts/ of each
+`specs/*/` feature are split into sections (one per Markdown heading; other
+files are a single section) and stored in a SQLite FTS5 table in
+`specs/.index/search.db`. Each section keeps its byte range in the file, so
+a hit can be read back without loading the whole document.
+
+Updates are incremental: files whose size and mtime are unchanged are
+skipped without being read, files with an unchanged sha256 only get their
+stat refreshed, and only new or changed files are re-split. The trigram
+tokenizer is used when SQLite has it, so Japanese text (which has no spaces
+between words) is searchable by substring; with it, search terms shorter
+than three characters can't use the index and are matched by a scan.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from pathlib import Path
+
+SCHEMA_VERSION = 1
+DB_FILE = "specs/.index/search.db"
+DOCUMENTS = ("spec.md", "plan.md", "data-model.md")
+CONTRACTS_DIR = "contracts"
+
+# bm25 weights of the heading and body columns
+HEADING_WEIGHT = 5.0
+BODY_WEIGHT = 1.0
+SNIPPET_CHARS = 160
+
+_FENCE = re.compile(rb"^\s*(```|~~~)")
+_HEADING = re.compile(rb"^(#{1,6})\s+(.*?)\s*#*\s*$")
+
+
+class SearchError(Exception):
+    """Raised for an unusable index or query."""
+
+
+def split_sections(data: bytes, name: str) -> list[dict]:
+    """Sections of a document: heading (with its parents, ' > ' separated),
+    byte range [start, end), first line (1-based) and text.
+
+    Markdown is split at every heading outside fenced code; text before the
+    first heading, and any other file, is a section headed by the file name.
+    """
+    if not name.endswith(".md"):
+        return [{"heading": name, "start": 0, "end": len(data), "line": 1, "text": data.decode("utf-8", "replace")}]
+    sections = []
+    trail: list[tuple[int, str]] = []  # (level, title) of the enclosing headings
+    current = {"heading": name, "start": 0, "line": 1}
+    offset, fenced = 0, False
+    for lineno, line in enumerate(data.splitlines(keepends=True), 1):
+        if _FENCE.match(line):
+            fenced = not fenced
+        m = None if fenced else _HEADING.match(line.rstrip(b"\r\n"))
+        if m:
+            if offset > current["start"]:
+                sections.append({**current, "end": offset})
+            level = len(m.group(1))
+            trail = [(lvl, title) for lvl, title in trail if lvl < level]
+            trail.append((level, m.group(2).decode("utf-8", "replace")))
+            current = {"heading": " > ".join(title for _, title in trail), "start": offset, "line": lineno}
+        offset += len(line)
+    if offset > current["start"] or not sections:
+        sections.append({**current, "end": offset})
+    for s in sections:
+        s["text"] = data[s["start"]:s["end"]].decode("utf-8", "replace")
+    return sections
+
+
+def feature_documents(repo_root: Path) -> dict[str, tuple[str, os.stat_result]]:
+    """path (relative, / separated) -> (feature, stat) of every indexed document."""
+    found = {}
+    specs = repo_root / "specs"
+    if not specs.is_dir():
+        return found
+    with os.scandir(specs) as features:
+        for feature in features:
+            if feature.name.startswith(".") or not feature.is_dir():
+                continue
+            for name in DOCUMENTS:
+                try:
+                    st = os.stat(os.path.join(feature.path, name))
+                except OSError:
+                    continue
+                found[f"specs/{feature.name}/{name}"] = (feature.name, st)
+            contracts = os.path.join(feature.path, CONTRACTS_DIR)
+            for dirpath, dirnames, filenames in os.walk(contracts):
+                dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+                for name in filenames:
+                    path = os.path.join(dirpath, name)
+                    rel = os.path.relpath(path, repo_root).replace(os.sep, "/")
+                    found[rel] = (feature.name, os.stat(path))
+    return found
+
+
+def has_trigram(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp.probe USING fts5(x, tokenize='trigram')")
+    except sqlite3.OperationalError:
+        return False
+    conn.execute("DROP TABLE temp.probe")
+    return True
+
+
+class SearchIndex:
+    """The search database of one repository."""
+
+    def __init__(self, repo_root: Path, path: Path | None = None):
+        self.repo_root = repo_root
+        if path is None:
+            from .features import make_index_dir
+
+            # Ignored along with the -wal/-shm files SQLite keeps next to it
+            path = make_index_dir(repo_root / "specs") / Path(DB_FILE).name
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        try:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                self._create()
+            self.tokenizer = self.conn.execute("SELECT value FROM meta WHERE key = 'tokenizer'").fetchone()[0]
+        except sqlite3.Error as e:
+            self.conn.close()
+            raise SearchError(f"Unusable search index {self.path}: {e}") from e
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _create(self) -> None:
+        tokenizer = "trigram" if has_trigram(self.conn) else "unicode61 remove_diacritics 2"
+        with self.conn:
+            for table in ("meta", "files", "sections", "sections_fts"):
+                self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.execute("CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT)")
+            self.conn.execute("CREATE TABLE files (path TEXT PRIMARY KEY, feature TEXT, size INTEGER, mtime_ns INTEGER, sha256 TEXT)")
+            self.conn.execute(
+                "CREATE TABLE sections (id INTEGER PRIMARY KEY, path TEXT, feature TEXT, heading TEXT,"
+                " start INTEGER, end INTEGER, line INTEGER)"
+            )
+            self.conn.execute("CREATE INDEX sections_path ON sections (path)")
+            self.conn.execute(f"CREATE VIRTUAL TABLE sections_fts USING fts5(heading, body, tokenize='{tokenizer}')")
+            self.conn.execute("INSERT INTO meta VALUES ('tokenizer', ?)", (tokenizer,))
+            self.conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+    def _remove(self, path: str) -> None:
+        ids = [(row[0],) for row in self.conn.execute("SELECT id FROM sections WHERE path = ?", (path,))]
+        self.conn.executemany("DELETE FROM sections_fts WHERE rowid = ?", ids)
+        self.conn.execute("DELETE FROM sections WHERE path = ?", (path,))
+        self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+    def update(self, *, rebuild: bool = False) -> dict:
+        """Bring the index up to date with specs/.
+
+        Returns counts of files seen, indexed (new or changed), touched (only
+        the stat changed), removed, the total sections and seconds taken.
+        """
+        start = time.perf_counter()
+        if rebuild:
+            self._create()
+            self.tokenizer = self.conn.execute("SELECT value FROM meta WHERE key = 'tokenizer'").fetchone()[0]
+        docs = feature_documents(self.repo_root)
+        known = {row[0]: row[1:] for row in self.conn.execute("SELECT path, size, mtime_ns, sha256 FROM files")}
+        stats = {"files": len(docs), "indexed": 0, "touched": 0, "removed": 0}
+        with self.conn:
+            for path in known.keys() - docs.keys():
+                self._remove(path)
+                stats["removed"] += 1
+            for path, (feature, st) in docs.items():
+                previous = known.get(path)
+                if previous and previous[0] == st.st_size and previous[1] == st.st_mtime_ns:
+                    continue
+                try:
+                    data = (self.repo_root / path).read_bytes()
+                except OSError:
+                    continue  # removed while we were indexing; dropped next time
+                sha = hashlib.sha256(data).hexdigest()
+                if previous and previous[2] == sha:
+                    self.conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?", (st.st_size, st.st_mtime_ns, path))
+                    stats["touched"] += 1
+                    continue
+                if previous:
+                    self._remove(path)
+                self.conn.execute("INSERT INTO files VALUES (?, ?, ?, ?, ?)", (path, feature, st.st_size, st.st_mtime_ns, sha))
+                for s in split_sections(data, path.rsplit("/", 1)[-1]):
+                    cur = self.conn.execute(
+                        "INSERT INTO sections (path, feature, heading, start, end, line) VALUES (?, ?, ?, ?, ?, ?)",
+                        (path, feature, s["heading"], s["start"], s["end"], s["line"]),
+                    )
+                    self.conn.execute("INSERT INTO sections_fts (rowid, heading, body) VALUES (?, ?, ?)",
+                                      (cur.lastrowid, s["heading"], s["text"]))
+                stats["indexed"] += 1
+        stats["sections"] = self.conn.execute("SELECT count(*) FROM sections").fetchone()[0]
+        stats["seconds"] = round(time.perf_counter() - start, 4)
+        return stats
+
+    def search(self, query: str, *, limit: int = 20, match_all: bool = False, feature: str | None = None) -> list[dict]:
+        """Sections matching the words of `query`, best first.
+
+        Any word matches unless match_all; sections are ranked by bm25 with
+        headings weighted above body text. Each hit has path, feature,
+        heading, start/end byte offsets, line, score and a snippet.
+        """
+        terms = query.split()
+        if not terms:
+            raise SearchError("Empty query")
+        indexable = [t for t in terms if len(t) >= 3] if self.tokenizer == "trigram" else terms
+        joiner = " AND " if match_all else " OR "
+        where, params = [], []
+        if indexable:
+            where.append("sections_fts MATCH ?")
+            params.append(joiner.join('"' + t.replace('"', '""') + '"' for t in indexable))
+        short = [t for t in terms if t not in indexable]
+        if short and (match_all or not indexable):
+            # Too short for the trigram index: scan
+            like = [f"(sections_fts.heading LIKE ? ESCAPE '\\' OR sections_fts.body LIKE ? ESCAPE '\\')" for _ in short]
+            where.append("(" + joiner.join(like) + ")")
+            for t in short:
+                pattern = "%" + re.sub(r"([\\%_])", r"\\\1", t) + "%"
+                params += [pattern, pattern]
+        if feature:
+            where.append("sections.feature = ?")
+            params.append(feature)
+        rank = f"bm25(sections_fts, {HEADING_WEIGHT}, {BODY_WEIGHT})" if indexable else "0.0"
+        sql = (
+            f"SELECT sections.path, sections.feature, sections.heading, sections.start, sections.end, sections.line,"
+            f" {rank}, sections_fts.body FROM sections_fts JOIN sections ON sections.id = sections_fts.rowid"
+            f" WHERE {' AND '.join(where)} ORDER BY 7, sections.path, sections.start LIMIT ?"
+        )
+        try:
+            rows = self.conn.execute(sql, [*params, limit]).fetchall()
+        except sqlite3.OperationalError as e:
+            raise SearchError(f"Search failed: {e}") from e
+        folded = [t.casefold() for t in terms]
+        return [
+            {"path": path, "feature": feat, "heading": heading, "start": start, "end": end, "line": line,
+             "score": round(-score, 6) + 0.0, "snippet": snippet(body, folded)}
+            for path, feat, heading, start, end, line, score, body in rows
+        ]
+
+
+def snippet(body: str, terms: list[str]) -> str:
+    """First non-heading line of body containing a term (else the first one), shortened."""
+    lines = [line.strip() for line in body.splitlines() if line.strip() and not line.startswith("#")] or [body.strip()]
+    best = next((line for line in lines if any(t in line.casefold() for t in terms)), lines[0])
+    return best if len(best) <= SNIPPET_CHARS else best[:SNIPPET_CHARS - 1] + "…"
@@ -0,0 +1,363 @@
+"""
+Transactional scaffolding: build a project in a staging directory, then publish it.
+
+`staged(project_path, here=...)` yields the directory to build in and
+publishes it when the block succeeds:
+
+- A new project is built in a hidden sibling directory
+  (`.<name>.staging-<pid>`, same filesystem) and published with one
+  `rename`, so the project directory appears complete or not at all, and a
+  failure only has to delete the staging directory (and any parent
+  directories it had to create). The rename never replaces anything, not
+  even an empty directory: it is `renameat2(RENAME_NOREPLACE)` on Linux and
+  `renamex_np(RENAME_EXCL)` on macOS; elsewhere (or on filesystems without
+  it) the name is first claimed with `mkdir`, which fails if anything is
+  there, and the rename then replaces only that empty directory.
+- With `--here` the directory already exists, so files are built in
+  `.specify/staging-<pid>/` and then moved into place one `rename` at a
+  time. Each step is recorded in `.specify/init-journal` first; replaced
+  files are kept in `.specify/backup-<pid>/` until the commit completes. A
+  failed commit is rolled back from the journal, and a commit interrupted by
+  a crash or pre-emption is rolled back (or, if it had finished, cleaned up)
+  by `recover` on the next `init --here`. The journal names the process and
+  host that wrote it; while that process is still running on this host,
+  `recover` refuses instead of undoing a commit in progress.
+"""
+
+import errno
+import json
+import os
+import shutil
+import socket
+import sys
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+
+from .profile import span
+
+JOURNAL = ".specify/init-journal"
+
+RENAME_NOREPLACE = 1  # renameat2 flag, linux/fs.h
+RENAME_EXCL = 0x4     # renamex_np flag, macOS stdio.h
+_AT_FDCWD = -100
+# What renameat2/renamex_np fail with where the filesystem (or kernel) lacks them
+_NO_SUPPORT = {errno.EINVAL, errno.ENOSYS, errno.ENOTSUP}
+
+
+class StagingError(Exception):
+    """Raised when a staged project can't be published."""
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def remove_stale(parent: Path, prefix: str) -> None:
+    """Delete `<prefix><pid>` directories in parent left behind by dead processes."""
+    try:
+        names = [name for name in os.listdir(parent) if name.startswith(prefix)]
+    except OSError:
+        return
+    for name in names:
+        pid = name[len(prefix):]
+        if pid.isdigit() and int(pid) != os.getpid() and not _pid_alive(int(pid)):
+            shutil.rmtree(parent / name, ignore_errors=True)
+
+
+def make_parents(path: Path) -> list[Path]:
+    """Create the missing ancestors of path; returns the ones this call created, outermost first."""
+    missing = []
+    parent = path.parent
+    while not parent.exists():
+        missing.append(parent)
+        parent = parent.parent
+    created = []
+    for d in reversed(missing):
+        try:
+            d.mkdir()
+        except FileExistsError:
+            continue  # made concurrently by someone else; not ours to remove
+        created.append(d)
+    return created
+
+
+def remove_dirs(dirs: list[Path]) -> None:
+    """Remove directories made by make_parents, innermost first, as long as they are empty."""
+    for d in reversed(dirs):
+        try:
+            d.rmdir()
+        except OSError:
+            break
+
+
+@lru_cache(maxsize=1)
+def _noreplace_rename():
+    """libc's rename that fails with EEXIST instead of replacing, or None if there is none."""
+    if sys.platform.startswith("linux"):
+        name, flags = "renameat2", RENAME_NOREPLACE
+    elif sys.platform == "darwin":
+        name, flags = "renamex_np", RENAME_EXCL
+    else:
+        return None
+    import ctypes
+
+    try:
+        fn = getattr(ctypes.CDLL(None, use_errno=True), name)
+    except (OSError, AttributeError):
+        return None
+
+    def rename(src: Path, dst: Path) -> None:
+        args = (os.fsencode(src), os.fsencode(dst))
+        if name == "renameat2":
+            result = fn(_AT_FDCWD, args[0], _AT_FDCWD, args[1], flags)
+        else:
+            result = fn(args[0], args[1], flags)
+        if result != 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(src), None, str(dst))
+
+    return rename
+
+
+def _claim_and_rename(staging: Path, project_path: Path) -> None:
+    if os.name == "nt":
+        os.rename(staging, project_path)  # never replaces on Windows
+        return
+    os.mkdir(project_path)  # fails if anything is there
+    try:
+        os.rename(staging, project_path)  # replaces only the empty directory just made
+    except OSError:
+        try:
+            os.rmdir(project_path)
+        except OSError:
+            pass  # something was put in it meanwhile; not ours to remove
+        raise
+
+
+def publish(staging: Path, project_path: Path) -> None:
+    """Rename staging to project_path, failing if anything is already there (even an empty directory)."""
+    rename = _noreplace_rename()
+    try:
+        try:
+            if rename is None:
+                raise OSError(errno.ENOSYS, "no rename without replace")
+            rename(staging, project_path)
+        except OSError as e:
+            if e.errno not in _NO_SUPPORT:
+                raise
+            _claim_and_rename(staging, project_path)
+    except OSError as e:
+        if isinstance(e, FileExistsError) or e.errno in (errno.EEXIST, errno.ENOTEMPTY, errno.ENOTDIR):
+            raise StagingError(f"{project_path} appeared while the project was being built") from e
+        raise StagingError(f"Cannot move the project into place at {project_path}: {e}") from e
+
+
+def staged_files(root: Path) -> list[str]:
+    """Files (and symlinks) under root, relative with / separators, parents first."""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        rel = os.path.relpath(dirpath, root)
+        for name in sorted(filenames + [d for d in dirnames if os.path.islink(os.path.join(dirpath, d))]):
+            found.append(name if rel == "." else f"{rel.replace(os.sep, '/')}/{name}")
+    return found
+
+
+class Journal:
+    """Append-only log of a `--here` commit, one JSON object per line."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._f = None
+
+    def open(self, header: dict) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "w", encoding="utf-8")
+        self.record(header)
+
+    def record(self, entry: dict) -> None:
+        # Flushed before the step it describes, so a killed process leaves it on disk
+        self._f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._f.flush()
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+    def entries(self) -> list[dict]:
+        entries = []
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        break  # torn last line
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def remove(self) -> None:
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def _rollback(project_path: Path, entries: list[dict]) -> None:
+    header = entries[0] if entries else {}
+    backup = project_path / header["backup"] if "backup" in header else None
+    for entry in reversed(entries[1:]):
+        if "mkdir" in entry:
+            try:
+                (project_path / entry["mkdir"]).rmdir()
+            except OSError:
+                pass  # not empty or already gone
+            continue
+        dest = project_path / entry["dest"]
+        saved = backup / entry["dest"] if backup and entry.get("backup") else None
+        if saved is not None:
+            if os.path.lexists(saved):
+                if os.path.lexists(dest):
+                    os.unlink(dest)
+                os.replace(saved, dest)
+        elif os.path.lexists(dest):
+            os.unlink(dest)
+
+
+def _cleanup(project_path: Path, header: dict, *, rolled_back: bool = False) -> None:
+    for key in ("staging", "backup"):
+        if key in header:
+            shutil.rmtree(project_path / header[key], ignore_errors=True)
+    if rolled_back and header.get("created"):
+        try:
+            (project_path / header["created"]).rmdir()
+        except OSError:
+            pass
+
+
+def recover(project_path: Path) -> str | None:
+    """Finish or undo an interrupted `--here` commit; returns what was done, if anything."""
+    journal = Journal(project_path / JOURNAL)
+    entries = journal.entries()
+    if not entries:
+        journal.remove()
+        return None
+    header = entries[0]
+    pid = header.get("pid")
+    if (isinstance(pid, int) and pid != os.getpid() and header.get("host") == socket.gethostname()
+            and _pid_alive(pid)):
+        raise StagingError(
+            f"Another specify init (pid {pid}) is still committing into {project_path}; "
+            f"if it isn't, delete {project_path / JOURNAL} and try again"
+        )
+    if any(e.get("committed") for e in entries):
+        action = "completed"
+    else:
+        _rollback(project_path, entries)
+        action = "rolled back"
+    journal.remove()
+    _cleanup(project_path, header, rolled_back=action == "rolled back")
+    return action
+
+
+def commit_here(project_path: Path, staging: Path, backup: Path, *, created: Path | None = None) -> int:
+    """Move every file of staging into project_path, journaled; returns the file count.
+
+    On failure everything moved so far is put back and the error re-raised;
+    `created` (a directory made for the staging area) is removed if empty.
+    """
+    journal = Journal(project_path / JOURNAL)
+    header = {
+        "pid": os.getpid(),
+        "host": socket.gethostname(),
+        "staging": staging.relative_to(project_path).as_posix(),
+        "backup": backup.relative_to(project_path).as_posix(),
+    }
+    if created is not None:
+        header["created"] = created.relative_to(project_path).as_posix()
+    journal.open(header)
+    files = staged_files(staging)
+    try:
+        made = set()
+        for rel in files:
+            dest = project_path / rel
+            parent = dest.parent
+            missing = []
+            while parent != project_path and parent not in made and not parent.is_dir():
+                missing.append(parent)
+                parent = parent.parent
+            for d in reversed(missing):
+                journal.record({"mkdir": d.relative_to(project_path).as_posix()})
+                d.mkdir()
+                made.add(d)
+            if os.path.lexists(dest):
+                if dest.is_dir() and not dest.is_symlink():
+                    raise StagingError(f"Cannot replace directory {dest} with a file")
+                journal.record({"dest": rel, "backup": True})
+                saved = backup / rel
+                saved.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(dest, saved)
+            else:
+                journal.record({"dest": rel, "backup": False})
+            os.replace(staging / rel, dest)
+        journal.record({"committed": True})
+    except BaseException:
+        journal.close()
+        _rollback(project_path, journal.entries())
+        journal.remove()
+        _cleanup(project_path, header, rolled_back=True)
+        raise
+    journal.close()
+    _cleanup(project_path, header)
+    journal.remove()
+    return len(files)
+
+
+@contextmanager
+def staged(project_path: Path, *, here: bool = False):
+    """Yield a directory to build the project in; publish it if the block succeeds.
+
+    Nothing is visible at project_path until the block has succeeded; on
+    failure the staging directory and the parent directories created for it
+    are deleted and the exception re-raised.
+    """
+    pid = os.getpid()
+    if here:
+        recover(project_path)
+        specify_dir = project_path / ".specify"
+        remove_stale(specify_dir, "staging-")
+        remove_stale(specify_dir, "backup-")
+        staging = specify_dir / f"staging-{pid}"
+        backup = specify_dir / f"backup-{pid}"
+    else:
+        prefix = f".{project_path.name}.staging-"
+        remove_stale(project_path.parent, prefix)
+        staging = project_path.parent / f"{prefix}{pid}"
+    shutil.rmtree(staging, ignore_errors=True)
+    parents = make_parents(staging)
+
+    try:
+        staging.mkdir()
+        yield staging
+        with span("publish"):
+            if here:
+                created = specify_dir if specify_dir in parents else None
+                commit_here(project_path, staging, backup, created=created)
+            else:
+                publish(staging, project_path)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        if here:
+            shutil.rmtree(backup, ignore_errors=True)
+        remove_dirs(parents)
+        raise
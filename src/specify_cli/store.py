@@ -0,0 +1,266 @@
+"""
+Per-user content-addressed template store.
+
+Bundled resources are copied once per template version into the user cache
+directory (platformdirs) as objects named by their sha256. Projects are then
+materialized from those objects by reflink/copy_file_range, hardlink or a
+plain copy, so `specify init` never re-reads the package after the first run.
+
+Layout:
+    <cache>/store/objects/<aa>/<sha256>[-x]   file contents (-x: executable)
+    <cache>/store/versions/<version>-<digest> marker: size and mtime of each object
+
+Project files are always created by renaming a new file over dest, never
+by writing into an existing one: with --link-mode hardlink that file may
+be the store object itself.
+"""
+
+import errno
+import hashlib
+import os
+import shutil
+import sys
+from pathlib import Path
+
+from .manifest import MANIFEST_NAME, dump_manifest
+
+CACHE_ENV = "SPECIFY_CACHE_DIR"
+STORE_ENV = "SPECIFY_STORE_DIR"
+
+LINK_MODES = ("auto", "reflink", "hardlink", "copy")
+
+# Linux ioctl that clones a file's extents (btrfs, XFS, bcachefs, ...)
+FICLONE = 0x40049409
+
+# errnos meaning "this filesystem/kernel can't do that", not a real failure
+_UNSUPPORTED = {errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.ENOSYS, errno.EPERM}
+
+
+class StoreError(Exception):
+    """Raised when the store can't be populated from the bundled resources."""
+
+
+def cache_root() -> Path:
+    """Per-user cache directory shared by the template store and other caches."""
+    override = os.environ.get(CACHE_ENV)
+    if override:
+        return Path(override)
+    from platformdirs import user_cache_dir
+
+    return Path(user_cache_dir("specify-cli"))
+
+
+def default_store_dir() -> Path:
+    override = os.environ.get(STORE_ENV)
+    if override:
+        return Path(override)
+    return cache_root() / "store"
+
+
+def template_version(manifest: dict) -> str:
+    """Store key for a resource set: package version plus manifest digest."""
+    try:
+        from importlib.metadata import version
+
+        pkg_version = version("specify-cli")
+    except Exception:
+        pkg_version = "dev"
+    digest = hashlib.sha256(dump_manifest(manifest).encode("utf-8")).hexdigest()[:16]
+    return f"{pkg_version}-{digest}"
+
+
+def _stamp(st: os.stat_result) -> list[int]:
+    return [st.st_size, st.st_mtime_ns]
+
+
+def temp_path(dest: Path) -> Path:
+    """Unique sibling of dest to build it in before renaming it into place."""
+    import threading
+
+    return dest.with_name(f".{dest.name}.{os.getpid()}-{threading.get_ident()}.tmp")
+
+
+class TemplateStore:
+    """Content-addressed copy of the bundled resources for one template version."""
+
+    def __init__(self, root: Path, manifest: dict, version: str):
+        self.root = root
+        self.manifest = manifest
+        self.version = version
+        self.objects = root / "objects"
+        self.marker = root / "versions" / version
+        self._stamps: dict[str, list[int]] = {}
+        # Capability probes are remembered so unsupported calls fail only once
+        self._can_reflink = sys.platform.startswith("linux")
+        self._can_copy_range = hasattr(os, "copy_file_range")
+
+    @classmethod
+    def open(cls, manifest: dict, root: Path | None = None) -> "TemplateStore":
+        store = cls(root or default_store_dir(), manifest, template_version(manifest))
+        store.populate()
+        return store
+
+    def object_path(self, entry: dict) -> Path:
+        sha = entry["sha256"]
+        suffix = "-x" if entry["mode"] & 0o111 else ""
+        return self.objects / sha[:2] / f"{sha}{suffix}"
+
+    def populate(self) -> None:
+        """Store every object of this version; a no-op once the version marker exists.
+
+        Objects already in the store (from another version, or a run that
+        was interrupted) are hash-checked once here. The marker records the
+        size and mtime of each object, which `source` compares before an
+        object is used.
+        """
+        self._stamps = self._read_marker()
+        if self._stamps is not None:
+            return
+        from .manifest import KIND_OTHER
+
+        stamps = {}
+        for entry in self.manifest["files"]:
+            if entry["kind"] == KIND_OTHER:
+                continue
+            obj = self.object_path(entry)
+            if not self._matches(obj, entry):
+                self._write_object(entry)
+            stamps[obj.name] = _stamp(obj.stat())
+        self._stamps = stamps
+        self._write_marker()
+
+    def source(self, entry: dict) -> Path:
+        """Path of entry's object, restored from the package first if it changed.
+
+        Only a stat: an object that is missing, or whose size or mtime no
+        longer matches the marker (e.g. a project file hardlinked to it was
+        edited in place), is rewritten as a new file, so the edited project
+        file keeps its contents.
+        """
+        obj = self.object_path(entry)
+        try:
+            current = _stamp(obj.stat())
+        except FileNotFoundError:
+            current = None
+        if current is None or current != self._stamps.get(obj.name):
+            self._write_object(entry)
+            self._stamps[obj.name] = _stamp(obj.stat())
+            self._write_marker()
+        return obj
+
+    def _matches(self, obj: Path, entry: dict) -> bool:
+        try:
+            data = obj.read_bytes()
+        except FileNotFoundError:
+            return False
+        return hashlib.sha256(data).hexdigest() == entry["sha256"]
+
+    def _write_object(self, entry: dict) -> None:
+        from .bundle import read_resource
+
+        obj = self.object_path(entry)
+        data = read_resource(entry["path"])
+        if hashlib.sha256(data).hexdigest() != entry["sha256"]:
+            raise StoreError(f"{entry['path']} does not match {MANIFEST_NAME}; regenerate the manifest")
+        obj.parent.mkdir(parents=True, exist_ok=True)
+        # Write under a unique name and rename so concurrent populators never
+        # expose a partial object
+        tmp = obj.with_name(f".{obj.name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.chmod(tmp, 0o755 if entry["mode"] & 0o111 else 0o644)
+        os.replace(tmp, obj)
+
+    def _read_marker(self) -> dict | None:
+        import json
+
+        try:
+            with open(self.marker, encoding="utf-8") as f:
+                stamps = json.load(f).get("objects")
+        except (OSError, ValueError, AttributeError):
+            return None
+        return stamps if isinstance(stamps, dict) else None
+
+    def _write_marker(self) -> None:
+        import json
+
+        self.marker.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.marker.with_name(f".{self.marker.name}.{os.getpid()}.tmp")
+        tmp.write_text(json.dumps({"objects": self._stamps}, separators=(",", ":")) + "\n", encoding="utf-8")
+        os.replace(tmp, self.marker)
+
+    def materializer(self, link_mode: str = "auto"):
+        """Return a `copy_files` callback that creates dest from a store object."""
+        if link_mode not in LINK_MODES:
+            raise ValueError(f"Unknown link mode {link_mode!r}; choose from {', '.join(LINK_MODES)}")
+        set_exec = not sys.platform.startswith("win")
+
+        def materialize(src: Path, dest: Path, executable: bool) -> int:
+            if link_mode == "hardlink":
+                tmp = temp_path(dest)
+                try:
+                    os.link(src, tmp)
+                    os.replace(tmp, dest)
+                    return 0
+                except OSError:
+                    tmp.unlink(missing_ok=True)  # e.g. cross-device; fall back to a private copy
+            size = self.clone(src, dest, reflink=link_mode != "copy", fallback=link_mode != "reflink")
+            if executable and set_exec:
+                os.chmod(dest, os.stat(dest).st_mode | 0o111)
+            return size
+
+        return materialize
+
+    def clone(self, src: Path, dest: Path, *, reflink: bool = True, fallback: bool = True) -> int:
+        """Copy src to dest, preferring copy-on-write clones over byte copies.
+
+        The copy is made in a temporary file that then replaces dest, so an
+        existing dest (possibly hardlinked to a store object) is never
+        written through. With fallback=False a failed reflink raises instead
+        of copying.
+        """
+        tmp = temp_path(dest)
+        try:
+            size = self._clone(src, tmp, reflink=reflink, fallback=fallback)
+            os.replace(tmp, dest)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        return size
+
+    def _clone(self, src: Path, dest: Path, *, reflink: bool, fallback: bool) -> int:
+        with open(src, "rb") as rf, open(dest, "wb") as wf:
+            size = os.fstat(rf.fileno()).st_size
+            if reflink and self._can_reflink:
+                try:
+                    import fcntl
+
+                    fcntl.ioctl(wf.fileno(), FICLONE, rf.fileno())
+                    return size
+                except OSError as e:
+                    if e.errno not in _UNSUPPORTED:
+                        raise
+                    self._can_reflink = False
+            if not fallback:
+                raise StoreError("reflink is not supported on this filesystem")
+            if self._can_copy_range:
+                try:
+                    copied = 0
+                    while copied < size:
+                        n = os.copy_file_range(rf.fileno(), wf.fileno(), size - copied)
+                        if n == 0:
+                            break
+                        copied += n
+                    if copied == size:
+                        return size
+                except OSError as e:
+                    if e.errno not in _UNSUPPORTED:
+                        raise
+                    self._can_copy_range = False
+                rf.seek(0)
+                wf.seek(0)
+                wf.truncate()
+            shutil.copyfileobj(rf, wf)
+            return size
+
+    def clear(self) -> None:
+        shutil.rmtree(self.root, ignore_errors=True)
@@ -0,0 +1,97 @@
+"""
+Tool probing for `specify check` and `specify init`.
+
+Every tool `specify` knows about is registered in `TOOLS`. Probes look the
+executable up on PATH and, only when asked (`check --versions`), run it
+with its version arguments under a per-tool timeout, since starting an
+agent CLI can take seconds. `probe_all` runs all probes on a thread pool,
+so `check` takes about as long as the slowest tool rather than the sum of
+all of them, and registering another agent CLI doesn't make it slower.
+"""
+
+import shutil
+import subprocess
+import time
+from typing import NamedTuple
+
+# Tool groups, in the order `check` reports them
+GROUP_OPTIONAL = "optional"
+GROUP_AI = "ai"
+
+
+class Tool(NamedTuple):
+    name: str
+    group: str
+    install_hint: str
+    version_args: tuple[str, ...] = ("--version",)
+    timeout: float = 3.0  # seconds to wait for the version command
+
+
+TOOLS: dict[str, Tool] = {}
+
+
+def register_tool(tool: Tool) -> Tool:
+    """Add (or replace) a tool in the registry probed by `specify check`."""
+    TOOLS[tool.name] = tool
+    return tool
+
+
+register_tool(Tool("git", GROUP_OPTIONAL, "https://git-scm.com/downloads"))
+# Node based agent CLIs can take a while to start on a cold cache
+register_tool(Tool("claude", GROUP_AI, "Install from: https://docs.anthropic.com/en/docs/claude-code/setup", timeout=5.0))
+register_tool(Tool("gemini", GROUP_AI, "Install from: https://github.com/google-gemini/gemini-cli", timeout=5.0))
+
+
+def probe(tool: Tool, *, version: bool = False, timeout: float | None = None) -> dict:
+    """Locate `tool` and optionally read its version; never raises.
+
+    Returns a dict with name, group, found, path, version, error and seconds.
+    """
+    from .profile import span
+
+    with span(f"probe {tool.name}", cat="tool"):
+        return _probe(tool, version=version, timeout=timeout)
+
+
+def _probe(tool: Tool, *, version: bool, timeout: float | None) -> dict:
+    start = time.perf_counter()
+    result = {"name": tool.name, "group": tool.group, "found": False, "path": None, "version": None, "error": None}
+    path = shutil.which(tool.name)
+    if path:
+        result.update(found=True, path=path)
+        if version and tool.version_args:
+            limit = tool.timeout if timeout is None else timeout
+            try:
+                proc = subprocess.run(
+                    [path, *tool.version_args],
+                    stdin=subprocess.DEVNULL,
+                    capture_output=True,
+                    text=True,
+                    timeout=limit,
+                )
+                out = (proc.stdout or proc.stderr).strip()
+                result["version"] = out.splitlines()[0].strip() if out else None
+                if proc.returncode != 0:
+                    result["error"] = f"exited with status {proc.returncode}"
+            except subprocess.TimeoutExpired:
+                result["error"] = f"timed out after {limit:g}s"
+            except OSError as e:
+                result["error"] = str(e)
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    return result
+
+
+def probe_all(tools=None, *, version: bool = False, timeout: float | None = None, max_workers: int | None = None) -> list[dict]:
+    """Probe `tools` (default: the whole registry) concurrently; results keep registry order."""
+    tools = list(TOOLS.values()) if tools is None else list(tools)
+    if not tools:
+        return []
+    if len(tools) == 1:
+        return [probe(tools[0], version=version, timeout=timeout)]
+
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Probes mostly wait on child processes, so one thread per tool is fine
+    workers = max_workers or min(len(tools), 32)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda tool: probe(tool, version=version, timeout=timeout), tools))
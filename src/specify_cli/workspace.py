@@ -0,0 +1,164 @@
+"""
+Feature paths, prerequisites and the feature list of a repository.
+
+These are the answers the bundled scripts compute with `common.sh`
+(`get_feature_paths`, `check_feature_branch`, `check_file`/`check_dir`).
+A `Workspace` keeps the current branch and the list of feature directories
+and re-reads them only when `.git/HEAD` or `specs/` change, which a stat on
+every query detects; feature documents are stat'ed per query.
+
+Only depends on the standard library (and `repo`) so `specify serve` can
+answer from a warm instance without importing the CLI.
+"""
+
+import json
+import os
+import re
+import threading
+from pathlib import Path
+
+from .repo import current_branch, feature_dir, git_dir
+
+FEATURE_BRANCH = re.compile(r"^[0-9]{3}-")
+
+# Optional design documents, in the order AVAILABLE_DOCS lists them
+OPTIONAL_DOCS = ("research.md", "data-model.md", "contracts/", "quickstart.md")
+
+
+class WorkspaceError(Exception):
+    """A failed check; the message is what the scripts print (ERROR: ... lines)."""
+
+
+def feature_paths(repo_root: Path, branch: str) -> dict[str, str]:
+    """The variables `get_feature_paths` in common.sh sets, in the same order."""
+    fdir = feature_dir(repo_root, branch)
+    return {
+        "REPO_ROOT": str(repo_root),
+        "CURRENT_BRANCH": branch,
+        "FEATURE_DIR": str(fdir),
+        "FEATURE_SPEC": str(fdir / "spec.md"),
+        "IMPL_PLAN": str(fdir / "plan.md"),
+        "TASKS": str(fdir / "tasks.md"),
+        "RESEARCH": str(fdir / "research.md"),
+        "DATA_MODEL": str(fdir / "data-model.md"),
+        "QUICKSTART": str(fdir / "quickstart.md"),
+        "CONTRACTS_DIR": str(fdir / "contracts"),
+    }
+
+
+def check_feature_branch(branch: str) -> None:
+    if not FEATURE_BRANCH.match(branch):
+        raise WorkspaceError(
+            f"ERROR: Not on a feature branch. Current branch: {branch}\n"
+            "Feature branches should be named like: 001-feature-name"
+        )
+
+
+def feature_documents(fdir: Path) -> dict[str, bool]:
+    """Which feature documents exist: every file plus a non-empty contracts/."""
+    docs = {}
+    for name in ("spec.md", "plan.md", "tasks.md", "research.md", "data-model.md", "quickstart.md"):
+        docs[name] = os.path.isfile(fdir / name)
+    try:
+        with os.scandir(fdir / "contracts") as it:
+            docs["contracts/"] = any(True for _ in it)
+    except OSError:
+        docs["contracts/"] = False
+    return docs
+
+
+def _shell_quote(value: str) -> str:
+    return "'" + value.replace("'", "'\"'\"'") + "'"
+
+
+def report(ws: "Workspace", *, paths_only: bool = False, fmt: str = "text") -> tuple[int, str]:
+    """Exit status and output of check-task-prerequisites.sh (or, with
+    paths_only, get-feature-paths.sh) in fmt: text, json or shell (eval).
+
+    Failed checks give status 1 and the scripts' ERROR message.
+    """
+    try:
+        paths = ws.paths()
+        check_feature_branch(paths["CURRENT_BRANCH"])
+        info = None if paths_only else ws.prereqs()
+    except WorkspaceError as e:
+        return 1, str(e)
+
+    if fmt == "shell":
+        values = dict(paths)
+        if info is not None:
+            values["AVAILABLE_DOCS"] = " ".join(info["AVAILABLE_DOCS"])
+        return 0, "\n".join(f"{key}={_shell_quote(value)}" for key, value in values.items())
+    if fmt == "json":
+        data = paths if info is None else {"FEATURE_DIR": info["FEATURE_DIR"], "AVAILABLE_DOCS": info["AVAILABLE_DOCS"]}
+        return 0, json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    if info is None:
+        labels = (("REPO_ROOT", "REPO_ROOT"), ("BRANCH", "CURRENT_BRANCH"), ("FEATURE_DIR", "FEATURE_DIR"),
+                  ("FEATURE_SPEC", "FEATURE_SPEC"), ("IMPL_PLAN", "IMPL_PLAN"), ("TASKS", "TASKS"))
+        return 0, "\n".join(f"{label}: {paths[key]}" for label, key in labels)
+    lines = [f"FEATURE_DIR:{info['FEATURE_DIR']}", "AVAILABLE_DOCS:"]
+    lines += [f"  {'✓' if info['DOCS'][name] else '✗'} {name}" for name in OPTIONAL_DOCS]
+    return 0, "\n".join(lines)
+
+
+def _stamp(path: Path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+
+class Workspace:
+    """Warm, self-invalidating state for one repository root. Thread safe."""
+
+    def __init__(self, repo_root: Path):
+        self.repo_root = repo_root
+        self.head = git_dir(repo_root) / "HEAD"
+        self.specs = repo_root / "specs"
+        self._lock = threading.Lock()
+        self._head_stamp = self._specs_stamp = object()
+        self._branch = None
+        self._features = None
+
+    def branch(self) -> str:
+        stamp = _stamp(self.head)
+        with self._lock:
+            if stamp != self._head_stamp or self._branch is None:
+                self._branch = current_branch(self.repo_root)
+                self._head_stamp = stamp
+            return self._branch
+
+    def paths(self) -> dict[str, str]:
+        return feature_paths(self.repo_root, self.branch())
+
+    def prereqs(self) -> dict:
+        """What check-task-prerequisites.sh reports; raises WorkspaceError on a failed check."""
+        branch = self.branch()
+        check_feature_branch(branch)
+        fdir = feature_dir(self.repo_root, branch)
+        if not fdir.is_dir():
+            raise WorkspaceError(f"ERROR: Feature directory not found: {fdir}\nRun /specify first to create the feature structure.")
+        docs = feature_documents(fdir)
+        if not docs["plan.md"]:
+            raise WorkspaceError(f"ERROR: plan.md not found in {fdir}\nRun /plan first to create the plan.")
+        return {
+            "FEATURE_DIR": str(fdir),
+            "AVAILABLE_DOCS": [name for name in OPTIONAL_DOCS if docs[name]],
+            "DOCS": docs,
+        }
+
+    def features(self) -> list[dict]:
+        """Feature directories under specs/, sorted by name."""
+        stamp = _stamp(self.specs)
+        with self._lock:
+            if stamp != self._specs_stamp or self._features is None:
+                found = []
+                if stamp is not None:
+                    with os.scandir(self.specs) as it:
+                        for entry in it:
+                            if FEATURE_BRANCH.match(entry.name) and entry.is_dir():
+                                found.append({"number": entry.name[:3], "name": entry.name, "dir": entry.path})
+                self._features = sorted(found, key=lambda f: f["name"])
+                self._specs_stamp = stamp
+            return list(self._features)
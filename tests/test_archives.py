@@ -0,0 +1,29 @@
+"""Release archives written by `specify pack`."""
+
+import zipfile
+from pathlib import Path
+
+import specify_cli
+from specify_cli.pack import pack_all
+
+
+def pack(output_dir: Path) -> Path:
+    (result,) = pack_all(["claude"], lang="en", version="v0.0.0", output_dir=output_dir,
+                         scaffold_outputs=specify_cli.scaffold_outputs, jobs=1)
+    assert result["status"] == "ok", result["error"]
+    return Path(result["path"])
+
+
+def test_pack_entries_are_deflated(tmp_path):
+    with zipfile.ZipFile(pack(tmp_path)) as zf:
+        infos = zf.infolist()
+    assert infos
+    assert {info.compress_type for info in infos} == {zipfile.ZIP_DEFLATED}
+    assert sum(info.compress_size for info in infos) < sum(info.file_size for info in infos)
+
+
+def test_pack_is_deterministic(tmp_path):
+    first = pack(tmp_path / "a").read_bytes()
+    second = pack(tmp_path / "b").read_bytes()
+    assert first == second
+
@@ -0,0 +1,58 @@
+"""`specify init-batch` scaffolds exactly what `specify init` does per project."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import specify_cli
+
+SRC = Path(specify_cli.__file__).resolve().parent.parent
+RUN_CLI = "import sys; from specify_cli import main; sys.exit(main())"
+
+PROJECTS = [
+    {"project": "alpha", "ai": "claude", "git": False},
+    {"project": "beta", "ai": "gemini", "lang": "ja", "git": False},
+    {"project": "gamma", "ai": "claude,copilot", "lang": "ja", "git": False},
+]
+
+
+def specify(cwd: Path, cache: Path, *args) -> subprocess.CompletedProcess:
+    env = {k: v for k, v in os.environ.items() if not k.startswith("SPECIFY_")}
+    env.update(PYTHONPATH=str(SRC), SPECIFY_CACHE_DIR=str(cache), SPECIFY_SOCKET=str(cwd / "no-daemon.sock"))
+    proc = subprocess.run([sys.executable, "-c", RUN_CLI, *args], cwd=cwd, env=env,
+                          stdin=subprocess.DEVNULL, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    return proc
+
+
+def snapshot(project: Path) -> dict:
+    """Every file's bytes and exec bit; lock records without their mtimes."""
+    files = {}
+    for path in sorted(project.rglob("*")):
+        if not path.is_file():
+            continue
+        rel = path.relative_to(project).as_posix()
+        data = path.read_bytes()
+        if rel == ".specify/lock.json":
+            lock = json.loads(data)
+            data = {rel: record["sha256"] for rel, record in lock.pop("files").items()}, lock
+        files[rel] = (data, bool(path.stat().st_mode & 0o111))
+    return files
+
+
+def test_batch_matches_individual_inits(tmp_path):
+    batch_dir, single_dir = tmp_path / "batch", tmp_path / "single"
+    batch_dir.mkdir()
+    single_dir.mkdir()
+    (batch_dir / "projects.json").write_text(json.dumps(PROJECTS), encoding="utf-8")
+
+    proc = specify(batch_dir, tmp_path / "cache-batch", "init-batch", "projects.json", "--jobs", "2", "--json")
+    results = json.loads(proc.stdout)
+    assert [r["status"] for r in results] == ["ok"] * len(PROJECTS)
+
+    for spec in PROJECTS:
+        specify(single_dir, tmp_path / "cache-single", "--lang", spec.get("lang", "en"), "init", spec["project"],
+                "--ai", spec["ai"], "--no-git", "--ignore-agent-tools", "--yes")
+        assert snapshot(batch_dir / spec["project"]) == snapshot(single_dir / spec["project"])
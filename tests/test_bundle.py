@@ -0,0 +1,21 @@
+"""The resource archive embedded in the single-file build."""
+
+import io
+import zipfile
+from pathlib import Path
+
+import specify_cli
+from specify_cli.bundle import build_resource_archive
+
+RESOURCES = Path(specify_cli.__file__).parent / "resources"
+
+
+def test_resource_archive_is_deflated():
+    with zipfile.ZipFile(io.BytesIO(build_resource_archive(RESOURCES))) as zf:
+        infos = zf.infolist()
+    assert "manifest.json" in {info.filename for info in infos}
+    assert {info.compress_type for info in infos} == {zipfile.ZIP_DEFLATED}
+
+
+def test_resource_archive_is_deterministic():
+    assert build_resource_archive(RESOURCES) == build_resource_archive(RESOURCES)
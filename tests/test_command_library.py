@@ -0,0 +1,110 @@
+"""Command libraries: layering directories over the bundled templates, and `specify commands sync`."""
+
+import pytest
+
+import specify_cli
+from specify_cli.command_library import PARALLEL_MIN, CommandLibraryError, layered_templates, resolve_dirs, sync_commands
+from specify_cli.lockfile import ADDED, KEPT, REMOVED, UNCHANGED, UPDATED, read_lock, write_lock
+from specify_cli.store import CACHE_ENV
+
+CACHED = (specify_cli.open_template_store, specify_cli.open_command_cache, specify_cli.load_command_templates)
+BUNDLED = ["plan", "specify", "tasks"]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(tmp_path, monkeypatch):
+    """Point the per-user cache at tmp_path and forget what this process loaded."""
+    monkeypatch.setenv(CACHE_ENV, str(tmp_path / "cache"))
+    for fn in CACHED:
+        fn.cache_clear()
+    yield
+    for fn in CACHED:
+        fn.cache_clear()
+
+
+def library(path, **templates):
+    path.mkdir(parents=True, exist_ok=True)
+    for name, body in templates.items():
+        (path / f"{name}.md").write_text(f"---\ndescription: {name} from {path.name}\n---\n{body} {{ARGS}}\n",
+                                         encoding="utf-8")
+    return path
+
+
+def test_later_layers_override_earlier_ones(tmp_path):
+    house = library(tmp_path / "house", specify="house specify", review="house review")
+    team = library(tmp_path / "team", review="team review", deploy="team deploy")
+    templates, sources = layered_templates(specify_cli.load_command_templates(), [house, team])
+
+    assert [t.name for t in templates] == [*BUNDLED, "review", "deploy"]
+    assert sources == {"plan": "bundled", "specify": str(house), "tasks": "bundled",
+                       "review": str(team), "deploy": str(team)}
+    bodies = {t.name: t.substitute("$ARGUMENTS") for t in templates}
+    assert bodies["specify"] == "house specify $ARGUMENTS"
+    assert bodies["review"] == "team review $ARGUMENTS"
+
+
+def test_parallel_loading_matches_serial(tmp_path):
+    big = library(tmp_path / "big", **{f"cmd{n:03d}": f"command {n}" for n in range(PARALLEL_MIN + 6)})
+    bundled = specify_cli.load_command_templates()
+    serial, _ = layered_templates(bundled, [big], jobs=1)
+    parallel, _ = layered_templates(bundled, [big], jobs=4)
+    assert [(t.name, t.substitute("$A")) for t in parallel] == [(t.name, t.substitute("$A")) for t in serial]
+
+
+def test_missing_directory_is_an_error(tmp_path):
+    with pytest.raises(CommandLibraryError, match="not found"):
+        resolve_dirs(["nowhere"], tmp_path)
+
+
+@pytest.fixture
+def project(tmp_path):
+    project = tmp_path / "project"
+    project.mkdir()
+    write_lock(project, ai="claude", lang="en", version="v0", files={})
+    return project
+
+
+def sync(project, *dirs, **kwargs):
+    return sync_commands(project, ["claude"], list(dirs), lock=read_lock(project), **kwargs)
+
+
+def test_sync_renders_the_layers_and_records_them(project):
+    house = library(project / "house", specify="house specify", review="house review")
+    report = sync(project, house)
+
+    assert report["actions"] == {f".claude/commands/{name}.md": ADDED for name in [*BUNDLED, "review"]}
+    assert (report["templates"], report["from_dirs"], report["overridden"]) == (4, 2, 1)
+    assert (project / ".claude/commands/specify.md").read_text(encoding="utf-8") == "house specify $ARGUMENTS"
+    lock = read_lock(project)
+    assert lock["commands_dirs"] == ["house"]
+    assert set(lock["files"]) == set(report["actions"])
+
+    again = sync(project, house)
+    assert set(again["actions"].values()) == {UNCHANGED}
+
+
+def test_sync_removes_stale_outputs_but_keeps_local_edits(project):
+    house = library(project / "house", specify="house specify", review="house review", deploy="house deploy")
+    sync(project, house)
+    edited = project / ".claude/commands/deploy.md"
+    edited.write_text("my deploy\n", encoding="utf-8")
+
+    report = sync(project)
+    assert report["actions"][".claude/commands/specify.md"] == UPDATED
+    assert report["actions"][".claude/commands/review.md"] == REMOVED
+    assert report["actions"][".claude/commands/deploy.md"] == KEPT
+    assert not (project / ".claude/commands/review.md").exists()
+    assert edited.read_text(encoding="utf-8") == "my deploy\n"
+    assert "commands_dirs" not in read_lock(project)
+    # Still remembered as generated, so a forced sync can remove it
+    assert sync(project, force=True)["actions"][".claude/commands/deploy.md"] == REMOVED
+    assert not edited.exists()
+
+
+def test_dry_run_changes_nothing(project):
+    house = library(project / "house", review="house review")
+    before = (project / ".specify/lock.json").read_bytes()
+    report = sync(project, house, dry_run=True)
+    assert report["actions"][".claude/commands/review.md"] == ADDED
+    assert not (project / ".claude").exists()
+    assert (project / ".specify/lock.json").read_bytes() == before
@@ -0,0 +1,83 @@
+"""Rendering agent commands from compiled templates, and the compiled-template cache."""
+
+import pytest
+
+import specify_cli
+from specify_cli.bundle import resource_root
+from specify_cli.command_cache import CommandCache, CommandTemplate
+from specify_cli.command_library import render_all
+from specify_cli.manifest import KIND_COMMAND, load_manifest, select
+from specify_cli.store import CACHE_ENV
+
+CACHED = (specify_cli.open_template_store, specify_cli.open_command_cache, specify_cli.load_command_templates)
+
+
+@pytest.fixture
+def fresh_cache(tmp_path, monkeypatch):
+    """Point the per-user cache at tmp_path and forget what this process loaded."""
+    monkeypatch.setenv(CACHE_ENV, str(tmp_path / "cache"))
+    for fn in CACHED:
+        fn.cache_clear()
+    yield
+    for fn in CACHED:
+        fn.cache_clear()
+
+
+def reference_render(raw: str, ai: str) -> str:
+    """One agent's output the way it was produced before templates were compiled."""
+    meta, body = specify_cli.parse_front_matter_and_body(raw)
+    if ai == "gemini":
+        content = body.replace("{ARGS}", "{{args}}")
+        return "\n".join([f"description = \"{meta.get('description', '')}\"", "", "prompt = \"\"\"", content, "\"\"\""]) + "\n"
+    content = body.replace("{ARGS}", "$ARGUMENTS")
+    if ai == "copilot":
+        desc = meta.get("description", "").split(". ")[0].strip()
+        return "\n".join([f"# {desc}" if desc else "# Prompt", "", content]) + "\n"
+    return content
+
+
+def test_all_agents_render_in_one_pass_like_each_agent_alone(fresh_cache):
+    outputs = specify_cli.render_agent_commands("all")
+    expected = {}
+    for entry in select(load_manifest(), KIND_COMMAND):
+        raw = (resource_root() / entry["path"]).read_text(encoding="utf-8")
+        name = entry["path"].rsplit("/", 1)[1][:-len(".md")]
+        for ai, (out_dir, suffix, _) in specify_cli.AGENT_COMMAND_FORMATS.items():
+            expected[f"{out_dir}/{name}{suffix}"] = reference_render(raw, ai)
+    assert outputs == expected
+
+
+def test_substitute_matches_str_replace():
+    body = "{ARGS}{ARGS} run {ARGS}\nno placeholder {ARG} here {ARGS}"
+    template = specify_cli.compile_command_template("demo", body)
+    assert template.substitute("$ARGUMENTS") == body.replace("{ARGS}", "$ARGUMENTS")
+    assert render_all([template], ["claude"]) == {".claude/commands/demo.md": template.substitute("$ARGUMENTS")}
+
+
+def test_cache_round_trip_and_counters(tmp_path):
+    cache = CommandCache(tmp_path)
+    template = CommandTemplate("demo", {"description": "Demo"}, "say {ARGS}", (4,))
+    assert cache.get("abc", "demo") is None
+    cache.put("abc", template)
+    assert cache.get("abc", "renamed") == template._replace(name="renamed")
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cache.entries() == 1
+
+
+def test_corrupt_cache_entries_are_misses(tmp_path):
+    cache = CommandCache(tmp_path)
+    cache.put("abc", CommandTemplate("demo", {}, "body", ()))
+    next(cache.dir.glob("*.json")).write_text("{not json", encoding="utf-8")
+    assert cache.get("abc", "demo") is None
+    assert cache.misses == 1
+
+
+def test_second_load_is_served_from_the_cache(fresh_cache):
+    first = specify_cli.load_command_templates()
+    assert specify_cli.open_command_cache().hits == 0
+    specify_cli.open_command_cache.cache_clear()
+    specify_cli.load_command_templates.cache_clear()
+    second = specify_cli.load_command_templates()
+    cache = specify_cli.open_command_cache()
+    assert (cache.hits, cache.misses) == (len(first), 0)
+    assert second == first
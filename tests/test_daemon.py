@@ -0,0 +1,174 @@
+"""`specify serve`: the socket protocol, and what its clients are willing to trust."""
+
+import json
+import os
+import shutil
+import socket
+import socketserver
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+import specify_cli
+from specify_cli.daemon import DaemonError, SpecifyServer, check_socket, make_socket_dir, request
+
+SCRIPTS = Path(specify_cli.__file__).parent / "resources" / "scripts"
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX") or not shutil.which("git"),
+                                reason="needs Unix sockets and git")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    repo = tmp_path / "repo"
+    (repo / "specs" / "001-demo").mkdir(parents=True)
+    (repo / "specs" / "001-demo" / "spec.md").write_text("# Demo\n", encoding="utf-8")
+    git = ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@example.invalid"]
+    subprocess.run([*git, "init", "-q", "-b", "001-demo"], check=True)
+    subprocess.run([*git, "commit", "-q", "--allow-empty", "-m", "init"], check=True)
+    return repo
+
+
+@pytest.fixture
+def sock(tmp_path):
+    run = tmp_path / "run"
+    run.mkdir(mode=0o700)
+    return run / "daemon.sock"
+
+
+def serving(server):
+    thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+    thread.start()
+    return server
+
+
+@pytest.fixture
+def daemon(sock):
+    make_socket_dir(sock)
+    old = os.umask(0o077)
+    try:
+        server = serving(SpecifyServer(sock, idle_timeout=0))
+    finally:
+        os.umask(old)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def impostor(sock):
+    """A server on `sock` that answers every request with `impostor.response`."""
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            self.rfile.readline()
+            self.wfile.write(json.dumps(server.response).encode("utf-8") + b"\n")
+
+    old = os.umask(0o077)
+    try:
+        server = serving(socketserver.ThreadingUnixStreamServer(str(sock), Handler))
+    finally:
+        os.umask(old)
+    server.response = {"ok": True, "result": {}}
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def query(sock, cwd, *args) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, "-I", "-S", str(SCRIPTS / "specify-query.py"), "--socket", str(sock), *args],
+                          cwd=cwd, capture_output=True, text=True)
+
+
+def test_protocol(daemon, sock, repo):
+    assert request("ping", path=sock)["result"]["pid"] == os.getpid()
+    paths = request("paths", path=sock, cwd=str(repo))["result"]
+    assert paths["CURRENT_BRANCH"] == "001-demo"
+    assert paths["FEATURE_SPEC"] == str(repo / "specs" / "001-demo" / "spec.md")
+    report = request("report", path=sock, cwd=str(repo), paths_only=True, format="json")["result"]
+    assert report["status"] == 0 and json.loads(report["output"]) == paths
+    assert request("bogus", path=sock, cwd=str(repo)) == {"ok": False, "error": "ERROR: Unknown op 'bogus'"}
+    assert request("ping", path=sock)["result"]["workspaces"] == [str(repo)]
+
+
+def test_query_client_prints_assignments_for_eval(daemon, sock, repo):
+    proc = query(sock, repo, "paths")
+    assert proc.returncode == 0, proc.stderr
+    out = subprocess.run(["bash", "-c", f'eval "$1"; echo "$FEATURE_DIR"', "-", proc.stdout],
+                         capture_output=True, text=True).stdout
+    assert out.strip() == str(repo / "specs" / "001-demo")
+
+
+def test_socket_and_directory_must_be_private(daemon, sock, repo):
+    sock.parent.chmod(0o755)
+    assert query(sock, repo, "paths").returncode == 3
+    with pytest.raises(DaemonError, match="accessible to other users"):
+        check_socket(sock)
+    sock.parent.chmod(0o700)
+    sock.chmod(0o766)
+    assert query(sock, repo, "paths").returncode == 3
+    with pytest.raises(DaemonError, match="accessible to other users"):
+        check_socket(sock)
+
+
+def test_symlinked_socket_is_refused(daemon, sock, repo):
+    link = sock.parent / "link.sock"
+    link.symlink_to(sock)
+    assert query(link, repo, "paths").returncode == 3
+    with pytest.raises(DaemonError, match="not a socket"):
+        check_socket(link)
+
+
+def test_server_refuses_a_shared_directory(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir(mode=0o777)
+    shared.chmod(0o777)
+    with pytest.raises(DaemonError, match="accessible to other users"):
+        make_socket_dir(shared / "daemon.sock")
+
+
+@pytest.mark.parametrize("result", [
+    {"REPO_ROOT": "/repo", "PATH": "/tmp/evil"},
+    {"REPO_ROOT": ["not", "a", "string"]},
+    "REPO_ROOT=/repo",
+], ids=["unknown-key", "non-string", "not-a-dict"])
+def test_unexpected_paths_are_not_printed(impostor, sock, repo, result):
+    impostor.response = {"ok": True, "result": result}
+    proc = query(sock, repo, "paths")
+    assert (proc.returncode, proc.stdout) == (3, "")
+
+
+@pytest.mark.parametrize("result", [
+    {"status": 7, "output": "FEATURE_DIR:/x"},
+    {"status": "0", "output": "FEATURE_DIR:/x"},
+], ids=["undocumented-status", "string-status"])
+def test_undocumented_report_statuses_are_not_passed_on(impostor, sock, repo, result):
+    impostor.response = {"ok": True, "result": result}
+    assert query(sock, repo, "report").returncode == 3
+
+
+def test_shell_report_only_carries_known_assignments(impostor, sock, repo):
+    impostor.response = {"ok": True, "result": {"status": 0, "output": "FEATURE_DIR='/x'\nPATH='/tmp/evil'"}}
+    assert query(sock, repo, "report", "--shell").returncode == 3
+    impostor.response = {"ok": True, "result": {"status": 0, "output": "FEATURE_DIR='/x'; touch pwned"}}
+    assert query(sock, repo, "report", "--shell").returncode == 3
+    impostor.response = {"ok": True, "result": {"status": 0, "output": "FEATURE_DIR='it'\"'\"'s'"}}
+    assert query(sock, repo, "report", "--shell").returncode == 0
+
+
+@pytest.mark.parametrize("client", ["real", "broken"])
+def test_prereq_scripts_fall_back_on_undocumented_statuses(impostor, sock, repo, client):
+    shutil.copytree(SCRIPTS, repo / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    impostor.response = {"ok": True, "result": {"status": 5, "output": "FROM-DAEMON"}}
+    if client == "broken":
+        # common.sh itself only passes on 0 and 1, whatever the client exits with
+        (repo / "scripts" / "specify-query.py").write_text("import sys\nprint('FROM-DAEMON')\nsys.exit(5)\n")
+    env = {k: v for k, v in os.environ.items() if not k.startswith("SPECIFY_")}
+    env["SPECIFY_SOCKET"] = str(sock)
+    proc = subprocess.run(["bash", str(repo / "scripts" / "get-feature-paths.sh")], cwd=repo, env=env,
+                          capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert "FROM-DAEMON" not in proc.stdout and "FEATURE_DIR" in proc.stdout
@@ -0,0 +1,55 @@
+"""Feature numbering from the specs/.index/ state, and when it is rescanned."""
+
+import os
+
+import pytest
+
+from specify_cli import features
+from specify_cli.features import create_feature, highest_feature_number
+
+
+@pytest.fixture
+def specs(tmp_path):
+    for name in ("001-first", "002-second"):
+        (tmp_path / "specs" / name).mkdir(parents=True)
+    create_feature(tmp_path, "third feature", branch=False)
+    return tmp_path / "specs"
+
+
+@pytest.fixture
+def scans(monkeypatch):
+    counted = []
+    scan = features.scan_highest
+    monkeypatch.setattr(features, "scan_highest", lambda d: counted.append(d) or scan(d))
+    return counted
+
+
+def test_fresh_index_skips_the_listing(specs, scans):
+    assert highest_feature_number(specs) == 3
+    assert scans == []
+
+
+def test_directories_added_elsewhere_are_found(specs, scans):
+    (specs / "007-from-another-branch").mkdir()
+    assert highest_feature_number(specs) == 7
+    assert scans == [specs]
+
+
+def test_change_in_the_same_mtime_tick_is_found(specs, scans):
+    # A filesystem with coarse timestamps: the mtime of specs/ doesn't move
+    st = os.stat(specs)
+    (specs / "009-same-tick").mkdir()
+    os.utime(specs, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert highest_feature_number(specs) == 9
+
+
+def test_index_written_in_the_same_tick_is_not_trusted(specs, scans):
+    st = os.stat(specs)
+    os.utime(specs / ".index" / "state.json", ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert highest_feature_number(specs) == 3
+    assert scans == [specs]
+
+
+def test_numbers_continue_from_the_index(specs):
+    assert create_feature(specs.parent, "fourth one", branch=False)["FEATURE_NUM"] == "004"
+    assert create_feature(specs.parent, "fifth one", branch=False)["FEATURE_NUM"] == "005"
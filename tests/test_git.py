@@ -0,0 +1,61 @@
+"""The git step: `git -C` instead of chdir, staging only the scaffolded files."""
+
+import os
+import subprocess
+
+import pytest
+
+from specify_cli import init_git_repo, is_git_repo
+
+
+@pytest.fixture(autouse=True)
+def git_identity(monkeypatch):
+    for role in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{role}_NAME", "Spec Kit")
+        monkeypatch.setenv(f"GIT_{role}_EMAIL", "spec-kit@example.com")
+
+
+def tracked(path) -> set[str]:
+    out = subprocess.run(["git", "-C", str(path), "ls-files", "-z"], check=True, capture_output=True, text=True).stdout
+    return set(filter(None, out.split("\0")))
+
+
+def test_stages_only_the_listed_paths(tmp_path):
+    scaffolded = ["README.md", "scripts/common.sh", "with space.md", "日本語.md"]
+    for rel in [*scaffolded, "user/data.bin", "notes.md"]:
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text(rel, encoding="utf-8")
+    cwd = os.getcwd()
+    assert init_git_repo(tmp_path, quiet=True, paths=scaffolded)
+    assert os.getcwd() == cwd
+    assert tracked(tmp_path) == set(scaffolded)
+
+
+def test_paths_are_not_pathspec_magic(tmp_path):
+    # A glob or ":" prefix in a scaffolded file name must not pull in other files
+    scaffolded = ["*.md", ":(top)x", "[ab].txt"]
+    for rel in [*scaffolded, "user.md", "a.txt", "x"]:
+        (tmp_path / rel).write_text(rel, encoding="utf-8")
+    assert init_git_repo(tmp_path, quiet=True, paths=scaffolded)
+    assert tracked(tmp_path) == set(scaffolded)
+
+
+def test_without_paths_everything_is_staged(tmp_path):
+    for rel in ("a.md", "b/c.md"):
+        (tmp_path / rel).parent.mkdir(parents=True, exist_ok=True)
+        (tmp_path / rel).write_text(rel, encoding="utf-8")
+    assert init_git_repo(tmp_path, quiet=True)
+    assert tracked(tmp_path) == {"a.md", "b/c.md"}
+
+
+def test_is_git_repo_checks_the_given_path(tmp_path, monkeypatch):
+    monkeypatch.delenv("GIT_DIR", raising=False)
+    repo, outside = tmp_path / "repo", tmp_path / "outside"
+    (repo / "sub").mkdir(parents=True)
+    outside.mkdir()
+    (repo / "f").write_text("f", encoding="utf-8")
+    assert init_git_repo(repo, quiet=True, paths=["f"])
+    monkeypatch.chdir(outside)
+    assert is_git_repo(repo / "sub")
+    assert not is_git_repo(outside)
+    assert not is_git_repo(repo / "missing")
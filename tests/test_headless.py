@@ -0,0 +1,56 @@
+"""Headless `specify init` (--yes/--quiet/non-TTY) never loads the interactive UI."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import specify_cli
+
+SRC = Path(specify_cli.__file__).resolve().parent.parent
+INTERACTIVE = ("rich.live", "readchar")
+
+# Runs the CLI and records, at exit, which INTERACTIVE modules were loaded
+RUN_CLI = f"""
+import atexit, json, os, sys
+def record():
+    with open(os.environ["MODULES_OUT"], "w") as f:
+        json.dump([m for m in {INTERACTIVE!r} if m in sys.modules], f)
+atexit.register(record)
+from specify_cli import main
+sys.exit(main())
+"""
+
+
+def init(tmp_path, *args) -> tuple[subprocess.CompletedProcess, list[str]]:
+    modules_out = tmp_path / "modules.json"
+    env = {k: v for k, v in os.environ.items() if not k.startswith("SPECIFY_")}
+    env.update(PYTHONPATH=str(SRC), MODULES_OUT=str(modules_out), SPECIFY_CACHE_DIR=str(tmp_path / "cache"),
+               SPECIFY_SOCKET=str(tmp_path / "no-daemon.sock"))
+    argv = [sys.executable, "-c", RUN_CLI, "init", str(tmp_path / "project"), "--ai", "claude",
+            "--ignore-agent-tools", "--no-git", *args]
+    proc = subprocess.run(argv, env=env, stdin=subprocess.DEVNULL, capture_output=True, text=True)
+    return proc, json.loads(modules_out.read_text())
+
+
+@pytest.mark.parametrize("args", [["--yes"], ["--quiet"], []], ids=["yes", "quiet", "non-tty"])
+def test_headless_init_skips_interactive_ui(tmp_path, args):
+    proc, modules = init(tmp_path, *args)
+    assert proc.returncode == 0, proc.stderr
+    assert modules == []
+    assert json.loads(proc.stdout)["status"] == "ok"
+    assert any((tmp_path / "project").iterdir())
+
+
+def test_json_progress_is_ndjson(tmp_path):
+    proc, modules = init(tmp_path, "--yes", "--progress", "json")
+    assert proc.returncode == 0, proc.stderr
+    assert modules == []
+    events = [json.loads(line) for line in proc.stderr.splitlines()]
+    steps = [e for e in events if e["event"] == "step"]
+    assert steps and all({"key", "status"} <= set(e) for e in steps)
+    assert events[-1]["event"] == "done" and events[-1]["status"] == "ok"
+    assert json.loads(proc.stdout)["status"] == "ok"
@@ -0,0 +1,30 @@
+"""Start-up cost: importing the CLI must not pull in the heavy UI dependencies."""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import specify_cli
+
+SRC = Path(specify_cli.__file__).resolve().parent.parent
+DEFERRED = ("rich", "readchar", "httpx", "typer.rich_utils")
+
+
+def loaded_after(code: str) -> list[str]:
+    """Which DEFERRED modules are in sys.modules after running code in a fresh interpreter."""
+    probe = f"{code}\nimport json, sys\nprint(json.dumps([m for m in {DEFERRED!r} if m in sys.modules]))"
+    env = dict(os.environ, PYTHONPATH=str(SRC))
+    out = subprocess.run([sys.executable, "-c", probe], env=env, check=True, capture_output=True, text=True).stdout
+    return json.loads(out.splitlines()[-1])
+
+
+def test_import_defers_ui_modules():
+    assert loaded_after("import specify_cli") == []
+
+
+def test_help_defers_ui_modules():
+    run_help = "import sys\nfrom specify_cli import main\ntry:\n    main()\nexcept SystemExit:\n    pass"
+    for argv in (["--help"], ["init", "--help"]):
+        assert loaded_after(f"import sys\nsys.argv = ['specify', *{argv!r}]\n{run_help}") == []
@@ -0,0 +1,49 @@
+"""Local state under specs/.index/ stays out of git."""
+
+import shutil
+import subprocess
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not shutil.which("git"), reason="needs git")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    feature = tmp_path / "specs" / "001-demo"
+    feature.mkdir(parents=True)
+    (feature / "spec.md").write_text("# Demo\n\n## Requirements\n\nUsers can log in.\n", encoding="utf-8")
+    return tmp_path
+
+
+def untracked(repo) -> list[str]:
+    out = subprocess.run(["git", "-C", str(repo), "status", "--porcelain", "--untracked-files=all"],
+                         check=True, capture_output=True, text=True).stdout
+    return [line[3:] for line in out.splitlines()]
+
+
+def test_feature_index_is_ignored(repo):
+    from specify_cli.features import create_feature
+
+    create_feature(repo, "second feature", branch=False)
+    assert (repo / "specs" / ".index" / "state.json").exists()
+    assert not [p for p in untracked(repo) if ".index" in p]
+
+
+def test_lint_cache_is_ignored(repo):
+    from specify_cli.lint import CACHE_FILE, lint_repo
+
+    lint_repo(repo, jobs=1)
+    assert (repo / CACHE_FILE).exists()
+    assert not [p for p in untracked(repo) if ".index" in p]
+
+
+def test_search_database_is_ignored(repo):
+    from specify_cli.search import DB_FILE, SearchIndex
+
+    with SearchIndex(repo) as idx:
+        idx.update()
+        assert idx.search("users")
+        assert not [p for p in untracked(repo) if ".index" in p]  # -wal/-shm exist while open
+    assert (repo / DB_FILE).exists()
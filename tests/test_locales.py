@@ -0,0 +1,73 @@
+"""Locale overlays resolved before any I/O, and UI catalogs loaded per language."""
+
+import pytest
+
+import specify_cli
+from specify_cli.bundle import resource_root
+from specify_cli.i18n import Catalogs
+from specify_cli.manifest import KIND_FILE, load_manifest, locale_chain, resolve
+
+
+def entry(path, dest, locale=None, agents=None):
+    return {"path": path, "kind": KIND_FILE, "dest": dest, "locale": locale, "agents": agents}
+
+
+MANIFEST = {"files": [
+    entry("templates/plan.md", "templates/plan.md"),
+    entry("locales/ja/templates/plan.md", "templates/plan.md", "ja"),
+    entry("locales/ja-JP/templates/plan.md", "templates/plan.md", "ja-JP"),
+    entry("templates/spec.md", "templates/spec.md"),
+    entry("locales/ja/README.md", "README.md", "ja"),
+    entry("locales/fr/templates/spec.md", "templates/spec.md", "fr"),
+    entry("agent_templates/gemini/GEMINI.md", "GEMINI.md", agents=["gemini"]),
+]}
+
+
+def test_locale_chain_goes_from_specific_to_neutral():
+    assert locale_chain("ja-JP") == ["ja-JP", "ja", None]
+    assert locale_chain("en") == ["en", None]
+    assert locale_chain(None) == [None]
+
+
+@pytest.mark.parametrize("locale, expected", [
+    (None, {"templates/plan.md": "templates/plan.md", "templates/spec.md": "templates/spec.md"}),
+    ("en", {"templates/plan.md": "templates/plan.md", "templates/spec.md": "templates/spec.md"}),
+    ("ja", {"templates/plan.md": "locales/ja/templates/plan.md", "templates/spec.md": "templates/spec.md",
+            "README.md": "locales/ja/README.md"}),
+    ("ja-JP", {"templates/plan.md": "locales/ja-JP/templates/plan.md", "templates/spec.md": "templates/spec.md",
+               "README.md": "locales/ja/README.md"}),
+])
+def test_most_specific_variant_wins(locale, expected):
+    resolved = resolve(MANIFEST, KIND_FILE, locale=locale)
+    assert {dest: e["path"] for dest, e in resolved.items()} == expected
+
+
+def test_agent_files_need_a_matching_agent():
+    assert "GEMINI.md" not in resolve(MANIFEST, KIND_FILE, agents=["claude"])
+    assert resolve(MANIFEST, KIND_FILE, agents=["claude", "gemini"])["GEMINI.md"]["path"] == "agent_templates/gemini/GEMINI.md"
+
+
+def test_japanese_scaffold_takes_every_localized_file():
+    localized = {e["dest"]: e["path"] for e in load_manifest()["files"] if e["kind"] == KIND_FILE and e["locale"] == "ja"}
+    assert localized
+    entries = specify_cli.scaffold_entries("claude", "ja")
+    assert {dest: entries[dest]["path"] for dest in localized} == localized
+    # Nothing else is localized, so the rest comes from the neutral resources
+    assert all(e["locale"] is None for dest, e in entries.items() if dest not in localized)
+    assert all((resource_root() / e["path"]).is_file() for e in entries.values())
+
+
+def test_catalogs_load_only_the_languages_used():
+    catalogs = Catalogs()
+    assert catalogs._loaded == {}
+    assert catalogs.message("ja", "tagline") != catalogs.message("en", "tagline")
+    assert set(catalogs._loaded) == {"ja", "en"}
+    assert catalogs.message("ja", "no-such-message") == "no-such-message"
+
+
+def test_unknown_or_malformed_languages_are_missing():
+    catalogs = Catalogs()
+    assert "xx" not in catalogs
+    assert "../en" not in catalogs
+    assert catalogs.message("xx", "tagline") == catalogs.message("en", "tagline")
+    assert set(catalogs.languages()) >= {"en", "ja"}
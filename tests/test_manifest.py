@@ -0,0 +1,59 @@
+"""The resource manifest and the copy plan built from it."""
+
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+import specify_cli
+from specify_cli.manifest import KIND_FILE, build_manifest, check_manifest, load_manifest, write_manifest
+
+RESOURCES = Path(specify_cli.__file__).parent / "resources"
+
+
+@pytest.fixture
+def resources(tmp_path):
+    copy = tmp_path / "resources"
+    shutil.copytree(RESOURCES, copy, ignore=shutil.ignore_patterns("__pycache__"))
+    return copy
+
+
+def test_committed_manifest_is_current():
+    assert check_manifest(RESOURCES)
+
+
+def test_check_detects_drift(resources):
+    assert check_manifest(resources)
+    template = resources / "templates" / "plan-template.md"
+    template.write_text(template.read_text(encoding="utf-8") + "\nextra\n", encoding="utf-8")
+    assert not check_manifest(resources)
+    write_manifest(resources)
+    assert check_manifest(resources)
+
+
+def test_check_detects_added_and_removed_files(resources):
+    (resources / "templates" / "new-template.md").write_text("# New\n", encoding="utf-8")
+    assert not check_manifest(resources)
+    write_manifest(resources)
+    (resources / "templates" / "new-template.md").unlink()
+    assert not check_manifest(resources)
+
+
+def test_entries_describe_their_files(resources):
+    for entry in build_manifest(resources)["files"]:
+        assert entry["size"] == (resources / entry["path"]).stat().st_size
+        if entry["kind"] == KIND_FILE:
+            assert entry["dest"]
+
+
+def test_copy_plan_materializes_every_file(tmp_path):
+    entries = [e for e in load_manifest()["files"] if e["kind"] == KIND_FILE and e["locale"] is None and e["agents"] is None]
+    stats = specify_cli.copy_files(specify_cli.plan_copy_jobs(entries, tmp_path))
+    assert stats.files == len(entries)
+    assert stats.bytes == sum(e["size"] for e in entries)
+    for e in entries:
+        dest = tmp_path / e["dest"]
+        assert dest.stat().st_size == e["size"]
+        if os.name != "nt":
+            assert bool(os.stat(dest).st_mode & 0o111) == bool(e["mode"] & 0o111)
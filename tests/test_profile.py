@@ -0,0 +1,104 @@
+"""The --profile tracer: span counters, and the Chrome trace and summary it writes."""
+
+import json
+import threading
+import time
+
+import pytest
+
+from specify_cli.profile import Tracer, append_events, read_events, render, summarize, write_report
+
+
+def test_counts_stay_in_their_thread():
+    tracer = Tracer("check")
+    both_open = threading.Barrier(2)
+
+    def probe(name: str) -> None:
+        with tracer.span(name):
+            both_open.wait()
+            tracer.count(subprocesses=1)
+            both_open.wait()  # neither span ends before both have counted
+
+    threads = [threading.Thread(target=probe, args=(f"probe {n}",)) for n in ("git", "claude")]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    spans = {e["name"]: e["args"] for e in tracer.close() if e.get("ph") == "X"}
+    assert spans["probe git"]["subprocesses"] == 1
+    assert spans["probe claude"]["subprocesses"] == 1
+    assert spans["check"]["subprocesses"] == 2
+
+
+def test_nested_spans_are_inclusive():
+    tracer = Tracer("init")
+    with tracer.span("outer"):
+        with tracer.span("inner"):
+            tracer.count(files=1, bytes=10)
+        tracer.count(files=1)
+
+    spans = {e["name"]: e["args"] for e in tracer.close() if e.get("ph") == "X"}
+    assert spans["inner"] == {"files": 1, "bytes": 10}
+    assert spans["outer"] == {"files": 2, "bytes": 10}
+    assert spans["init"] == {"files": 2, "bytes": 10}
+
+
+def traced(name: str = "init") -> list[dict]:
+    tracer = Tracer(name)
+    with tracer.span("copy"):
+        tracer.count(files=2, bytes=20)
+    tracer.step_listener({"key": "git", "status": "running"})
+    tracer.step_listener({"key": "git", "status": "done", "detail": "initialized"})
+    return tracer.close()
+
+
+def test_chrome_trace_is_loadable(tmp_path):
+    events = traced()
+    path = tmp_path / "trace.json"
+    write_report(str(path), events, "chrome")
+    trace = json.loads(path.read_text(encoding="utf-8"))
+
+    assert trace["displayTimeUnit"] == "ms"
+    meta, *spans = trace["traceEvents"]
+    assert meta == {"name": "process_name", "ph": "M", "pid": meta["pid"], "tid": 0, "args": {"name": "specify init"}}
+    assert [(e["name"], e["cat"]) for e in spans] == [("init", "command"), ("copy", "specify"), ("git", "step")]
+    for e in spans:
+        assert e["ph"] == "X" and e["pid"] == meta["pid"]
+        assert isinstance(e["ts"], int) and isinstance(e["dur"], int) and e["dur"] >= 0
+    root, copy, git = spans
+    # Children lie within the root span, and timestamps are wall-clock microseconds
+    assert all(root["ts"] <= e["ts"] and e["ts"] + e["dur"] <= root["ts"] + root["dur"] for e in (copy, git))
+    assert abs(root["ts"] / 1e6 - time.time()) < 60
+    assert copy["args"] == {"files": 2, "bytes": 20}
+    assert git["args"] == {"status": "done", "detail": "initialized"}
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_trace_file_collects_processes_and_skips_torn_lines(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    first, second = traced("init"), traced("check")
+    append_events(str(path), first)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"name": "torn", "ph": "X", "ts"\n')
+        f.write('["not", "an", "event"]\n')
+    append_events(str(path), second)
+
+    events = read_events(str(path))
+    assert events == first + second
+    assert json.loads(render(events, "chrome")) == {"traceEvents": first + second, "displayTimeUnit": "ms"}
+
+
+def test_json_summary_totals_spans_by_name():
+    events = traced() + traced()
+    summary = json.loads(render(events, "json"))
+    rows = {row["name"]: row for row in summary["spans"]}
+    assert [row["name"] for row in summary["spans"]] == ["init", "copy", "git"]
+    assert rows["copy"]["count"] == 2 and rows["copy"]["files"] == 4 and rows["copy"]["bytes"] == 40
+    assert rows["init"]["files"] == 4
+    assert summary == summarize(events)
+
+
+def test_unknown_format_is_refused():
+    with pytest.raises(ValueError, match="Unknown profile format"):
+        render([], "svg")
@@ -0,0 +1,141 @@
+"""How the bundled bash scripts hand off to the specify CLI or daemon."""
+
+import json
+import os
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+import specify_cli
+
+SCRIPTS = Path(specify_cli.__file__).parent / "resources" / "scripts"
+
+pytestmark = pytest.mark.skipif(not (shutil.which("bash") and shutil.which("git")), reason="needs bash and git")
+
+
+@pytest.fixture
+def repo(tmp_path):
+    """Repository on a feature branch with a plan, and the scripts and templates copied in."""
+    repo = tmp_path / "repo"
+    shutil.copytree(SCRIPTS, repo / "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    shutil.copytree(SCRIPTS.parent / "templates", repo / "templates")
+    feature = repo / "specs" / "001-demo"
+    feature.mkdir(parents=True)
+    (feature / "spec.md").write_text("# Demo\n", encoding="utf-8")
+    (feature / "plan.md").write_text("# Plan\n\n**Language/Version**: Python 3.11\n", encoding="utf-8")
+    git = ["git", "-C", str(repo), "-c", "user.name=t", "-c", "user.email=t@example.invalid"]
+    subprocess.run([*git, "init", "-q", "-b", "001-demo"], check=True)
+    subprocess.run([*git, "add", "."], check=True)
+    subprocess.run([*git, "commit", "-q", "-m", "init"], check=True)
+    return repo
+
+
+def fake_specify(tmp_path, commands: list[str]) -> Path:
+    """A `specify` on PATH that logs its calls and knows only `commands`."""
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    log = tmp_path / "specify.log"
+    known = "|".join(f'"{c}"*' for c in commands) or "-"
+    (bin_dir / "specify").write_text(
+        "#!/usr/bin/env bash\n"
+        f'echo "$*" >> "{log}"\n'
+        f'case "$*" in {known}) ;; *) echo "No such command" >&2; exit 2 ;; esac\n'
+        '[[ " $* " == *" --help "* ]] && exit 0\n'
+        "echo FROM-CLI\n",
+        encoding="utf-8",
+    )
+    (bin_dir / "specify").chmod(0o755)
+    return bin_dir
+
+
+def run_script(repo, tmp_path, bin_dir, name, *args):
+    env = {k: v for k, v in os.environ.items() if not k.startswith("SPECIFY_")}
+    env.update(PATH=f"{bin_dir}{os.pathsep}{env['PATH']}", SPECIFY_SOCKET=str(tmp_path / "no-daemon.sock"),
+               SPECIFY_CACHE_DIR=str(tmp_path / "cache"))
+    return subprocess.run(["bash", str(repo / "scripts" / name), *args], cwd=repo, env=env,
+                          capture_output=True, text=True)
+
+
+def calls(tmp_path) -> list[str]:
+    log = tmp_path / "specify.log"
+    return log.read_text().splitlines() if log.exists() else []
+
+
+@pytest.mark.parametrize("script", ["check-task-prerequisites.sh", "get-feature-paths.sh"])
+def test_prereq_scripts_answer_in_bash_without_a_daemon(repo, tmp_path, script):
+    bin_dir = fake_specify(tmp_path, ["prereqs"])
+    proc = run_script(repo, tmp_path, bin_dir, script)
+    assert proc.returncode == 0, proc.stderr
+    assert "FEATURE_DIR" in proc.stdout
+    assert calls(tmp_path) == []
+
+
+def test_agent_context_uses_a_cli_that_has_the_command(repo, tmp_path):
+    bin_dir = fake_specify(tmp_path, ["agent-context update"])
+    proc = run_script(repo, tmp_path, bin_dir, "update-agent-context.sh", "claude")
+    assert proc.stdout.strip() == "FROM-CLI"
+    assert calls(tmp_path)[-1] == "agent-context update claude"
+
+
+def test_agent_context_falls_back_to_bash_with_an_older_cli(repo, tmp_path):
+    bin_dir = fake_specify(tmp_path, [])
+    proc = run_script(repo, tmp_path, bin_dir, "update-agent-context.sh", "claude")
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    assert "FROM-CLI" not in proc.stdout
+    assert (repo / "CLAUDE.md").exists()
+
+
+def test_create_feature_uses_a_cli_that_has_the_command(repo, tmp_path):
+    bin_dir = fake_specify(tmp_path, ["feature new"])
+    proc = run_script(repo, tmp_path, bin_dir, "create-new-feature.sh", "--json", "second feature")
+    assert proc.stdout.strip() == "FROM-CLI"
+    assert calls(tmp_path)[-1] == "feature new --json second feature"
+
+
+def test_create_feature_falls_back_to_bash_with_an_older_cli(repo, tmp_path):
+    bin_dir = fake_specify(tmp_path, [])
+    proc = run_script(repo, tmp_path, bin_dir, "create-new-feature.sh", "--json", "second feature")
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+    assert json.loads(proc.stdout)["BRANCH_NAME"].startswith("002-")
+
+
+def test_capability_checks_are_cached_per_executable(repo, tmp_path):
+    bin_dir = fake_specify(tmp_path, ["feature new"])
+    for name in ("first", "second"):
+        proc = run_script(repo, tmp_path, bin_dir, "create-new-feature.sh", "--json", name)
+        assert proc.stdout.strip() == "FROM-CLI"
+    assert calls(tmp_path) == ["feature new --help", "feature new --json first", "feature new --json second"]
+
+    # Reinstalling specify (a newer executable) asks again
+    later = (tmp_path / "cache" / "capabilities").stat().st_mtime + 10
+    os.utime(bin_dir / "specify", (later, later))
+    run_script(repo, tmp_path, bin_dir, "create-new-feature.sh", "--json", "third")
+    assert calls(tmp_path)[-2:] == ["feature new --help", "feature new --json third"]
+
+
+def test_missing_commands_are_cached_too(repo, tmp_path):
+    bin_dir = fake_specify(tmp_path, [])
+    for name in ("first", "second"):
+        proc = run_script(repo, tmp_path, bin_dir, "create-new-feature.sh", "--json", name)
+        assert proc.returncode == 0, proc.stdout + proc.stderr
+    assert calls(tmp_path) == ["feature new --help"]
+
+
+def test_create_feature_fallback_reads_the_feature_index(repo, tmp_path):
+    from specify_cli.features import write_index
+
+    bin_dir = fake_specify(tmp_path, [])
+    specs = repo / "specs"
+    (specs / ".index").mkdir()
+    # An index newer than specs/ is trusted without listing specs/
+    write_index(specs, 41)
+    proc = run_script(repo, tmp_path, bin_dir, "create-new-feature.sh", "--json", "indexed")
+    assert json.loads(proc.stdout)["FEATURE_NUM"] == "042", proc.stderr
+
+    # Adding the directory made specs/ newer than the index: list it again
+    subprocess.run(["git", "-C", str(repo), "checkout", "-q", "001-demo"], check=True)
+    (specs / "050-elsewhere").mkdir()
+    proc = run_script(repo, tmp_path, bin_dir, "create-new-feature.sh", "--json", "listed")
+    assert json.loads(proc.stdout)["FEATURE_NUM"] == "051", proc.stderr
@@ -0,0 +1,150 @@
+"""Publishing a project built in a staging directory."""
+
+import json
+import os
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from specify_cli import staging
+from specify_cli.staging import JOURNAL, StagingError, recover, staged
+
+
+def test_publishes_on_success(tmp_path):
+    project = tmp_path / "project"
+    with staged(project) as build:
+        (build / "README.md").write_text("hello\n", encoding="utf-8")
+    assert (project / "README.md").read_text(encoding="utf-8") == "hello\n"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["project"]
+
+
+def test_failure_removes_created_parents(tmp_path):
+    project = tmp_path / "a" / "b" / "project"
+    with pytest.raises(RuntimeError):
+        with staged(project) as build:
+            (build / "README.md").write_text("hello\n", encoding="utf-8")
+            raise RuntimeError("build failed")
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_existing_parents_are_kept(tmp_path):
+    (tmp_path / "a").mkdir()
+    with pytest.raises(RuntimeError):
+        with staged(tmp_path / "a" / "b" / "project"):
+            raise RuntimeError("build failed")
+    assert [p.name for p in tmp_path.iterdir()] == ["a"]
+    assert list((tmp_path / "a").iterdir()) == []
+
+
+def test_target_appearing_during_the_build_is_left_alone(tmp_path):
+    project = tmp_path / "project"
+    with pytest.raises(StagingError):
+        with staged(project) as build:
+            (build / "README.md").write_text("ours\n", encoding="utf-8")
+            project.mkdir()
+            (project / "theirs.txt").write_text("theirs\n", encoding="utf-8")
+    assert [p.name for p in project.iterdir()] == ["theirs.txt"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["project"]
+
+
+def test_here_failure_removes_a_new_specify_dir(tmp_path):
+    (tmp_path / "notes.md").write_text("keep\n", encoding="utf-8")
+    with pytest.raises(RuntimeError):
+        with staged(tmp_path, here=True) as build:
+            (build / "README.md").write_text("hello\n", encoding="utf-8")
+            raise RuntimeError("build failed")
+    assert [p.name for p in tmp_path.iterdir()] == ["notes.md"]
+
+
+@pytest.fixture(params=["noreplace", "claim"])
+def rename_mode(request, monkeypatch):
+    """Publish with libc's no-replace rename, and with the mkdir-claim fallback."""
+    if request.param == "noreplace":
+        if staging._noreplace_rename() is None:
+            pytest.skip("no renameat2/renamex_np here")
+    else:
+        monkeypatch.setattr(staging, "_noreplace_rename", lambda: None)
+    return request.param
+
+
+def test_empty_directory_appearing_during_the_build_is_not_replaced(tmp_path, rename_mode):
+    project = tmp_path / "project"
+    with pytest.raises(StagingError):
+        with staged(project) as build:
+            (build / "README.md").write_text("ours\n", encoding="utf-8")
+            project.mkdir()
+    assert project.is_dir() and list(project.iterdir()) == []
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["project"]
+
+
+def test_file_appearing_during_the_build_is_not_replaced(tmp_path, rename_mode):
+    project = tmp_path / "project"
+    with pytest.raises(StagingError):
+        with staged(project) as build:
+            (build / "README.md").write_text("ours\n", encoding="utf-8")
+            project.write_text("theirs\n", encoding="utf-8")
+    assert project.read_text(encoding="utf-8") == "theirs\n"
+
+
+def test_publishes_with_either_rename(tmp_path, rename_mode):
+    project = tmp_path / "project"
+    with staged(project) as build:
+        (build / "README.md").write_text("hello\n", encoding="utf-8")
+    assert [p.name for p in project.iterdir()] == ["README.md"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["project"]
+
+
+def interrupted_commit(project: Path, **header) -> Path:
+    """A --here commit that replaced README.md and then died, as the journal left it."""
+    (project / ".specify" / "backup-1").mkdir(parents=True)
+    (project / ".specify" / "backup-1" / "README.md").write_text("mine\n", encoding="utf-8")
+    (project / "README.md").write_text("template\n", encoding="utf-8")
+    journal = project / JOURNAL
+    lines = [{"staging": ".specify/staging-1", "backup": ".specify/backup-1", **header},
+             {"dest": "README.md", "backup": True}]
+    journal.write_text("".join(json.dumps(line) + "\n" for line in lines), encoding="utf-8")
+    return journal
+
+
+def test_recover_rolls_back_a_dead_commit(tmp_path):
+    done = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+    interrupted_commit(tmp_path, pid=int(done.stdout), host=socket.gethostname())
+    assert recover(tmp_path) == "rolled back"
+    assert (tmp_path / "README.md").read_text(encoding="utf-8") == "mine\n"
+    assert not (tmp_path / JOURNAL).exists()
+
+
+def test_recover_leaves_a_live_commit_alone(tmp_path):
+    with subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"]) as other:
+        try:
+            journal = interrupted_commit(tmp_path, pid=other.pid, host=socket.gethostname())
+            with pytest.raises(StagingError, match=f"pid {other.pid}"):
+                recover(tmp_path)
+            assert journal.exists()
+            assert (tmp_path / "README.md").read_text(encoding="utf-8") == "template\n"
+        finally:
+            other.kill()
+
+
+def test_recover_rolls_back_commits_from_other_hosts_and_old_journals(tmp_path):
+    interrupted_commit(tmp_path, pid=os.getppid(), host=socket.gethostname() + ".elsewhere")
+    assert recover(tmp_path) == "rolled back"
+    interrupted_commit(tmp_path)
+    assert recover(tmp_path) == "rolled back"
+
+
+def test_journal_header_names_the_committing_process(tmp_path, monkeypatch):
+    headers = []
+    real_open = staging.Journal.open
+
+    def record_header(journal, header):
+        headers.append(header)
+        real_open(journal, header)
+
+    monkeypatch.setattr(staging.Journal, "open", record_header)
+    with staged(tmp_path, here=True) as build:
+        (build / "README.md").write_text("hello\n", encoding="utf-8")
+    assert headers[0]["pid"] == os.getpid() and headers[0]["host"] == socket.gethostname()
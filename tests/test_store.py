@@ -0,0 +1,106 @@
+"""The per-user template store and materializing project files from it."""
+
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+import specify_cli
+from specify_cli.manifest import KIND_FILE, build_manifest, load_manifest, select
+from specify_cli.store import TemplateStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TemplateStore.open(load_manifest(), root=tmp_path / "store")
+
+
+@pytest.fixture
+def entry():
+    return next(e for e in select(load_manifest(), KIND_FILE) if e["size"] > 0)
+
+
+def sha256(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def hardlinked(store, entry, tmp_path) -> Path:
+    dest = tmp_path / "project" / "file"
+    dest.parent.mkdir()
+    store.materializer("hardlink")(store.object_path(entry), dest, False)
+    assert dest.stat().st_ino == store.object_path(entry).stat().st_ino
+    return dest
+
+
+@pytest.mark.parametrize("link_mode", ["copy", "auto"])
+def test_rewriting_a_hardlinked_file_leaves_the_object_alone(store, entry, tmp_path, link_mode):
+    dest = hardlinked(store, entry, tmp_path)
+    other = tmp_path / "other"
+    other.write_bytes(b"not the template\n")
+    store.materializer(link_mode)(other, dest, False)
+    assert dest.read_bytes() == b"not the template\n"
+    assert sha256(store.object_path(entry)) == entry["sha256"]
+
+
+def test_copy_files_replaces_a_hardlinked_file(store, entry, tmp_path):
+    dest = hardlinked(store, entry, tmp_path)
+    other = tmp_path / "other"
+    other.write_bytes(b"not the template\n")
+    specify_cli.copy_files([(other, dest, False)], max_workers=1)
+    assert dest.read_bytes() == b"not the template\n"
+    assert sha256(store.object_path(entry)) == entry["sha256"]
+
+
+def test_source_restores_an_object_edited_through_a_link(store, entry, tmp_path):
+    dest = hardlinked(store, entry, tmp_path)
+    with open(dest, "ab") as f:  # an editor saving in place
+        f.write(b"local edit\n")
+
+    assert sha256(store.source(entry)) == entry["sha256"]
+    assert dest.read_bytes().endswith(b"local edit\n")
+
+
+def test_source_restores_deleted_objects(store, entry):
+    store.object_path(entry).unlink()
+    assert store.marker.exists()
+    assert sha256(store.source(entry)) == entry["sha256"]
+
+
+def test_reopening_trusts_the_marker(store, entry, tmp_path):
+    reads = []
+    store.object_path(entry).unlink()
+    reopened = TemplateStore(store.root, store.manifest, store.version)
+    reopened._write_object = lambda e: reads.append(e["path"])
+    reopened.populate()
+    assert reads == []  # nothing is checked until an object is used
+
+
+def test_new_store_replaces_a_corrupt_object(tmp_path, entry):
+    root = tmp_path / "store"
+    first = TemplateStore.open(load_manifest(), root=root)
+    first.object_path(entry).write_bytes(b"corrupt")
+    first.marker.unlink()
+    second = TemplateStore.open(load_manifest(), root=root)
+    assert sha256(second.object_path(entry)) == entry["sha256"]
+
+
+@pytest.mark.parametrize("link_mode", ["copy", "auto", "hardlink"])
+def test_materialize_modes_copy_the_object(store, entry, tmp_path, link_mode):
+    dest = tmp_path / "file"
+    store.materializer(link_mode)(store.source(entry), dest, False)
+    assert sha256(dest) == entry["sha256"]
+    linked = dest.stat().st_ino == store.object_path(entry).stat().st_ino
+    assert linked == (link_mode == "hardlink")
+
+
+@pytest.mark.skipif(os.name == "nt", reason="no exec bits")
+def test_exec_bit_comes_from_the_source_file(tmp_path):
+    resources = tmp_path / "resources"
+    (resources / "scripts").mkdir(parents=True)
+    tool = resources / "scripts" / "run-checks"
+    tool.write_text("#!/bin/sh\necho ok\n", encoding="utf-8")
+    tool.chmod(0o755)
+    (resources / "scripts" / "notes.sh").write_text("# sourced, not run\n", encoding="utf-8")
+    modes = {e["path"]: e["mode"] for e in build_manifest(resources)["files"]}
+    assert modes == {"scripts/notes.sh": 0o644, "scripts/run-checks": 0o755}
@@ -0,0 +1,47 @@
+"""Probing tools for `specify check`: PATH lookups by default, versions on request."""
+
+import os
+import time
+
+import pytest
+
+from specify_cli.tools import GROUP_AI, Tool, probe_all
+
+
+def fake_tool(bin_dir, name, body):
+    path = bin_dir / name
+    path.write_text(f"#!/bin/sh\n{body}\n", encoding="utf-8")
+    path.chmod(0o755)
+    return Tool(name, GROUP_AI, "")
+
+
+@pytest.fixture
+def bin_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    return tmp_path
+
+
+def test_default_probe_does_not_run_tools(bin_dir):
+    marker = bin_dir / "ran"
+    tools = [fake_tool(bin_dir, name, f"touch {marker}") for name in ("one", "two")]
+    results = probe_all([*tools, Tool("specify-missing-tool", GROUP_AI, "")])
+    assert [(r["found"], r["path"], r["version"]) for r in results] == [
+        (True, str(bin_dir / "one"), None), (True, str(bin_dir / "two"), None), (False, None, None)]
+    assert not marker.exists()
+
+
+def test_versions_are_read_on_request(bin_dir):
+    tools = [fake_tool(bin_dir, "ok", "echo 'ok 1.2.3'; echo more"), fake_tool(bin_dir, "bad", "echo bad 0.1; exit 2")]
+    ok, bad = probe_all(tools, version=True)
+    assert ok["version"] == "ok 1.2.3" and ok["error"] is None
+    assert bad["version"] == "bad 0.1" and bad["error"] == "exited with status 2"
+
+
+def test_slow_tools_time_out_concurrently(bin_dir):
+    tools = [fake_tool(bin_dir, f"slow{n}", "exec sleep 5") for n in range(4)]
+    start = time.perf_counter()
+    results = probe_all(tools, version=True, timeout=0.3)
+    elapsed = time.perf_counter() - start
+    assert all(r["found"] and r["error"] == "timed out after 0.3s" for r in results)
+    # Four 0.3s timeouts in parallel, not one after the other
+    assert elapsed < 1.2
@@ -0,0 +1,52 @@
+"""StepTracker: cached tree rendering for Live, and NDJSON progress events."""
+
+import io
+import json
+
+from specify_cli import StepTracker, json_progress_listener
+
+
+def test_tree_is_rebuilt_only_after_a_change():
+    tracker = StepTracker("Init")
+    tracker.add("copy", "Copy files")
+    first = tracker.__rich__()
+    assert tracker.__rich__() is first
+    tracker.complete("copy", "3 files")
+    second = tracker.__rich__()
+    assert second is not first
+    assert tracker.__rich__() is second
+
+
+def test_tree_shows_each_step_and_detail():
+    from rich.console import Console
+
+    tracker = StepTracker("Init")
+    tracker.add("copy", "Copy files")
+    tracker.add("git", "Initialize git")
+    tracker.complete("copy", "3 files")
+    tracker.skip("git", "--no-git flag")
+    console = Console(file=io.StringIO(), width=80, color_system=None)
+    console.print(tracker)
+    text = console.file.getvalue()
+    assert "Init" in text
+    assert "Copy files (3 files)" in text
+    assert "Initialize git (--no-git flag)" in text
+
+
+def test_listeners_get_one_ndjson_line_per_change():
+    out = io.StringIO()
+    tracker = StepTracker("Init")
+    tracker.attach_listener(json_progress_listener(out))
+    tracker.add("copy", "Copy files")
+    tracker.start("copy")
+    tracker.complete("copy", "3 files")
+    tracker.error("unknown", "boom")  # added on first update
+    events = [json.loads(line) for line in out.getvalue().splitlines()]
+    assert [(e["event"], e["tracker"], e["key"], e["status"]) for e in events] == [
+        ("step", "Init", "copy", "pending"),
+        ("step", "Init", "copy", "running"),
+        ("step", "Init", "copy", "done"),
+        ("step", "Init", "unknown", "error"),
+    ]
+    assert events[2]["detail"] == "3 files" and events[3]["label"] == "unknown"
+    assert all(isinstance(e["elapsed"], float) for e in events)
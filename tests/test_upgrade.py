@@ -0,0 +1,105 @@
+"""Planning `specify upgrade`: the action for each file, with and without a lock."""
+
+import hashlib
+import shutil
+
+import pytest
+
+import specify_cli
+from specify_cli.bundle import resource_root
+from specify_cli.lockfile import ADDED, KEPT, MODIFIED, REMOVED, UNCHANGED, UPDATED, plan_upgrade, read_lock, write_lock
+
+
+def sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+OLD, NEW, MINE = b"old template\n", b"new template\n", b"my edit\n"
+
+
+@pytest.fixture
+def project(tmp_path):
+    """A project initialized from OLD templates, then edited in places."""
+    files = {
+        "same": OLD,            # nobody changed it
+        "upstream": OLD,        # changed upstream only
+        "mine": MINE,           # changed locally only
+        "both": MINE,           # changed on both sides
+        "missing": None,        # deleted locally
+        "dropped": OLD,         # dropped upstream, untouched
+        "dropped-mine": MINE,   # dropped upstream, edited
+    }
+    for rel, data in files.items():
+        if data is not None:
+            (tmp_path / rel).write_bytes(data)
+    return tmp_path
+
+
+DESIRED = {
+    "same": sha256(OLD),
+    "upstream": sha256(NEW),
+    "mine": sha256(OLD),
+    "both": sha256(NEW),
+    "missing": sha256(OLD),
+}
+
+
+def locked(project):
+    names = ["same", "upstream", "mine", "both", "dropped", "dropped-mine"]
+    for rel in names:
+        if not (project / rel).exists():
+            (project / rel).write_bytes(OLD)
+    write_lock(project, ai="claude", lang="en", version="v0", files={rel: sha256(OLD) for rel in names})
+    lock = read_lock(project)
+    # Local edits happen after init: rewrite without touching the lock
+    for rel in ("mine", "both", "dropped-mine"):
+        (project / rel).write_bytes(MINE)
+    return lock
+
+
+def test_action_matrix_with_a_lock(project):
+    lock = locked(project)
+    assert plan_upgrade(project, lock, DESIRED) == {
+        "same": UNCHANGED,
+        "upstream": UPDATED,
+        "mine": KEPT,
+        "both": MODIFIED,
+        "missing": ADDED,
+        "dropped": REMOVED,
+        "dropped-mine": KEPT,
+    }
+
+
+def test_force_overwrites_local_edits(project):
+    lock = locked(project)
+    actions = plan_upgrade(project, lock, DESIRED, force=True)
+    assert actions["mine"] == actions["both"] == UPDATED
+    assert actions["dropped-mine"] == REMOVED
+
+
+def test_action_matrix_without_a_lock(project):
+    # Without a baseline nothing tells a local edit from an upstream change,
+    # and nothing is known to have been dropped
+    assert plan_upgrade(project, None, DESIRED) == {
+        "same": UNCHANGED,
+        "upstream": MODIFIED,
+        "mine": MODIFIED,
+        "both": MODIFIED,
+        "missing": ADDED,
+    }
+
+
+@pytest.mark.parametrize("lang", ["en", "ja"])
+def test_lockless_projects_keep_their_language(tmp_path, monkeypatch, lang):
+    entries = specify_cli.scaffold_entries("claude", lang)
+    for dest, entry in entries.items():
+        (tmp_path / dest).parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(resource_root() / entry["path"], tmp_path / dest)
+    for ui in ("en", "ja"):
+        monkeypatch.setattr(specify_cli, "LANG", ui)
+        assert specify_cli.detect_project_lang(tmp_path, "claude") == lang
+
+
+def test_language_detection_falls_back_to_the_ui_language(tmp_path, monkeypatch):
+    monkeypatch.setattr(specify_cli, "LANG", "ja")
+    assert specify_cli.detect_project_lang(tmp_path, "claude") == "ja"